@@ -0,0 +1,153 @@
+"""Checkpoint journal for resuming interrupted uploads."""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+from pathlib import Path
+from types import TracebackType
+from typing import NamedTuple, Self
+
+# Bytes hashed at the start and at the end of a file to identify it
+SAMPLE_SIZE = 1024 * 1024
+
+
+class FileIdentity(NamedTuple):
+    """
+    Identifies the content of a file cheaply.
+
+    The hash only covers the first and last ``SAMPLE_SIZE`` bytes, so it can be
+    computed for files of any size; together with the size and modification
+    time it tells whether a file was replaced since a checkpoint was written.
+    """
+
+    path: str
+    size: int
+    mtime_ns: int
+    sample_hash: str
+
+    @classmethod
+    def of(cls, file_path: Path) -> "FileIdentity":
+        stat = file_path.stat()
+        digest = hashlib.sha256()
+        with file_path.open("rb") as f:
+            digest.update(f.read(SAMPLE_SIZE))
+            if stat.st_size > SAMPLE_SIZE:
+                f.seek(max(stat.st_size - SAMPLE_SIZE, SAMPLE_SIZE))
+                digest.update(f.read(SAMPLE_SIZE))
+        return cls(
+            str(file_path.resolve()), stat.st_size, stat.st_mtime_ns, digest.hexdigest()
+        )
+
+
+class Checkpoint(NamedTuple):
+    """Progress of a file covering every batch up to ``end_offset``."""
+
+    # Offset in the (decompressed) data just past the last committed batch
+    end_offset: int
+    # Number of committed batches and the triples they contained
+    batch_count: int
+    triple_count: int
+
+
+class CheckpointJournal:
+    """
+    Records how far a file has been uploaded to a target.
+
+    The journal lives in ``directory`` under a name derived from the file path
+    and the target (endpoint, store and graph), so loads of the same file to
+    different places do not interfere. Every commit replaces the journal
+    atomically, so a crash leaves either the previous or the new checkpoint.
+    """
+
+    def __init__(self, directory: Path, file_path: Path, target: str):
+        self.file_path = file_path
+        self.target = target
+        key = hashlib.sha256(f"{file_path.resolve()}\n{target}".encode()).hexdigest()
+        self.path = directory / f"{key[:32]}.json"
+        self.identity = FileIdentity.of(file_path)
+        directory.mkdir(parents=True, exist_ok=True)
+
+    def load(self) -> Checkpoint | None:
+        """Return the last checkpoint, unless there is none or the file changed."""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if FileIdentity(**data["identity"]) != self.identity:
+                return None
+            return Checkpoint(**data["checkpoint"])
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError):
+            # A journal we cannot make sense of is as good as none
+            return None
+
+    def commit(self, checkpoint: Checkpoint) -> None:
+        data = {
+            "identity": self.identity._asdict(),
+            "target": self.target,
+            "checkpoint": checkpoint._asdict(),
+        }
+        tmp_path = self.path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp_path.replace(self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+class CheckpointWriter:
+    """
+    Commits the checkpoints of a journal without blocking the event loop.
+
+    A single task writes the journal in a worker thread. Checkpoints handed to
+    ``commit`` while a write is under way replace each other, so only the
+    latest is written next: the journal never goes backwards and a slow disk
+    skips intermediate checkpoints instead of holding up the uploads.
+    """
+
+    def __init__(self, journal: CheckpointJournal):
+        self.journal = journal
+        self._latest: Checkpoint | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def commit(self, checkpoint: Checkpoint) -> None:
+        self._latest = checkpoint
+        if self._task is None or self._task.done():
+            if self._task is not None:
+                # A failed write fails the upload, as if it had happened here
+                self._task.result()
+            self._task = asyncio.create_task(self._write())
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            await self.flush()
+        else:
+            # The error that stopped the upload matters more than a failed write
+            with contextlib.suppress(OSError):
+                await self.flush()
+
+    async def flush(self) -> None:
+        """Wait until the latest checkpoint is written."""
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    async def clear(self) -> None:
+        await self.flush()
+        await asyncio.to_thread(self.journal.clear)
+
+    async def _write(self) -> None:
+        while (checkpoint := self._latest) is not None:
+            self._latest = None
+            await asyncio.to_thread(self.journal.commit, checkpoint)
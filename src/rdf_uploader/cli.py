@@ -1,9 +1,9 @@
 """Command-line interface for RDF Uploader."""
 
 import asyncio
-import os
+from collections.abc import Sequence
 from pathlib import Path
-from typing import Any
+from typing import Any, TypeVar
 
 import click
 import typer
@@ -11,52 +11,274 @@
 from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn
 
 from rdf_uploader.__about__ import VERSION
-from rdf_uploader.endpoints import EndpointType
-from rdf_uploader.uploader import upload_rdf_files
+from rdf_uploader.endpoints import EndpointType, RequestCompression
+from rdf_uploader.neptune_bulk import NeptuneBulkConfig
+from rdf_uploader.scheduling import MakespanReport, SchedulePolicy
+from rdf_uploader.uploader import EndpointSettings, upload_rdf_files
 
 app = typer.Typer(help="Upload RDF data to SPARQL endpoints")
 console = Console()
 
 
+T = TypeVar("T")
+
+
+def per_endpoint(values: Sequence[T] | None, count: int, option: str) -> list[T | None]:
+    """Spread the values of an option over the endpoints; a single one applies to all."""
+    if not values:
+        return [None] * count
+    if len(values) == 1:
+        return [values[0]] * count
+    if len(values) != count:
+        raise typer.BadParameter(f"Give one {option} per --endpoint or one for all")  # noqa: TRY003
+    return list(values)
+
+
+def pair_endpoints(
+    endpoints: list[str] | None,
+    endpoint_types: list[EndpointType],
+    usernames: list[str] | None = None,
+    passwords: list[str] | None = None,
+    store_names: list[str] | None = None,
+) -> list[EndpointSettings]:
+    """
+    Match every --endpoint with its --type, credentials and store name.
+
+    The first endpoint is the main one, the others receive every batch as well.
+    Without any --endpoint, the main one is read from the environment.
+    """
+    urls: list[str | None] = list(endpoints) if endpoints else [None]
+    count = len(urls)
+    settings = zip(
+        urls,
+        per_endpoint(endpoint_types, count, "--type"),
+        per_endpoint(usernames, count, "--username"),
+        per_endpoint(passwords, count, "--password"),
+        per_endpoint(store_names, count, "--store-name"),
+        strict=True,
+    )
+    return [
+        EndpointSettings(
+            url, endpoint_type or EndpointType.GENERIC, username, password, store
+        )
+        for url, endpoint_type, username, password, store in settings
+    ]
+
+
+def print_results(results: dict[Path, dict[str, Any]]) -> None:
+    console.print("\nUpload Results:")
+    for file_path, result in results.items():
+        if isinstance(result, dict) and not result.get("success", False):
+            # Display error details for failed uploads
+            error_type = result.get("error_type", "Unknown error")
+            error_message = result.get("error_message", "No details available")
+            console.print(
+                f"❌ {file_path}: [bold red]{error_type}[/] - {error_message}"
+            )
+        elif result.get("skipped"):
+            console.print(f"⏭️  {file_path}: unchanged, already uploaded")
+        else:
+            console.print(f"✅ {file_path}")
+
+
+def print_makespan(report: MakespanReport) -> None:
+    console.print(
+        f"[bold cyan]Makespan:[/] {report.actual:.1f}s, "
+        f"predicted {report.predicted:.1f}s "
+        f"(lower bound {report.lower_bound:.1f}s)"
+    )
+
+
 @app.command()
-def upload(
+def upload(  # noqa: C901
     files: list[Path] = typer.Argument(
-        ..., help="RDF files to upload (N3, Turtle, RDF/XML, etc.)"
+        ...,
+        help="RDF files to upload (N3, Turtle, RDF/XML, etc., optionally "
+        "compressed), or directories and glob patterns to search for them",
     ),
-    endpoint: str | None = typer.Option(
+    endpoints: list[str] | None = typer.Option(
         None,
         "--endpoint",
         "-e",
-        help="SPARQL endpoint URL (can be read from environment variables)",
+        help="SPARQL endpoint URL (can be read from environment variables); "
+        "repeat to load the files into several stores at once",
     ),
-    endpoint_type: EndpointType = typer.Option(
-        EndpointType.GENERIC,
+    endpoint_types: list[EndpointType] = typer.Option(
+        [EndpointType.GENERIC],
         "--type",
         "-t",
-        help="Type of SPARQL endpoint",
+        help="Type of SPARQL endpoint, once per --endpoint or once for all",
+    ),
+    shard: bool = typer.Option(
+        False,
+        "--shard",
+        help="Spread the triples of N-Triples and N-Quads files over the "
+        "--endpoint endpoints by subject, instead of loading all into each",
+    ),
+    neptune_bulk: str | None = typer.Option(
+        None,
+        "--neptune-bulk",
+        help="Load the files with the Neptune bulk loader, staging them under "
+        "this s3://bucket/prefix (AWS credentials come from the environment)",
+    ),
+    neptune_iam_role: str | None = typer.Option(
+        None,
+        "--neptune-iam-role",
+        help="ARN of the IAM role Neptune assumes to read the staged files",
+        envvar="NEPTUNE_IAM_ROLE_ARN",
+    ),
+    neptune_iam_auth: bool = typer.Option(
+        False,
+        "--neptune-iam-auth",
+        help="Sign the bulk loader requests for clusters with IAM authentication",
+    ),
+    aws_region: str = typer.Option(
+        "us-east-1",
+        "--aws-region",
+        help="AWS region of the Neptune cluster and the staging bucket",
+        envvar="AWS_REGION",
+    ),
+    s3_endpoint: str | None = typer.Option(
+        None,
+        "--s3-endpoint",
+        help="S3-compatible endpoint to stage files on [default: AWS S3 of "
+        "--aws-region]",
     ),
     graph: str | None = typer.Option(
         None, "--graph", "-g", help="Named graph to upload to"
     ),
+    split_graphs: bool = typer.Option(
+        False,
+        "--split-graphs",
+        help="Upload the quads of N-Quads files to their own named graphs, "
+        "batched per graph (quads without a graph go to --graph)",
+    ),
     concurrent: int = typer.Option(
         5, "--concurrent", "-c", help="Maximum number of concurrent uploads"
     ),
-    username: str | None = typer.Option(
-        None, "--username", "-u", help="Username for authentication"
+    schedule_policy: SchedulePolicy = typer.Option(
+        SchedulePolicy.LARGEST_FIRST,
+        "--schedule",
+        help="Order in which files are started across the concurrent uploads",
+    ),
+    usernames: list[str] | None = typer.Option(
+        None,
+        "--username",
+        "-u",
+        help="Username for authentication, once per --endpoint or once for all",
     ),
-    password: str | None = typer.Option(
-        None, "--password", "-p", help="Password for authentication"
+    passwords: list[str] | None = typer.Option(
+        None,
+        "--password",
+        "-p",
+        help="Password for authentication, once per --endpoint or once for all",
     ),
     content_type: str | None = typer.Option(
         None,
         "--content-type",
         help="Content type for RDF data (e.g., text/turtle, application/rdf+xml)",
     ),
-    batch_size: int = typer.Option(
-        1000,
+    batch_size: int | None = typer.Option(
+        None,
         "--batch-size",
         "-b",
-        help="Number of triples per batch for streaming formats",
+        help="Number of triples per batch for streaming formats "
+        "[default: 1000, no limit with --batch-bytes]",
+    ),
+    batch_bytes: int | None = typer.Option(
+        None,
+        "--batch-bytes",
+        help="Maximum size in bytes of a batch for streaming formats, "
+        "optionally combined with --batch-size",
+    ),
+    adaptive_batch_size: bool = typer.Option(
+        False,
+        "--adaptive-batch-size",
+        help="Start from --batch-size and adapt the batch size to the "
+        "endpoint's response times",
+    ),
+    target_latency: float = typer.Option(
+        5.0,
+        "--target-latency",
+        help="Upload time per batch in seconds that --adaptive-batch-size aims for",
+    ),
+    max_batch_size: int = typer.Option(
+        100_000,
+        "--max-batch-size",
+        help="Largest batch size --adaptive-batch-size may grow to",
+    ),
+    inflight_batches: int = typer.Option(
+        1,
+        "--inflight-batches",
+        "-i",
+        help="Maximum number of batches of a single file uploaded concurrently",
+    ),
+    max_inflight_requests: int | None = typer.Option(
+        None,
+        "--max-inflight",
+        help="Maximum number of batches in flight across all files, shared "
+        "fairly between them",
+    ),
+    max_inflight_bytes: int | None = typer.Option(
+        None,
+        "--max-inflight-bytes",
+        help="Maximum size in bytes of the batches in flight across all files",
+    ),
+    coalesce_bytes: int | None = typer.Option(
+        None,
+        "--coalesce",
+        help="Upload N-Triples and N-Quads files of at most this many bytes "
+        "together in shared batches",
+    ),
+    stream: bool = typer.Option(
+        False,
+        "--stream",
+        help="Post each file as one streamed request instead of batches "
+        "(Blazegraph and RDFox; other types get batches)",
+    ),
+    transactions: bool = typer.Option(
+        False,
+        "--transaction",
+        help="Upload the batches of each file into transactions of the store, "
+        "rolled back on failure (Stardog and RDFox)",
+    ),
+    commit_batches: int | None = typer.Option(
+        None,
+        "--commit-batches",
+        help="Commit a --transaction after this many batches "
+        "[default: one transaction per file]",
+    ),
+    commit_bytes: int | None = typer.Option(
+        None,
+        "--commit-bytes",
+        help="Commit a --transaction once its batches hold this many bytes",
+    ),
+    queue_depth: int = typer.Option(
+        4,
+        "--queue-depth",
+        help="Number of batches read ahead of the upload for each file",
+    ),
+    single_pass: bool = typer.Option(
+        False,
+        "--single-pass",
+        help="Read each file once, tracking progress in bytes instead of triples",
+    ),
+    checkpoint_dir: Path | None = typer.Option(
+        None,
+        "--checkpoint-dir",
+        help="Directory for journals recording the batches of each file "
+        "uploaded so far",
+    ),
+    resume: bool = typer.Option(
+        False,
+        "--resume",
+        help="Continue interrupted uploads from their journal in --checkpoint-dir",
+    ),
+    ledger_path: Path | None = typer.Option(
+        None,
+        "--ledger",
+        help="SQLite ledger of uploaded files; files already uploaded with the "
+        "same content to the same endpoint and graph are skipped",
     ),
     verbose: bool = typer.Option(
         False,
@@ -64,15 +286,100 @@ def upload(
         "-v",
         help="Enable verbose output showing batch details and server responses",
     ),
-    store_name: str | None = typer.Option(
-        os.environ.get("RDFOX_STORE_NAME", ""),
+    store_names: list[str] | None = typer.Option(
+        None,
         "--store-name",
         "-s",
-        help="RDFox datastore name (only used with RDFox endpoint type)",
-        envvar="RDFOX_STORE_NAME",
+        help="RDFox datastore name (only used with RDFox endpoint type), once per "
+        "--endpoint or once for all [default: $RDFOX_STORE_NAME]",
+    ),
+    max_connections: int = typer.Option(
+        100,
+        "--max-connections",
+        help="Maximum number of pooled HTTP connections to the endpoint",
+    ),
+    max_keepalive_connections: int = typer.Option(
+        20,
+        "--keepalive-connections",
+        help="Maximum number of idle HTTP connections kept alive between batches",
+    ),
+    keepalive_expiry: float = typer.Option(
+        5.0,
+        "--keepalive-expiry",
+        help="Seconds an idle HTTP connection is kept alive",
+    ),
+    http2: bool = typer.Option(
+        False,
+        "--http2",
+        help="Multiplex batches over HTTP/2 connections (requires httpx[http2])",
+    ),
+    warmup_connections: int = typer.Option(
+        0,
+        "--warmup",
+        help="Number of connections to open to the endpoint before uploading",
+    ),
+    cpu_workers: int = typer.Option(
+        0,
+        "--cpu-workers",
+        help="Worker processes for CPU-bound conversions such as Turtle to "
+        "N-Triples for MarkLogic (0 uses a background thread)",
+    ),
+    compress_requests: RequestCompression = typer.Option(
+        RequestCompression.NONE,
+        "--compress-requests",
+        help="Compress batch request bodies (endpoint types that do not accept "
+        "compressed uploads get them uncompressed, with a warning)",
+    ),
+    max_retries: int = typer.Option(
+        3,
+        "--retries",
+        help="Number of times a batch is retried after a transient failure "
+        "(connection errors, 408, 429, 502, 503, 504)",
+    ),
+    retry_backoff: float = typer.Option(
+        0.5,
+        "--retry-backoff",
+        help="Base delay in seconds of the exponential backoff between retries",
+    ),
+    retry_backoff_max: float = typer.Option(
+        30.0,
+        "--retry-backoff-max",
+        help="Maximum delay in seconds between retries",
     ),
 ) -> None:
     """Upload RDF files to a SPARQL endpoint."""
+    if resume and checkpoint_dir is None:
+        raise typer.BadParameter("--resume requires --checkpoint-dir")  # noqa: TRY003
+    if shard and split_graphs:
+        raise typer.BadParameter("--shard cannot be combined with --split-graphs")  # noqa: TRY003
+    if transactions and (
+        inflight_batches > 1
+        or max_inflight_requests is not None
+        or max_inflight_bytes is not None
+        or adaptive_batch_size
+    ):
+        raise typer.BadParameter(  # noqa: TRY003
+            "--transaction uploads one batch at a time at a fixed size; it cannot "
+            "be combined with --inflight-batches, --max-inflight, "
+            "--max-inflight-bytes or --adaptive-batch-size"
+        )
+    if batch_size is None and batch_bytes is None:
+        batch_size = 1000
+    primary, *mirrors = pair_endpoints(
+        endpoints, endpoint_types, usernames, passwords, store_names
+    )
+    bulk_config = None
+    if neptune_bulk:
+        if not neptune_iam_role:
+            raise typer.BadParameter("--neptune-bulk requires --neptune-iam-role")  # noqa: TRY003
+        bulk_config = NeptuneBulkConfig(
+            source_uri=neptune_bulk,
+            iam_role_arn=neptune_iam_role,
+            region=aws_region,
+            s3_endpoint=s3_endpoint,
+            iam_auth=neptune_iam_auth,
+        )
+
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
@@ -86,16 +393,22 @@ def upload(
 
         def update_stats(stats: dict[str, Any]) -> None:
             file_path = Path(stats["file"])
+            # Single-pass uploads have no triple total, so progress is in bytes
+            by_triples = stats["total_triples"] > 0
             if file_path not in tasks:
                 tasks[file_path] = progress.add_task(
                     f"Uploading {file_path.name}...",
-                    total=stats["total_triples"],
+                    total=stats["total_triples"]
+                    if by_triples
+                    else stats["total_bytes"],
                     rate="0.0",
                 )
 
             progress.update(
                 tasks[file_path],
-                completed=stats["uploaded_triples"],
+                completed=stats["uploaded_triples"]
+                if by_triples
+                else stats["bytes_read"],
                 rate=f"{stats['triples_per_second']:.1f}",
             )
 
@@ -104,35 +417,62 @@ def update_stats(stats: dict[str, Any]) -> None:
                     f"[bold cyan]File:[/] {file_path.name} | "
                     f"[bold green]Batch {stats['batch_num']}:[/] {stats['batch_count']} triples | "
                     f"[bold blue]Status:[/] {stats['status_code']}"
+                    + (
+                        f" | [bold yellow]Retries:[/] {stats['retries']}"
+                        if stats.get("retries")
+                        else ""
+                    )
                 )
 
         async def run_upload() -> None:
             results = await upload_rdf_files(
                 files=files,
-                endpoint=endpoint,
-                endpoint_type=endpoint_type,
+                endpoint=primary.url,
+                endpoint_type=primary.endpoint_type,
                 graph=graph,
                 concurrent_limit=concurrent,
-                username=username,
-                password=password,
+                username=primary.username,
+                password=primary.password,
                 content_type=content_type,
                 batch_size=batch_size,
+                batch_bytes=batch_bytes,
+                split_graphs=split_graphs,
+                queue_depth=queue_depth,
+                inflight_batches=inflight_batches,
+                max_inflight_requests=max_inflight_requests,
+                max_inflight_bytes=max_inflight_bytes,
+                coalesce_bytes=coalesce_bytes,
+                mirrors=mirrors,
+                shard=shard,
+                neptune_bulk=bulk_config,
+                stream=stream,
+                transactions=transactions,
+                commit_batches=commit_batches,
+                commit_bytes=commit_bytes,
+                single_pass=single_pass,
                 stats_callback=update_stats,
-                store_name=store_name,
+                store_name=primary.store_name,
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+                http2=http2,
+                warmup_connections=warmup_connections,
+                cpu_workers=cpu_workers,
+                compress_requests=compress_requests,
+                max_retries=max_retries,
+                retry_backoff=retry_backoff,
+                retry_backoff_max=retry_backoff_max,
+                adaptive_batch_size=adaptive_batch_size,
+                target_latency=target_latency,
+                max_batch_size=max_batch_size,
+                checkpoint_dir=checkpoint_dir,
+                resume=resume,
+                ledger_path=ledger_path,
+                schedule_policy=schedule_policy,
+                schedule_callback=print_makespan,
             )
 
-            # Display results
-            console.print("\nUpload Results:")
-            for file_path, result in results.items():
-                if isinstance(result, dict) and not result.get("success", False):
-                    # Display error details for failed uploads
-                    error_type = result.get("error_type", "Unknown error")
-                    error_message = result.get("error_message", "No details available")
-                    console.print(
-                        f"❌ {file_path}: [bold red]{error_type}[/] - {error_message}"
-                    )
-                else:
-                    console.print(f"✅ {file_path}")
+            print_results(results)
 
         asyncio.run(run_upload())
 
@@ -1,10 +1,26 @@
+import asyncio
+import contextlib
 import enum
+import gzip
+import logging
+import multiprocessing
+import random
+import time
+import zlib
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from email.utils import parsedate_to_datetime
+from types import TracebackType
+from typing import NamedTuple, Self
 
 import httpx
 
+from rdf_uploader.turtle import TurtleSyntaxError, turtle_to_ntriples
 from rdf_uploader.utils import get_env_value
 
+logger = logging.getLogger(__name__)
+
 
 class EndpointType(str, enum.Enum):  # noqa: UP042 # TODO: fix later
     GENERIC = "generic"
@@ -15,7 +31,98 @@ class EndpointType(str, enum.Enum):  # noqa: UP042 # TODO: fix later
     STARDOG = "stardog"
 
 
+class RequestCompression(enum.StrEnum):
+    NONE = "none"
+    GZIP = "gzip"
+
+
+GZIP_LEVEL = 6
+
+
+def compress_body(data: bytes, encoding: str) -> bytes:
+    """Compress a request body with the given ``Content-Encoding``."""
+    if encoding == RequestCompression.GZIP:
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unsupported content encoding: {encoding}")  # noqa: TRY003
+
+
+async def compress_stream(
+    chunks: AsyncIterable[bytes], encoding: str
+) -> AsyncIterator[bytes]:
+    """Compress a streamed request body chunk by chunk."""
+    if encoding != RequestCompression.GZIP:
+        raise ValueError(f"Unsupported content encoding: {encoding}")  # noqa: TRY003
+    # wbits 31 writes a gzip header and trailer around the deflate stream
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        if data := await asyncio.to_thread(compressor.compress, chunk):
+            yield data
+    yield compressor.flush()
+
+
+# Responses that signal a transient condition on the server or a proxy
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 502, 503, 504})
+
+
+class RetryPolicy(NamedTuple):
+    """Exponential backoff with full jitter for failed batch uploads."""
+
+    max_retries: int = 3
+    backoff: float = 0.5
+    backoff_max: float = 30.0
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """Seconds to wait before retry number ``attempt`` (starting at 1)."""
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        ceiling = min(self.backoff_max, self.backoff * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)  # noqa: S311
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, httpx.TransportError)
+
+
+def retry_after_seconds(response: httpx.Response) -> float | None:
+    """Parse a ``Retry-After`` header given either in seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+def convert_turtle_to_ntriples(turtle_data: str) -> str | None:
+    """
+    Convert Turtle format to N-Triples.
+    Returns None if conversion fails.
+
+    Defined at module level so that it can run in a worker process.
+    """
+    try:
+        return turtle_to_ntriples(turtle_data)
+    except TurtleSyntaxError as e:
+        logger.warning("Turtle to N-Triples conversion failed: %s", e)
+        return None
+
+
 class EndpointStrategy(ABC):
+    # Content-Encodings the store accepts on upload request bodies
+    supported_encodings: frozenset[str] = frozenset()
+    # Whether the store loads a whole file posted as one streamed request body
+    supports_streaming = False
+    # Whether batches can be posted into a transaction of the store
+    supports_transactions = False
+
     def __init__(
         self,
         endpoint_url: str,
@@ -27,6 +134,11 @@ def __init__(
         self.timeout = timeout
         self.username = username
         self.password = password
+        self._auth: httpx.Auth | None = None
+        # Runs CPU-bound data conversions; None uses the default thread pool
+        self.executor: Executor | None = None
+        # Content-Encoding for request bodies; None sends them uncompressed
+        self.content_encoding: str | None = None
 
     @abstractmethod
     def get_upload_url(self, graph: str | None = None) -> str:
@@ -41,29 +153,150 @@ def get_auth(self) -> httpx.Auth | None:
             return None
         return httpx.BasicAuth(self.username, self.password)
 
+    @property
+    def auth(self) -> httpx.Auth | None:
+        # Reuse one auth instance so digest challenges carry over between requests
+        if self._auth is None:
+            self._auth = self.get_auth()
+        return self._auth
+
     async def upload(
         self,
-        data: str,
+        data: bytes,
         graph: str | None = None,
         content_type: str = "text/turtle",
+        client: httpx.AsyncClient | None = None,
     ) -> tuple[bool, int]:
-        url = self.get_upload_url(graph)
-        params = self.get_params(graph)
+        return await self._post(data, graph, content_type, client)
+
+    async def _post(
+        self,
+        data: bytes,
+        graph: str | None,
+        content_type: str,
+        client: httpx.AsyncClient | None,
+        transaction: str | None = None,
+    ) -> tuple[bool, int]:
+        if client is None:
+            async with httpx.AsyncClient(timeout=self.timeout) as own_client:
+                return await self._post(
+                    data, graph, content_type, own_client, transaction
+                )
+
         headers = {"Content-Type": content_type}
-        auth = self.get_auth()
-
-        async with httpx.AsyncClient(timeout=self.timeout, auth=auth) as client:
-            response = await client.post(
-                url,
-                params=params,
-                content=data,
-                headers=headers,
+        content = data
+        if self.content_encoding:
+            # Compression releases the GIL, so it overlaps with other uploads
+            content = await asyncio.to_thread(
+                compress_body, data, self.content_encoding
             )
-            response.raise_for_status()
-            return True, response.status_code
+            headers["Content-Encoding"] = self.content_encoding
+
+        if transaction is None:
+            url, params = self.get_upload_url(graph), self.get_params(graph)
+        else:
+            url = self.get_transaction_upload_url(transaction, graph)
+            params = self.get_transaction_params(transaction, graph)
+        response = await client.post(
+            url,
+            params=params,
+            content=content,
+            headers=headers,
+            auth=self.auth or httpx.USE_CLIENT_DEFAULT,
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return True, response.status_code
+
+    async def _request(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        params: dict[str, str] | None = None,
+    ) -> httpx.Response:
+        response = await client.request(
+            method,
+            url,
+            params=params,
+            auth=self.auth or httpx.USE_CLIENT_DEFAULT,
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response
+
+    async def begin_transaction(self, client: httpx.AsyncClient) -> str:
+        """Open a transaction and return its ID."""
+        raise NotImplementedError("The store does not support transactions")
+
+    async def commit_transaction(
+        self, transaction: str, client: httpx.AsyncClient
+    ) -> None:
+        raise NotImplementedError("The store does not support transactions")
+
+    async def rollback_transaction(
+        self, transaction: str, client: httpx.AsyncClient
+    ) -> None:
+        raise NotImplementedError("The store does not support transactions")
+
+    def get_transaction_upload_url(self, transaction: str, graph: str | None) -> str:
+        return self.get_upload_url(graph)
+
+    def get_transaction_params(
+        self, transaction: str, graph: str | None
+    ) -> dict[str, str]:
+        return self.get_params(graph)
+
+    async def upload_in_transaction(
+        self,
+        transaction: str,
+        data: bytes,
+        graph: str | None = None,
+        content_type: str = "text/turtle",
+        client: httpx.AsyncClient | None = None,
+    ) -> tuple[bool, int]:
+        """Post a batch into an open transaction; it is applied at the commit."""
+        return await self._post(data, graph, content_type, client, transaction)
+
+    async def upload_stream(
+        self,
+        chunks: AsyncIterable[bytes],
+        graph: str | None = None,
+        content_type: str = "text/turtle",
+        client: httpx.AsyncClient | None = None,
+    ) -> tuple[bool, int]:
+        """
+        Post a whole file as one request with a chunked body.
+
+        The chunks are sent as they are read, so the file never has to fit in
+        memory and the store commits it once.
+        """
+        if client is None:
+            async with httpx.AsyncClient(timeout=self.timeout) as own_client:
+                return await self.upload_stream(chunks, graph, content_type, own_client)
+
+        headers = {"Content-Type": content_type}
+        content = chunks
+        if self.content_encoding:
+            content = compress_stream(chunks, self.content_encoding)
+            headers["Content-Encoding"] = self.content_encoding
+
+        response = await client.post(
+            self.get_upload_url(graph),
+            params=self.get_params(graph),
+            content=content,
+            headers=headers,
+            auth=self.auth or httpx.USE_CLIENT_DEFAULT,
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return True, response.status_code
 
 
 class BlazegraphEndpoint(EndpointStrategy):
+    supported_encodings = frozenset({RequestCompression.GZIP})
+    supports_streaming = True
+
     def get_upload_url(self, graph: str | None = None) -> str:
         return f"{self.endpoint_url}/sparql"
 
@@ -91,61 +324,28 @@ def get_auth(self) -> httpx.Auth | None:
             return None
         return httpx.DigestAuth(self.username, self.password)
 
-    def _convert_turtle_to_ntriples(self, turtle_data: str) -> str | None:
-        """
-        Convert Turtle format to N-Triples for MarkLogic compatibility.
-        Returns None if conversion fails.
-        """
-        from rdflib import Graph
-
-        try:
-            # Add missing SKOS prefix if needed
-            if "skos:" in turtle_data and "@prefix skos:" not in turtle_data:
-                skos_prefix = "@prefix skos: <http://www.w3.org/2004/02/skos/core#> .\n"
-                turtle_data = skos_prefix + turtle_data
-
-            g = Graph()
-            g.parse(data=turtle_data, format="turtle")
-            nt_data = g.serialize(format="nt")
-
-            if isinstance(nt_data, bytes):
-                return nt_data.decode("utf-8")
-            return nt_data
-
-        except Exception as e:
-            print(f"Error: Turtle to N-Triples conversion failed: {e}")
-            return None
-
     async def upload(
         self,
-        data: str,
+        data: bytes,
         graph: str | None = None,
         content_type: str = "text/turtle",
+        client: httpx.AsyncClient | None = None,
     ) -> tuple[bool, int]:
         # Convert Turtle to N-Triples for MarkLogic compatibility
         if content_type == "text/turtle":
-            converted_data = self._convert_turtle_to_ntriples(data)
+            # Parsing is CPU-bound, keep it off the event loop
+            loop = asyncio.get_running_loop()
+            converted_data = await loop.run_in_executor(
+                self.executor, convert_turtle_to_ntriples, data.decode("utf-8")
+            )
             if converted_data is None:
                 raise ValueError(
                     "Failed to convert Turtle format to N-Triples. File may contain invalid Turtle syntax."
                 )
-            data = converted_data
+            data = converted_data.encode("utf-8")
             content_type = "application/n-triples"
 
-        url = self.get_upload_url(graph)
-        params = self.get_params(graph)
-        headers = {"Content-Type": content_type}
-        auth = self.get_auth()
-
-        async with httpx.AsyncClient(timeout=self.timeout, auth=auth) as client:
-            response = await client.post(
-                url,
-                params=params,
-                content=data,
-                headers=headers,
-            )
-            response.raise_for_status()
-            return True, response.status_code
+        return await self._post(data, graph, content_type, client)
 
 
 class NeptuneEndpoint(EndpointStrategy):
@@ -159,6 +359,10 @@ def get_params(self, graph: str | None = None) -> dict[str, str]:
 
 
 class RDFoxEndpoint(EndpointStrategy):
+    supported_encodings = frozenset({RequestCompression.GZIP})
+    supports_streaming = True
+    supports_transactions = True
+
     def __init__(
         self,
         endpoint_url: str,
@@ -176,8 +380,67 @@ def get_upload_url(self, graph: str | None = None) -> str:
     def get_params(self, graph: str | None = None) -> dict[str, str]:
         return {}
 
+    # A transaction lives on a connection of the datastore, which requests
+    # name with the connection parameter; its ID is the ID of the connection
+    def _connection_url(self, connection: str) -> str:
+        return (
+            f"{self.endpoint_url}/datastores/{self.store_name}/connections/{connection}"
+        )
+
+    async def begin_transaction(self, client: httpx.AsyncClient) -> str:
+        response = await self._request(
+            client,
+            "POST",
+            f"{self.endpoint_url}/datastores/{self.store_name}/connections",
+        )
+        connection = response.headers["Location"].rstrip("/").rsplit("/", 1)[-1]
+        try:
+            await self._request(
+                client,
+                "POST",
+                f"{self._connection_url(connection)}/transaction",
+                {"type": "read-write"},
+            )
+        except httpx.HTTPError:
+            with contextlib.suppress(httpx.HTTPError):
+                await self._request(client, "DELETE", self._connection_url(connection))
+            raise
+        return connection
+
+    async def _end_transaction(
+        self, transaction: str, operation: str, client: httpx.AsyncClient
+    ) -> None:
+        try:
+            await self._request(
+                client,
+                "POST",
+                f"{self._connection_url(transaction)}/transaction",
+                {"operation": operation},
+            )
+        finally:
+            with contextlib.suppress(httpx.HTTPError):
+                await self._request(client, "DELETE", self._connection_url(transaction))
+
+    async def commit_transaction(
+        self, transaction: str, client: httpx.AsyncClient
+    ) -> None:
+        await self._end_transaction(transaction, "commit", client)
+
+    async def rollback_transaction(
+        self, transaction: str, client: httpx.AsyncClient
+    ) -> None:
+        await self._end_transaction(transaction, "rollback", client)
+
+    def get_transaction_params(
+        self, transaction: str, graph: str | None
+    ) -> dict[str, str]:
+        return {"connection": transaction}
+
 
 class StardogEndpoint(EndpointStrategy):
+    supported_encodings = frozenset({RequestCompression.GZIP})
+    supports_transactions = True
+
     def get_upload_url(self, graph: str | None = None) -> str:
         if graph:
             return f"{self.endpoint_url}?graph={graph}"
@@ -186,6 +449,34 @@ def get_upload_url(self, graph: str | None = None) -> str:
     def get_params(self, graph: str | None = None) -> dict[str, str]:
         return {}
 
+    async def begin_transaction(self, client: httpx.AsyncClient) -> str:
+        response = await self._request(
+            client, "POST", f"{self.endpoint_url}/transaction/begin"
+        )
+        return response.text.strip()
+
+    async def commit_transaction(
+        self, transaction: str, client: httpx.AsyncClient
+    ) -> None:
+        await self._request(
+            client, "POST", f"{self.endpoint_url}/transaction/commit/{transaction}"
+        )
+
+    async def rollback_transaction(
+        self, transaction: str, client: httpx.AsyncClient
+    ) -> None:
+        await self._request(
+            client, "POST", f"{self.endpoint_url}/transaction/rollback/{transaction}"
+        )
+
+    def get_transaction_upload_url(self, transaction: str, graph: str | None) -> str:
+        return f"{self.endpoint_url}/{transaction}/add"
+
+    def get_transaction_params(
+        self, transaction: str, graph: str | None
+    ) -> dict[str, str]:
+        return {"graph-uri": graph} if graph else {}
+
 
 def create_endpoint_strategy(
     endpoint_type: EndpointType,
@@ -210,7 +501,7 @@ def create_endpoint_strategy(
 
 
 class EndpointClient:
-    def __init__(
+    def __init__(  # noqa: C901
         self,
         endpoint_url: str | None = None,
         endpoint_type: EndpointType = EndpointType.GENERIC,
@@ -219,6 +510,15 @@ def __init__(
         password: str | None = None,
         content_type: str | None = None,
         store_name: str | None = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 5.0,
+        http2: bool = False,  # noqa: FBT001, FBT002
+        warmup_connections: int = 0,
+        cpu_workers: int = 0,
+        compress_requests: RequestCompression = RequestCompression.NONE,
+        retry_policy: RetryPolicy | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
     ) -> None:
         self._endpoint_type = endpoint_type
 
@@ -271,6 +571,105 @@ def __init__(
             password=self._password,
             store_name=self._store_name,
         )
+        # Stores that do not accept the requested encoding get plain bodies
+        if compress_requests in self.endpoint_strategy.supported_encodings:
+            self.endpoint_strategy.content_encoding = compress_requests
+        elif compress_requests != RequestCompression.NONE:
+            logger.warning(
+                "%s endpoints do not accept %s request bodies, "
+                "sending them uncompressed",
+                endpoint_type.value,
+                compress_requests.value,
+            )
+
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._http2 = http2
+        self._warmup_connections = warmup_connections
+        self._http_client: httpx.AsyncClient | None = None
+        self._cpu_workers = cpu_workers
+        self._process_pool: ProcessPoolExecutor | None = None
+        self._transport = transport
+        self.retry_policy = retry_policy or RetryPolicy()
+
+    async def __aenter__(self) -> Self:
+        await self.open()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def open(self) -> None:
+        """
+        Open the pooled HTTP client shared by all uploads through this client.
+
+        Until the client is opened every upload uses its own short-lived connection.
+        With ``cpu_workers`` set, a process pool for CPU-bound data conversions is
+        started as well.
+        """
+        if self._http_client is not None:
+            return
+
+        self._http_client = httpx.AsyncClient(
+            timeout=self._timeout,
+            limits=self._limits,
+            http2=self._http2,
+            transport=self._transport,
+        )
+        if self._cpu_workers > 0:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self._cpu_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            self.endpoint_strategy.executor = self._process_pool
+        if self._warmup_connections > 0:
+            await self.warmup(self._warmup_connections)
+
+    async def aclose(self) -> None:
+        if self._process_pool is not None:
+            process_pool, self._process_pool = self._process_pool, None
+            self.endpoint_strategy.executor = None
+            await asyncio.to_thread(process_pool.shutdown)
+        if self._http_client is None:
+            return
+        http_client, self._http_client = self._http_client, None
+        await http_client.aclose()
+
+    async def warmup(self, connections: int) -> None:
+        """
+        Establish connections to the endpoint ahead of the first batch.
+
+        The requests are issued concurrently so each one opens its own connection,
+        which is then kept alive in the pool. Response status codes are ignored,
+        and connections that cannot be opened are logged and left to the uploads.
+        """
+        if self._http_client is None:
+            raise RuntimeError("Client must be opened before warming up")  # noqa: TRY003
+
+        http_client = self._http_client
+        url = str(self._endpoint_url)
+
+        async def open_connection() -> None:
+            try:
+                await http_client.head(url)
+            except httpx.TransportError as e:
+                logger.warning("Could not warm up a connection to %s: %s", url, e)
+
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(connections):
+                tg.create_task(open_connection())
+
+    @property
+    def http_client(self) -> httpx.AsyncClient | None:
+        return self._http_client
 
     @property
     def endpoint_url(self) -> str | None:
@@ -298,14 +697,131 @@ def store_name(self) -> str | None:
 
     async def upload_data(
         self,
-        data: str,
+        data: bytes | str,
+        graph: str | None = None,
+        content_type: str | None = None,
+        on_retry: Callable[[int, Exception], None] | None = None,
+    ) -> tuple[bool, int]:
+        """
+        Upload one batch, retrying transient failures.
+
+        Batches read from files are bytes and are sent as they are; text is
+        encoded as UTF-8 once, before the first attempt.
+
+        Connection errors and retryable status codes (see ``RETRYABLE_STATUS_CODES``)
+        are retried according to ``retry_policy``, waiting as long as a
+        ``Retry-After`` header asks for up to the maximum backoff. ``on_retry`` is called with the retry
+        number and the error before every retry; the last error is re-raised once
+        the retries are used up.
+        """
+        actual_content_type = content_type or self.content_type or "text/turtle"
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        body = data
+
+        return await self._with_retries(
+            lambda: self.endpoint_strategy.upload(
+                data=body,
+                graph=graph,
+                content_type=actual_content_type,
+                client=self._http_client,
+            ),
+            on_retry,
+        )
+
+    async def upload_stream(
+        self,
+        open_stream: Callable[[], AsyncIterable[bytes]],
+        graph: str | None = None,
+        content_type: str | None = None,
+        on_retry: Callable[[int, Exception], None] | None = None,
+    ) -> tuple[bool, int]:
+        """
+        Upload a whole file as one streamed request, retrying transient failures.
+
+        ``open_stream`` is called for every attempt and returns the chunks of
+        the file from its start, since a streamed body cannot be sent twice.
+        Retries follow ``retry_policy`` as in ``upload_data``.
+        """
+        if not self.endpoint_strategy.supports_streaming:
+            raise ValueError(  # noqa: TRY003
+                f"{self._endpoint_type.value} endpoints do not take streamed uploads"
+            )
+        actual_content_type = content_type or self.content_type or "text/turtle"
+        return await self._with_retries(
+            lambda: self.endpoint_strategy.upload_stream(
+                open_stream(),
+                graph=graph,
+                content_type=actual_content_type,
+                client=self._http_client,
+            ),
+            on_retry,
+        )
+
+    def _pooled_client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            raise RuntimeError("Client must be opened before using transactions")  # noqa: TRY003
+        return self._http_client
+
+    async def begin_transaction(self) -> str:
+        """
+        Open a transaction of the store and return its ID.
+
+        Batches posted with ``upload_in_transaction`` are applied together by
+        ``commit_transaction``, or dropped by ``rollback_transaction``.
+        """
+        if not self.endpoint_strategy.supports_transactions:
+            raise ValueError(  # noqa: TRY003
+                f"{self._endpoint_type.value} endpoints do not support transactions"
+            )
+        return await self.endpoint_strategy.begin_transaction(self._pooled_client())
+
+    async def upload_in_transaction(
+        self,
+        transaction: str,
+        data: bytes,
         graph: str | None = None,
         content_type: str | None = None,
+        on_retry: Callable[[int, Exception], None] | None = None,
     ) -> tuple[bool, int]:
+        """Upload one batch into a transaction, retrying as ``upload_data`` does."""
         actual_content_type = content_type or self.content_type or "text/turtle"
+        http_client = self._pooled_client()
+        return await self._with_retries(
+            lambda: self.endpoint_strategy.upload_in_transaction(
+                transaction, data, graph, actual_content_type, http_client
+            ),
+            on_retry,
+        )
+
+    async def commit_transaction(self, transaction: str) -> None:
+        await self.endpoint_strategy.commit_transaction(
+            transaction, self._pooled_client()
+        )
 
-        return await self.endpoint_strategy.upload(
-            data=data,
-            graph=graph,
-            content_type=actual_content_type,
+    async def rollback_transaction(self, transaction: str) -> None:
+        await self.endpoint_strategy.rollback_transaction(
+            transaction, self._pooled_client()
         )
+
+    async def _with_retries(
+        self,
+        send: Callable[[], Awaitable[tuple[bool, int]]],
+        on_retry: Callable[[int, Exception], None] | None,
+    ) -> tuple[bool, int]:
+        attempt = 0
+        while True:
+            try:
+                return await send()
+            except httpx.HTTPError as e:
+                if attempt >= self.retry_policy.max_retries or not is_retryable(e):
+                    raise
+                attempt += 1
+                retry_after = (
+                    retry_after_seconds(e.response)
+                    if isinstance(e, httpx.HTTPStatusError)
+                    else None
+                )
+                if on_retry:
+                    on_retry(attempt, e)
+                await asyncio.sleep(self.retry_policy.delay(attempt, retry_after))
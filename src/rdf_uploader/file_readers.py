@@ -1,5 +1,109 @@
 import asyncio
+import bisect
+import bz2
+import contextlib
+import gzip
+import io
+import lzma
+import mmap
+import os
+import re
+import sys
+from collections.abc import AsyncGenerator, Callable, Iterator
 from pathlib import Path
+from typing import BinaryIO, Generic, NamedTuple, TypeVar, cast
+
+from rdf_uploader.sharding import HashRing
+from rdf_uploader.turtle import Statement, split_statements
+
+T = TypeVar("T")
+K = TypeVar("K")
+
+_END_OF_STREAM = object()
+
+READ_BLOCK_SIZE = 1024 * 1024
+
+# Size of the blocks N-Triples and N-Quads files are scanned in
+SCAN_BLOCK_SIZE = 16 * 1024 * 1024
+
+# A newline followed by a blank or comment line; the line starts after the newline
+_SKIPPED_LINE = re.compile(rb"\n[ \t\r\f\v]*(?=[#\n]|\Z)")
+_SKIPPED_FIRST_LINE = re.compile(rb"[ \t\r\f\v]*(?:[#\n]|\Z)")
+
+# Up to this many newlines are located one by one instead of by counting
+_LINEAR_SCAN_LINES = 64
+
+# Data held in the per-graph buffers of GraphRoutingReader before the largest
+# one is sent early
+GRAPH_BUFFER_BYTES = 64 * 1024 * 1024
+
+# An N-Quads statement; group 1 is the graph term, if any
+_NODE = rb"(?:<[^>]*>|_:[^\s<\"]+?)"
+_LITERAL = rb'"(?:[^"\\]|\\.)*"(?:@[A-Za-z0-9-]+|\^\^<[^>]*>)?'
+_QUAD = re.compile(
+    rb"[ \t]*" + _NODE + rb"[ \t]+<[^>]*>[ \t]+(?:" + _NODE + rb"|" + _LITERAL + rb")"
+    rb"[ \t]*(?:(" + _NODE + rb")[ \t]*)?\.[ \t]*(?:#.*)?\r?"
+)
+
+
+# IRIs and literals, where "_:" does not start a blank node label
+_BLANK_NODE_LABEL = re.compile(rb'(<[^>\n]*>|"(?:[^"\\\n]|\\.)*")|_:')
+
+
+class Batch(NamedTuple):
+    """A chunk of RDF data ready to be posted to an endpoint."""
+
+    # Raw (decompressed) file content, posted without decoding it
+    data: bytes
+    triple_count: int
+    # Number of bytes of the (decompressed) data consumed once this batch has been read
+    end_offset: int
+    # Number of bytes of the file on disk consumed so far, for progress reporting
+    bytes_read: int
+    # Named graph the batch belongs in; None uploads it to the target graph
+    graph: str | None = None
+    # Index of the endpoint the batch goes to when the data is sharded
+    shard: int | None = None
+    # Batch size the batch was started with; None when the size did not apply
+    limit: int | None = None
+
+
+class CoalescedBatch(NamedTuple):
+    """A chunk of RDF data taken from several small files."""
+
+    data: bytes
+    triple_count: int
+    # Files with data in this batch
+    files: tuple[Path, ...]
+    # Number of bytes of the files on disk consumed so far, for progress reporting
+    bytes_read: int
+    # Files that could not be read since the previous batch, with the error
+    errors: tuple[tuple[Path, Exception], ...] = ()
+    # Batch size the batch was started with
+    limit: int | None = None
+
+
+def _fixed_size(size: int) -> Callable[[], int]:
+    return lambda: size
+
+
+def _skip(stream: io.BufferedIOBase, count: int) -> None:
+    if count <= 0:
+        return
+    # Decompressing streams seek forward by reading, some cannot seek at all
+    if stream.seekable():
+        stream.seek(count)
+        return
+    while count > 0:
+        data = stream.read(min(count, READ_BLOCK_SIZE))
+        if not data:
+            return
+        count -= len(data)
+
+
+class _ProducerFailure:
+    def __init__(self, error: Exception):
+        self.error = error
 
 
 async def count_file_lines(file_path: Path) -> int:
@@ -15,96 +119,852 @@ async def read_file_content(file_path: Path) -> str:
     return task.result()
 
 
-def detect_content_type(file_path: Path) -> str:
+async def iterate_in_thread(
+    iterator: Iterator[T], queue_depth: int = 4
+) -> AsyncGenerator[T, None]:
+    """
+    Drive a blocking iterator from a worker thread through a bounded queue.
+
+    The producer runs ahead of the consumer by at most ``queue_depth`` items, so
+    reading overlaps with whatever the consumer does with each item while memory
+    stays bounded. Exceptions raised by the iterator are re-raised to the consumer.
+    """
+    queue: asyncio.Queue[object] = asyncio.Queue(maxsize=max(queue_depth, 1))
+
+    async def produce() -> None:
+        while True:
+            step = asyncio.ensure_future(
+                asyncio.to_thread(next, iterator, _END_OF_STREAM)
+            )
+            try:
+                item = await asyncio.shield(step)
+            except asyncio.CancelledError:
+                # The iterator can only be closed once the pending read is done
+                await asyncio.wait([step])
+                if not step.cancelled():
+                    step.exception()
+                raise
+            except Exception as e:  # noqa: BLE001
+                await queue.put(_ProducerFailure(e))
+                return
+
+            await queue.put(item)
+            if item is _END_OF_STREAM:
+                return
+
+    producer = asyncio.create_task(produce())
+    try:
+        while (item := await queue.get()) is not _END_OF_STREAM:
+            if isinstance(item, _ProducerFailure):
+                raise item.error
+            yield cast("T", item)
+    finally:
+        producer.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await producer
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+
+def _open_zstd(raw: BinaryIO) -> io.BufferedIOBase:
+    try:
+        import zstandard  # noqa: PLC0415
+    except ImportError as e:
+        raise ImportError(  # noqa: TRY003
+            "Reading .zst files requires the zstandard package "
+            "(pip install 'rdf-uploader[zstd]')"
+        ) from e
+    reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=False)
+    return io.BufferedReader(reader, READ_BLOCK_SIZE)
+
+
+# Openers wrap the file on disk; the caller closes the returned stream
+COMPRESSION_OPENERS: dict[str, Callable[[BinaryIO], io.BufferedIOBase]] = {
+    ".gz": lambda raw: gzip.GzipFile(fileobj=raw, mode="rb"),
+    ".bz2": lambda raw: bz2.BZ2File(raw, mode="rb"),
+    ".xz": lambda raw: lzma.LZMAFile(raw, mode="rb"),  # noqa: SIM115
+    ".zst": _open_zstd,
+}
+
+
+def compression_suffix(file_path: Path) -> str | None:
+    """Return the compression suffix of the file (e.g. ``.gz``), if any."""
     suffix = file_path.suffix.lower()
+    return suffix if suffix in COMPRESSION_OPENERS else None
+
 
-    content_types = {
-        ".ttl": "text/turtle",
-        ".turtle": "text/turtle",
-        ".nt": "application/n-triples",
-        ".n3": "text/n3",
-        ".nq": "application/n-quads",
-        ".nquads": "application/n-quads",
-        ".rdf": "application/rdf+xml",
-        ".xml": "application/rdf+xml",
-        ".jsonld": "application/ld+json",
-        ".json": "application/rdf+json",
-        ".trig": "application/trig",
-    }
+def format_suffix(file_path: Path) -> str:
+    """Return the suffix naming the RDF format, looking inside compression suffixes."""
+    if compression_suffix(file_path):
+        file_path = file_path.with_suffix("")
+    return file_path.suffix.lower()
 
-    return content_types.get(suffix, "text/turtle")
+
+CONTENT_TYPES = {
+    ".ttl": "text/turtle",
+    ".turtle": "text/turtle",
+    ".nt": "application/n-triples",
+    ".n3": "text/n3",
+    ".nq": "application/n-quads",
+    ".nquads": "application/n-quads",
+    ".rdf": "application/rdf+xml",
+    ".owl": "application/rdf+xml",
+    ".xml": "application/rdf+xml",
+    ".jsonld": "application/ld+json",
+    ".json": "application/rdf+json",
+    ".trig": "application/trig",
+}
+
+
+def detect_content_type(file_path: Path) -> str:
+    suffix = format_suffix(file_path)
+    return CONTENT_TYPES.get(suffix, "text/turtle")
 
 
 class FileReader:
+    # Format of the batches when it differs from the format of the file
+    content_type: str | None = None
+
     def __init__(self, file_path: Path):
         self.file_path = file_path
+        self.compression = compression_suffix(file_path)
 
-    async def read_all(self) -> str:
-        async with asyncio.TaskGroup() as tg:
-            task = tg.create_task(
-                asyncio.to_thread(lambda: self.file_path.read_text(encoding="utf-8"))
-            )
-        return task.result()
+    def size(self) -> int:
+        """Size of the file on disk, i.e. compressed size for compressed files."""
+        return self.file_path.stat().st_size
+
+    @contextlib.contextmanager
+    def _open(self) -> Iterator[tuple[io.BufferedIOBase, BinaryIO]]:
+        """
+        Open the file for reading, decompressing it on the fly if needed.
+
+        Yields the stream of (decompressed) data and the underlying file, whose
+        position tells how much of the file on disk has been consumed.
+        """
+        with self.file_path.open("rb") as raw:
+            if self.compression is None:
+                yield raw, raw
+                return
+            with COMPRESSION_OPENERS[self.compression](raw) as stream:
+                yield stream, raw
+
+    def _bytes_read(self, raw: BinaryIO, offset: int) -> int:
+        # Decompressors read ahead, so for compressed files this is approximate
+        return raw.tell() if self.compression else offset
+
+    def _read_bytes(self) -> bytes:
+        with self._open() as (stream, _):
+            return stream.read()
 
     async def count_triples(self) -> int:
         raise NotImplementedError("Subclasses must implement this method")
 
-    async def read_batches(self, batch_size: int = 100) -> list[tuple[str, int]]:
+    async def read_chunks(
+        self, chunk_size: int = READ_BLOCK_SIZE, queue_depth: int = 4
+    ) -> AsyncGenerator[tuple[bytes, int], None]:
+        """
+        Stream the data of the file as it is, decompressed, in chunks.
+
+        Every chunk comes with the number of bytes of the file read so far. The
+        file is read in a worker thread that stays at most ``queue_depth``
+        chunks ahead of the consumer, so memory stays constant whatever the
+        size of the file.
+        """
+        chunks = iterate_in_thread(self._iter_chunks(chunk_size), queue_depth)
+        async with contextlib.aclosing(chunks):
+            async for chunk in chunks:
+                yield chunk
+
+    def _iter_chunks(self, chunk_size: int) -> Iterator[tuple[bytes, int]]:
+        with self._open() as (stream, raw):
+            offset = 0
+            while chunk := stream.read(chunk_size):
+                offset += len(chunk)
+                yield chunk, self._bytes_read(raw, offset)
+
+    async def read_batches(
+        self,
+        batch_size: int | Callable[[], int] | None = 100,
+        queue_depth: int = 4,
+        start_offset: int = 0,
+        batch_bytes: int | None = None,
+    ) -> AsyncGenerator[Batch, None]:
+        """
+        Stream batches from the file.
+
+        Every batch carries its exact triple count and the number of bytes of the
+        file read so far, so progress can be tracked without a separate counting
+        pass over the file.
+
+        The file is read in a worker thread that stays at most ``queue_depth``
+        batches ahead of the consumer. ``batch_size`` may also be a callable that
+        is asked for the size of every new batch, so it can change while the file
+        is being read.
+
+        ``batch_bytes`` caps the size of the data in a batch, so that batches of
+        triples with long literals stay within server request limits. Data that
+        alone exceeds it, such as a single long line, still forms one batch.
+        With ``batch_bytes`` given, ``batch_size`` may be None to cap the batch
+        by size only.
+
+        ``start_offset`` resumes reading at the ``end_offset`` of an earlier batch.
+        """
+        if batch_size is None:
+            batch_size = sys.maxsize
+        if not callable(batch_size):
+            batch_size = _fixed_size(batch_size)
+        batches = iterate_in_thread(
+            self._iter_batches(batch_size, start_offset, batch_bytes), queue_depth
+        )
+        async with contextlib.aclosing(batches):
+            async for batch in batches:
+                yield batch
+
+    def _iter_batches(
+        self,
+        batch_size: Callable[[], int],
+        start_offset: int = 0,
+        batch_bytes: int | None = None,
+    ) -> Iterator[Batch]:
         raise NotImplementedError("Subclasses must implement this method")
 
 
+class _LineBlock:
+    """
+    A block of N-Triples or N-Quads data that starts and ends at line boundaries.
+
+    Lines are never split into Python objects. The few blank and comment lines
+    are located up front with a single regular expression search, and the end
+    of a run of lines is found by jumping ahead by the expected length of the
+    lines and counting the newlines skipped with ``bytes.count``, so a block is
+    scanned about once in C rather than once per line in Python.
+    """
+
+    def __init__(self, data: bytes):
+        self.data = data
+        size = len(data)
+        # Start offsets of the blank and comment lines, in ascending order
+        self.skipped = [m.start() + 1 for m in _SKIPPED_LINE.finditer(data)]
+        if self.skipped and self.skipped[-1] >= size:
+            # The "line" after the final newline
+            self.skipped.pop()
+        if size and _SKIPPED_FIRST_LINE.match(data):
+            self.skipped.insert(0, 0)
+        # Refined as lines are counted
+        sample = min(size, READ_BLOCK_SIZE)
+        self._line_length = sample // (data.count(b"\n", 0, sample) + 1) + 1
+
+    @property
+    def data_line_count(self) -> int:
+        return self._line_count(0, len(self.data)) - len(self.skipped)
+
+    def _line_count(self, start: int, end: int) -> int:
+        count = self.data.count(b"\n", start, end)
+        # A last line without a newline at the end of the file
+        if end == len(self.data) and end > start and self.data[end - 1] != ord("\n"):
+            count += 1
+        return count
+
+    def _skipped_count(self, start: int, end: int) -> int:
+        return bisect.bisect_left(self.skipped, end) - bisect.bisect_left(
+            self.skipped, start
+        )
+
+    def _after_newlines(self, start: int, count: int, stop: int) -> int | None:
+        """Return the offset just past the ``count``-th newline from ``start``."""
+        data = self.data
+        size = stop
+        low = start
+        while count > _LINEAR_SCAN_LINES:
+            # Aim a little short, the rest is found one newline at a time
+            high = min(
+                low + (count - _LINEAR_SCAN_LINES // 2) * self._line_length, size
+            )
+            found = data.count(b"\n", low, high)
+            if found > count + _LINEAR_SCAN_LINES:
+                # Lines are shorter than expected, aim again
+                self._line_length = max((high - low) // found, 1)
+                continue
+            if found >= count:
+                # Overshot by a few lines, walk back to the last one wanted
+                end = high
+                for _ in range(found - count + 1):
+                    end = data.rfind(b"\n", low, end)
+                return end + 1
+            if found:
+                self._line_length = (high - low) // found + 1
+            if high == size:
+                return None
+            count -= found
+            low = high
+
+        for _ in range(count):
+            low = data.find(b"\n", low, size) + 1
+            if low == 0:
+                return None
+        return low
+
+    def lines_within(
+        self, start: int, budget: int | None, *, first: bool
+    ) -> int | None:
+        """
+        Return the end of the whole lines from ``start`` that fit in ``budget`` bytes.
+
+        Returns None if not even the next line fits, unless it is the ``first``
+        line of a batch: a line longer than the budget forms a batch of its own.
+        """
+        data = self.data
+        if budget is None or start + budget >= len(data):
+            return len(data)
+        # The budget is used up once a long line overshot it
+        stop = data.rfind(b"\n", start, start + budget) + 1 if budget > 0 else 0
+        if stop > start:
+            return stop
+        if not first:
+            return None
+        return data.find(b"\n", start) + 1 or len(data)
+
+    def advance(self, start: int, count: int, stop: int) -> tuple[int, int]:
+        """
+        Find the end of the ``count``-th data line from ``start``.
+
+        Returns the offset just past that line and the number of data lines
+        before it, or ``stop`` and the data lines before it if there are fewer.
+        ``stop`` is either the end of the block or the end of a line.
+        """
+        lines = count
+        while True:
+            end = self._after_newlines(start, lines, stop)
+            if end is None:
+                found = self._line_count(start, stop) - self._skipped_count(start, stop)
+                return stop, found
+            found = lines - self._skipped_count(start, end)
+            if found >= count:
+                return end, found
+            # Skip over as many more lines as were blank or comments
+            lines += count - found
+
+
 class LineBasedReader(FileReader):
+    """
+    Batch N-Triples and N-Quads files, one triple or quad per line.
+
+    Uncompressed files are memory-mapped and compressed files are decompressed
+    in blocks. Either way the data is scanned block by block (see ``_LineBlock``)
+    and every batch is a slice of the file taken between two line boundaries,
+    instead of being assembled line by line.
+    """
+
     async def count_triples(self) -> int:
         async with asyncio.TaskGroup() as tg:
             task = tg.create_task(asyncio.to_thread(self._count_lines))
         return task.result()
 
     def _count_lines(self) -> int:
+        with self._open() as (f, _):
+            return sum(
+                _LineBlock(data).data_line_count for _, data in self._iter_blocks(f)
+            )
+
+    def _iter_blocks(
+        self, f: io.BufferedIOBase, start_offset: int = 0
+    ) -> Iterator[tuple[int, bytes]]:
+        """Yield the offset and data of blocks of the file ending at line boundaries."""
+        if self.compression is None:
+            yield from self._iter_mapped_blocks(f, start_offset)
+            return
+
+        _skip(f, start_offset)
+        offset = start_offset
+        rest = b""
+        while block := f.read(SCAN_BLOCK_SIZE):
+            data = rest + block if rest else block
+            end = data.rfind(b"\n") + 1
+            if end == 0:
+                # No complete line yet
+                rest = data
+                continue
+            yield offset, data[:end]
+            offset += end
+            rest = data[end:]
+        if rest:
+            yield offset, rest
+
+    def _iter_mapped_blocks(
+        self, f: io.BufferedIOBase, start_offset: int
+    ) -> Iterator[tuple[int, bytes]]:
+        size = os.fstat(f.fileno()).st_size
+        if start_offset >= size:
+            # Empty files cannot be mapped
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            offset = start_offset
+            while offset < size:
+                end = size
+                if offset + SCAN_BLOCK_SIZE < size:
+                    end = mapped.rfind(b"\n", offset, offset + SCAN_BLOCK_SIZE) + 1
+                    if end <= offset:
+                        # A line longer than a block
+                        end = mapped.find(b"\n", offset + SCAN_BLOCK_SIZE) + 1 or size
+                yield offset, mapped[offset:end]
+                offset = end
+
+    def _iter_batches(
+        self,
+        batch_size: Callable[[], int],
+        start_offset: int = 0,
+        batch_bytes: int | None = None,
+    ) -> Iterator[Batch]:
+        with self._open() as (f, raw):
+            pieces: list[bytes] = []
+            count = 0
+            size = 0
+            end_offset = start_offset
+            limit = max(batch_size(), 1)
+
+            def make_batch() -> Batch:
+                return Batch(
+                    b"".join(pieces),
+                    count,
+                    end_offset,
+                    self._bytes_read(raw, end_offset),
+                    limit=limit,
+                )
+
+            for offset, data in self._iter_blocks(f, start_offset):
+                block = _LineBlock(data)
+                start = 0
+                while start < len(data):
+                    remaining = None if batch_bytes is None else batch_bytes - size
+                    stop = block.lines_within(start, remaining, first=not size)
+                    if stop is not None:
+                        end, found = block.advance(start, limit - count, stop)
+                        pieces.append(data[start:end])
+                        count += found
+                        size += end - start
+                        start = end
+                        end_offset = offset + end
+                    # Full with enough triples or once the next line does not fit
+                    if stop is None or count >= limit or start == stop < len(data):
+                        if count:
+                            yield make_batch()
+                        pieces, count, size = [], 0, 0
+                        limit = max(batch_size(), 1)
+
+            if count:
+                yield make_batch()
+
+
+def relabel_blank_nodes(data: bytes, prefix: bytes) -> bytes:
+    """
+    Prefix the blank node labels of N-Triples or N-Quads data.
+
+    Blank node labels are local to a file, so the labels of different files
+    must be told apart before their data is posted together.
+    """
+    if b"_:" not in data:
+        return data
+    return _BLANK_NODE_LABEL.sub(lambda m: m.group(1) or b"_:" + prefix, data)
+
+
+class CoalescingReader:
+    """
+    Batch the triples of many small N-Triples or N-Quads files together.
+
+    The files are read whole, one after the other, and their lines are packed
+    into batches as if they were a single file, so batches are full however
+    small the files are. Every batch tells which files it holds data of, so a
+    failed request can be traced back to them. Files that cannot be read are
+    reported with the next batch instead of stopping the others.
+    """
+
+    def __init__(self, file_paths: list[Path]):
+        self.file_paths = file_paths
+
+    async def read_batches(
+        self,
+        batch_size: int | Callable[[], int] | None = 100,
+        queue_depth: int = 4,
+        batch_bytes: int | None = None,
+    ) -> AsyncGenerator[CoalescedBatch, None]:
+        """Stream batches from the files, see ``FileReader.read_batches``."""
+        if batch_size is None:
+            batch_size = sys.maxsize
+        if not callable(batch_size):
+            batch_size = _fixed_size(batch_size)
+        batches = iterate_in_thread(
+            self._iter_batches(batch_size, batch_bytes), queue_depth
+        )
+        async with contextlib.aclosing(batches):
+            async for batch in batches:
+                yield batch
+
+    def _read(self, index: int) -> bytes:
+        file_path = self.file_paths[index]
+        data = LineBasedReader(file_path)._read_bytes()  # noqa: SLF001
+        if data and not data.endswith(b"\n"):
+            data += b"\n"
+        # Keep the blank nodes of different files apart
+        return relabel_blank_nodes(data, b"f%d_" % index)
+
+    def _iter_batches(
+        self, batch_size: Callable[[], int], batch_bytes: int | None = None
+    ) -> Iterator[CoalescedBatch]:
+        pieces: list[bytes] = []
         count = 0
-        with self.file_path.open(encoding="utf-8") as f:
-            for line in f:
-                stripped_line = line.strip()
-                if stripped_line and not stripped_line.startswith("#"):
-                    count += 1
-        return count
+        size = 0
+        files: dict[Path, None] = {}
+        errors: list[tuple[Path, Exception]] = []
+        bytes_read = 0
+        limit = max(batch_size(), 1)
+
+        for index, file_path in enumerate(self.file_paths):
+            try:
+                data = self._read(index)
+                bytes_read += file_path.stat().st_size
+            except Exception as e:  # noqa: BLE001
+                errors.append((file_path, e))
+                continue
+
+            files[file_path] = None
+            block = _LineBlock(data)
+            start = 0
+            while start < len(data):
+                remaining = None if batch_bytes is None else batch_bytes - size
+                stop = block.lines_within(start, remaining, first=not size)
+                if stop is not None:
+                    end, found = block.advance(start, limit - count, stop)
+                    pieces.append(data[start:end])
+                    count += found
+                    size += end - start
+                    start = end
+                if stop is None or count >= limit or start == stop < len(data):
+                    if count:
+                        yield CoalescedBatch(
+                            b"".join(pieces),
+                            count,
+                            tuple(files),
+                            bytes_read,
+                            tuple(errors),
+                            limit,
+                        )
+                        # The rest of the file goes into the next batch
+                        files = {file_path: None} if start < len(data) else {}
+                        errors = []
+                    pieces, count, size = [], 0, 0
+                    limit = max(batch_size(), 1)
+
+        if count or files or errors:
+            yield CoalescedBatch(
+                b"".join(pieces), count, tuple(files), bytes_read, tuple(errors), limit
+            )
+
+
+class _RouteBuffer:
+    def __init__(self, first_offset: int, limit: int):
+        self.lines: list[bytes] = []
+        self.count = 0
+        self.size = 0
+        # Offset of the first quad in the buffer
+        self.first_offset = first_offset
+        self.limit = limit
+
+
+class _RoutingReader(LineBasedReader, Generic[K]):
+    """
+    Batch the lines of a file separately per route.
+
+    Every line is routed by ``_route`` into the buffer of its route, and a
+    buffer becomes a batch once it holds ``batch_size`` triples or
+    ``batch_bytes`` bytes. The buffers together hold at most ``buffer_bytes``,
+    beyond which the largest buffer is sent early.
+
+    Buffers are sent out of file order, so the ``end_offset`` of a batch is the
+    offset of the oldest line still buffered. Resuming from it uploads again
+    the lines of other routes sent after it, which a graph store ignores.
+    """
+
+    def __init__(self, file_path: Path, buffer_bytes: int = GRAPH_BUFFER_BYTES):
+        super().__init__(file_path)
+        self.buffer_bytes = buffer_bytes
+
+    def _route(self, line: bytes, offset: int) -> tuple[K, bytes | None]:
+        """Return the route of a line and the data to batch; blank lines have none."""
+        raise NotImplementedError("Subclasses must implement this method")
+
+    def _make_batch(
+        self, route: K, data: bytes, count: int, end_offset: int, bytes_read: int
+    ) -> Batch:
+        raise NotImplementedError("Subclasses must implement this method")
+
+    def _iter_batches(
+        self,
+        batch_size: Callable[[], int],
+        start_offset: int = 0,
+        batch_bytes: int | None = None,
+    ) -> Iterator[Batch]:
+        with self._open() as (f, raw):
+            buffers: dict[K, _RouteBuffer] = {}
+            buffered = 0
+
+            def take(route: K, offset: int) -> Batch:
+                nonlocal buffered
+                buffer = buffers.pop(route)
+                buffered -= buffer.size
+                # Everything before the oldest line still buffered has been sent
+                end_offset = min(
+                    (b.first_offset for b in buffers.values()), default=offset
+                )
+                return self._make_batch(
+                    route,
+                    b"".join(buffer.lines),
+                    buffer.count,
+                    end_offset,
+                    self._bytes_read(raw, end_offset),
+                )._replace(limit=buffer.limit)
+
+            offset = start_offset
+            for block_offset, data in self._iter_blocks(f, start_offset):
+                offset = block_offset
+                for line in data.splitlines(keepends=True):
+                    line_offset = offset
+                    offset += len(line)
+                    route, triple = self._route(line, line_offset)
+                    if triple is None:
+                        continue
 
-    async def read_batches(self, batch_size: int = 100) -> list[tuple[str, int]]:
-        def process_file() -> list[tuple[str, int]]:
-            result = []
-            with self.file_path.open(encoding="utf-8") as f:
-                current_lines = []
-                current_count = 0
-                for line in f:
-                    line_stripped = line.strip()
-                    if line_stripped and not line_stripped.startswith("#"):
-                        current_lines.append(line.rstrip("\n"))
-                        current_count += 1
-                        if current_count >= batch_size:
-                            result.append(("\n".join(current_lines), current_count))
-                            current_lines = []
-                            current_count = 0
-
-                if current_lines:
-                    result.append(("\n".join(current_lines), current_count))
-            return result
-
-        return await asyncio.to_thread(process_file)
+                    buffer = buffers.get(route)
+                    if (
+                        buffer
+                        and batch_bytes
+                        and buffer.size + len(triple) > batch_bytes
+                    ):
+                        yield take(route, line_offset)
+                        buffer = None
+                    if buffer is None:
+                        buffer = buffers[route] = _RouteBuffer(
+                            line_offset, max(batch_size(), 1)
+                        )
+                    buffer.lines.append(triple)
+                    buffer.count += 1
+                    buffer.size += len(triple)
+                    buffered += len(triple)
+
+                    if buffer.count >= buffer.limit:
+                        yield take(route, offset)
+                    elif buffered > self.buffer_bytes:
+                        largest = max(buffers, key=lambda r: buffers[r].size)
+                        yield take(largest, offset)
+
+            # The rest in file order, so the checkpoint keeps moving forward
+            for route in sorted(buffers, key=lambda r: buffers[r].first_offset):
+                yield take(route, offset)
+
+
+class GraphRoutingReader(_RoutingReader[str | None]):
+    """
+    Batch N-Quads per named graph, as N-Triples to be posted to that graph.
+
+    Quads are routed by their graph term, see ``_RoutingReader``. Quads
+    without a graph term go to the target graph of the upload.
+    """
+
+    content_type = "application/n-triples"
+
+    def _make_batch(
+        self,
+        route: str | None,
+        data: bytes,
+        count: int,
+        end_offset: int,
+        bytes_read: int,
+    ) -> Batch:
+        return Batch(data, count, end_offset, bytes_read, graph=route)
+
+    def _route(self, line: bytes, offset: int) -> tuple[str | None, bytes | None]:
+        """Split a line into its graph and the triple; blank lines have no triple."""
+        stripped = line.strip()
+        if not stripped or stripped.startswith(b"#"):
+            return None, None
+        match = _QUAD.fullmatch(line.rstrip(b"\n"))
+        if match is None:
+            raise ValueError(f"Invalid N-Quads statement at byte {offset}")  # noqa: TRY003
+        graph_term = match[1]
+        if graph_term is None:
+            return None, stripped + b"\n"
+        if graph_term.startswith(b"_:"):
+            # The Graph Store Protocol can only address graphs by IRI
+            raise ValueError(  # noqa: TRY003
+                f"Blank node graph name {graph_term.decode()} at byte {offset}"
+            )
+        triple = line[: match.start(1)].rstrip() + b" .\n"
+        return graph_term[1:-1].decode("utf-8"), triple
+
+
+class ShardingReader(_RoutingReader[int]):
+    """
+    Batch N-Triples or N-Quads separately for every shard of a store.
+
+    Lines are routed by their subject onto the ``ring`` of shards, so all the
+    triples of a subject end up in the same shard. A blank node is only known
+    by its label within a file, so the triples of blank nodes are routed the
+    same way as any other subject.
+    """
+
+    def __init__(
+        self, file_path: Path, ring: HashRing, buffer_bytes: int = GRAPH_BUFFER_BYTES
+    ):
+        super().__init__(file_path, buffer_bytes)
+        self.ring = ring
+
+    def _make_batch(
+        self, route: int, data: bytes, count: int, end_offset: int, bytes_read: int
+    ) -> Batch:
+        return Batch(data, count, end_offset, bytes_read, shard=route)
+
+    def _route(self, line: bytes, offset: int) -> tuple[int, bytes | None]:
+        # IRIs and blank node labels cannot contain whitespace
+        terms = line.split(maxsplit=1)
+        if not terms or terms[0].startswith(b"#"):
+            return 0, None
+        return self.ring.node(terms[0]), line if line.endswith(b"\n") else line + b"\n"
+
+
+def _estimate_triples(content: bytes) -> int:
+    return content.count(b";") + content.count(b" .")
 
 
 class WholeFileReader(FileReader):
+    """Upload formats that cannot be split, such as RDF/XML, as a single batch."""
+
     async def count_triples(self) -> int:
-        content = await self.read_all()
-        return content.count(";") + content.count(" .")
+        content = await asyncio.to_thread(self._read_bytes)
+        return _estimate_triples(content)
 
-    async def read_batches(self, batch_size: int = 100) -> list[tuple[str, int]]:
-        content = await self.read_all()
-        triple_count = content.count(";") + content.count(" .")
-        return [(content, triple_count)]
+    def _iter_batches(
+        self,
+        batch_size: Callable[[], int],
+        start_offset: int = 0,
+        batch_bytes: int | None = None,
+    ) -> Iterator[Batch]:
+        content = self._read_bytes()
+        if start_offset >= len(content):
+            return
+        yield Batch(content, _estimate_triples(content), len(content), self.size())
 
 
-def get_reader(file_path: Path) -> FileReader:
-    suffix = file_path.suffix.lower()
+class TurtleReader(FileReader):
+    """
+    Batch Turtle and N3 files at top-level statement boundaries.
 
+    Every batch repeats the ``@prefix``/``@base`` directives seen so far, so it
+    can be parsed on its own. Blank node labels are scoped to a single request,
+    so a labelled blank node shared by statements in different batches becomes
+    distinct nodes, exactly as with batched N-Triples.
+    """
+
+    async def count_triples(self) -> int:
+        return await asyncio.to_thread(self._count_statement_triples)
+
+    def _count_statement_triples(self) -> int:
+        with self._open() as (f, _):
+            return sum(s.triple_count for s in self._iter_statements(f))
+
+    def _iter_statements(self, f: io.BufferedIOBase) -> Iterator[Statement]:
+        return split_statements(iter(lambda: f.read(READ_BLOCK_SIZE), b""))
+
+    def _iter_batches(
+        self,
+        batch_size: Callable[[], int],
+        start_offset: int = 0,
+        batch_bytes: int | None = None,
+    ) -> Iterator[Batch]:
+        with self._open() as (f, raw):
+            yield from self._batch_statements(
+                self._iter_statements(f), raw, batch_size, start_offset, batch_bytes
+            )
+
+    def _batch_statements(
+        self,
+        statements: Iterator[Statement],
+        raw: BinaryIO,
+        batch_size: Callable[[], int],
+        start_offset: int,
+        batch_bytes: int | None = None,
+    ) -> Iterator[Batch]:
+        header: list[bytes] = []
+        body: list[bytes] = []
+        count = 0
+        # Size of the batch content, counting the newline after every statement
+        header_size = 0
+        size = 0
+        end_offset = 0
+        limit = batch_size()
+
+        def make_batch() -> Batch:
+            content = b"\n".join([*header, *body])
+            return Batch(
+                content,
+                count,
+                end_offset,
+                self._bytes_read(raw, end_offset),
+                limit=limit,
+            )
+
+        for statement in statements:
+            if statement.is_directive:
+                # Statements read so far must not see a redefined prefix
+                if body:
+                    yield make_batch()
+                    body, count, size = [], 0, 0
+                header.append(statement.data)
+                header_size += len(statement.data) + 1
+                continue
+            # Already uploaded; the directives before it are kept for what follows
+            if statement.end_offset <= start_offset:
+                continue
+
+            statement_size = len(statement.data) + 1
+            if (
+                body
+                and batch_bytes is not None
+                and header_size + size + statement_size > batch_bytes
+            ):
+                yield make_batch()
+                body, count, size = [], 0, 0
+                limit = batch_size()
+
+            body.append(statement.data)
+            count += statement.triple_count
+            size += statement_size
+            end_offset = statement.end_offset
+            if count >= limit:
+                yield make_batch()
+                body, count, size = [], 0, 0
+                limit = batch_size()
+
+        if body:
+            yield make_batch()
+
+
+def get_reader(
+    file_path: Path,
+    split_graphs: bool = False,  # noqa: FBT001, FBT002
+    shards: HashRing | None = None,
+) -> FileReader:
+    suffix = format_suffix(file_path)
+
+    if shards is not None:
+        if suffix not in {".nt", ".nq", ".nquads"}:
+            raise ValueError(  # noqa: TRY003
+                f"Only N-Triples and N-Quads files can be sharded: {file_path}"
+            )
+        return ShardingReader(file_path, shards)
+    if split_graphs and suffix in {".nq", ".nquads"}:
+        return GraphRoutingReader(file_path)
     if suffix in {".nt", ".nq", ".nquads"}:
         return LineBasedReader(file_path)
+    if suffix in {".ttl", ".turtle", ".n3"}:
+        return TurtleReader(file_path)
     return WholeFileReader(file_path)
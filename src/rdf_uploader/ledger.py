@@ -0,0 +1,113 @@
+"""Ledger of uploaded files, used to skip files that are already loaded."""
+
+import asyncio
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+from types import TracebackType
+from typing import Self
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    content_hash TEXT NOT NULL,
+    target TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    uploaded_at REAL NOT NULL,
+    PRIMARY KEY (content_hash, target)
+);
+CREATE TABLE IF NOT EXISTS file_hashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+);
+"""
+
+
+def file_sha256(file_path: Path) -> str:
+    """Hash a file in blocks, so memory use does not depend on its size."""
+    digest = hashlib.sha256()
+    with file_path.open("rb") as f:
+        while block := f.read(HASH_BLOCK_SIZE):
+            # hashlib releases the GIL, so files can be hashed in parallel threads
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class UploadLedger:
+    """
+    SQLite ledger of the files uploaded to each target.
+
+    Uploads are keyed by the SHA-256 of the file content and the target
+    (endpoint and graph), so a renamed or copied file is still recognised and
+    the same file loaded into another graph is not. The hash of every file is
+    cached with its size and modification time, so unchanged files are not even
+    read again. The ledger is used from the event loop thread only; hashing runs
+    in worker threads, at most ``hash_workers`` at a time.
+    """
+
+    def __init__(self, path: Path, hash_workers: int = 4):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_SCHEMA)
+        self._hash_slots = asyncio.Semaphore(max(hash_workers, 1))
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    async def content_hash(self, file_path: Path) -> str:
+        stat, key = await asyncio.to_thread(
+            lambda: (file_path.stat(), str(file_path.resolve()))
+        )
+        row = self._connection.execute(
+            "SELECT content_hash FROM file_hashes "
+            "WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (key, stat.st_size, stat.st_mtime_ns),
+        ).fetchone()
+        if row:
+            return str(row[0])
+
+        async with self._hash_slots:
+            content_hash = await asyncio.to_thread(file_sha256, file_path)
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?)",
+                (key, stat.st_size, stat.st_mtime_ns, content_hash),
+            )
+        return content_hash
+
+    def is_uploaded(self, content_hash: str, target: str) -> bool:
+        row = self._connection.execute(
+            "SELECT 1 FROM uploads WHERE content_hash = ? AND target = ?",
+            (content_hash, target),
+        ).fetchone()
+        return row is not None
+
+    def record_upload(self, content_hash: str, target: str, file_path: Path) -> None:
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?, ?)",
+                (
+                    content_hash,
+                    target,
+                    str(file_path.resolve()),
+                    file_path.stat().st_size,
+                    time.time(),
+                ),
+            )
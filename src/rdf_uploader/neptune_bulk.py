@@ -0,0 +1,383 @@
+"""Bulk loading into Neptune through files staged in an S3 bucket."""
+
+import asyncio
+import contextlib
+import datetime
+import hashlib
+import hmac
+import re
+import uuid
+from collections.abc import Callable, Generator
+from pathlib import Path
+from typing import Any, BinaryIO, NamedTuple
+from urllib.parse import quote, urlsplit
+
+import httpx
+
+from rdf_uploader.endpoints import EndpointClient
+from rdf_uploader.file_readers import compression_suffix, format_suffix
+from rdf_uploader.utils import get_env_value
+
+SIGV4_ALGORITHM = "AWS4-HMAC-SHA256"
+
+# Formats of the Neptune loader, by file suffix
+LOADER_FORMATS = {
+    ".nt": "ntriples",
+    ".nq": "nquads",
+    ".nquads": "nquads",
+    ".ttl": "turtle",
+    ".turtle": "turtle",
+    ".rdf": "rdfxml",
+    ".xml": "rdfxml",
+}
+# Compressions the loader reads on its own; files are staged as they are
+LOADER_COMPRESSIONS = frozenset({None, ".gz", ".bz2"})
+
+# Load states that still change; every other state is final
+LOAD_PENDING = frozenset({"LOAD_NOT_STARTED", "LOAD_IN_QUEUE", "LOAD_IN_PROGRESS"})
+LOAD_COMPLETED = "LOAD_COMPLETED"
+
+# Files larger than one part are staged with a multipart upload, one part in
+# memory at a time; S3 takes at most 10,000 parts of at least 5 MiB
+S3_PART_SIZE = 64 * 1024 * 1024
+
+_UPLOAD_ID = re.compile(rb"<UploadId>([^<]+)</UploadId>")
+
+
+class AwsCredentials(NamedTuple):
+    access_key: str
+    secret_key: str
+    session_token: str | None = None
+
+    @classmethod
+    def from_env(cls) -> "AwsCredentials":
+        """Read the credentials from the standard ``AWS_*`` environment variables."""
+        access_key = get_env_value("AWS_ACCESS_KEY_ID")
+        secret_key = get_env_value("AWS_SECRET_ACCESS_KEY")
+        if not (access_key and secret_key):
+            raise ValueError(  # noqa: TRY003
+                "AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY must be set for "
+                "Neptune bulk loads"
+            )
+        return cls(access_key, secret_key, get_env_value("AWS_SESSION_TOKEN") or None)
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode("utf-8"), hashlib.sha256).digest()
+
+
+class SigV4Auth(httpx.Auth):
+    """
+    Sign requests with AWS Signature Version 4.
+
+    The host, the ``Content-Type`` and all ``x-amz-*`` headers are signed.
+    Requests to S3 carry the hash of their body in ``x-amz-content-sha256``,
+    as S3 requires.
+    """
+
+    requires_request_body = True
+
+    def __init__(self, credentials: AwsCredentials, region: str, service: str):
+        self.credentials = credentials
+        self.region = region
+        self.service = service
+
+    def auth_flow(self, request: httpx.Request) -> Generator[httpx.Request, Any, None]:
+        self.sign(request, datetime.datetime.now(datetime.UTC))
+        yield request
+
+    def sign(self, request: httpx.Request, now: datetime.datetime) -> None:
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        scope = f"{amz_date[:8]}/{self.region}/{self.service}/aws4_request"
+        payload_hash = hashlib.sha256(request.content).hexdigest()
+
+        request.headers["x-amz-date"] = amz_date
+        if self.service == "s3":
+            request.headers["x-amz-content-sha256"] = payload_hash
+        if self.credentials.session_token:
+            request.headers["x-amz-security-token"] = self.credentials.session_token
+
+        headers = {
+            name: " ".join(value.split())
+            for name, value in (
+                (name.lower(), value) for name, value in request.headers.items()
+            )
+            if name in {"host", "content-type"} or name.startswith("x-amz-")
+        }
+        signed_headers = ";".join(sorted(headers))
+        path = request.url.raw_path.split(b"?")[0].decode("ascii") or "/"
+        if self.service != "s3":
+            # Every service but S3 expects the path encoded twice
+            path = quote(path, safe="/-_.~")
+        query = "&".join(
+            sorted(
+                f"{quote(name, safe='-_.~')}={quote(value, safe='-_.~')}"
+                for name, value in request.url.params.multi_items()
+            )
+        )
+        canonical_request = "\n".join(
+            [
+                request.method,
+                path,
+                query,
+                "".join(f"{name}:{headers[name]}\n" for name in sorted(headers)),
+                signed_headers,
+                payload_hash,
+            ]
+        )
+        string_to_sign = "\n".join(
+            [
+                SIGV4_ALGORITHM,
+                amz_date,
+                scope,
+                hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+            ]
+        )
+
+        key = _hmac(f"AWS4{self.credentials.secret_key}".encode(), amz_date[:8])
+        for part in (self.region, self.service, "aws4_request"):
+            key = _hmac(key, part)
+        signature = hmac.new(
+            key, string_to_sign.encode("utf-8"), hashlib.sha256
+        ).hexdigest()
+        request.headers["Authorization"] = (
+            f"{SIGV4_ALGORITHM} Credential={self.credentials.access_key}/{scope}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        )
+
+
+class NeptuneLoadError(Exception):
+    """A bulk load job that ended in a state other than ``LOAD_COMPLETED``."""
+
+    def __init__(self, load_id: str, status: str, details: dict[str, Any]):
+        self.load_id = load_id
+        self.status = status
+        self.details = details
+        super().__init__(f"Neptune load {load_id} ended with {status}")
+
+
+class NeptuneBulkConfig(NamedTuple):
+    """Where files are staged for the Neptune loader and how it reads them."""
+
+    # s3://bucket/prefix the files are staged under
+    source_uri: str
+    # IAM role Neptune assumes to read the bucket
+    iam_role_arn: str
+    region: str = "us-east-1"
+    # S3-compatible endpoint; defaults to the regional AWS endpoint
+    s3_endpoint: str | None = None
+    # Sign the loader requests for clusters with IAM authentication
+    iam_auth: bool = False
+    # Seconds between two polls of the load status
+    poll_interval: float = 5.0
+    # Loader parallelism: LOW, MEDIUM, HIGH or OVERSUBSCRIBE
+    parallelism: str = "MEDIUM"
+
+
+def loader_format(file_path: Path) -> str:
+    """Return the Neptune loader format of a file, which may be compressed."""
+    if compression_suffix(file_path) not in LOADER_COMPRESSIONS:
+        raise ValueError(  # noqa: TRY003
+            f"Neptune bulk loads take plain, gzip or bzip2 files: {file_path}"
+        )
+    file_format = LOADER_FORMATS.get(format_suffix(file_path))
+    if file_format is None:
+        raise ValueError(  # noqa: TRY003
+            "Neptune bulk loads take N-Triples, N-Quads, Turtle or RDF/XML "
+            f"files: {file_path}"
+        )
+    return file_format
+
+
+class NeptuneBulkLoader:
+    """
+    Load files through the Neptune bulk loader instead of the graph store protocol.
+
+    A file is staged in the S3 bucket of ``config.source_uri`` with a plain or
+    multipart upload, a ``/loader`` job is submitted for it, and the job is
+    polled until it reaches a final state. Requests go through the pooled HTTP
+    client of ``client``, whose endpoint is the Neptune cluster.
+    """
+
+    def __init__(
+        self,
+        client: EndpointClient,
+        config: NeptuneBulkConfig,
+        credentials: AwsCredentials | None = None,
+    ):
+        source = urlsplit(config.source_uri)
+        if source.scheme != "s3" or not source.netloc:
+            raise ValueError(  # noqa: TRY003
+                f"Neptune bulk loads need an s3://bucket/prefix source: {config.source_uri}"
+            )
+        self.client = client
+        self.config = config
+        self.bucket = source.netloc
+        self.prefix = source.path.strip("/")
+        self.s3_endpoint = (
+            config.s3_endpoint or f"https://s3.{config.region}.amazonaws.com"
+        ).rstrip("/")
+        credentials = credentials or AwsCredentials.from_env()
+        self._s3_auth = SigV4Auth(credentials, config.region, "s3")
+        self._loader_auth = (
+            SigV4Auth(credentials, config.region, "neptune-db")
+            if config.iam_auth
+            else None
+        )
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        if self.client.http_client is None:
+            raise RuntimeError("Client must be opened before bulk loading")  # noqa: TRY003
+        return self.client.http_client
+
+    def _object_url(self, key: str) -> str:
+        # Path-style URLs work with AWS as well as S3-compatible stores
+        return f"{self.s3_endpoint}/{self.bucket}/{quote(key)}"
+
+    async def _s3_request(
+        self,
+        method: str,
+        key: str,
+        params: dict[str, str] | None = None,
+        content: bytes = b"",
+    ) -> httpx.Response:
+        response = await self.http_client.request(
+            method,
+            self._object_url(key),
+            params=params,
+            content=content,
+            auth=self._s3_auth,
+        )
+        response.raise_for_status()
+        return response
+
+    async def stage(
+        self,
+        file_path: Path,
+        on_progress: Callable[[int, int], None] | None = None,
+    ) -> str:
+        """
+        Upload a file to the bucket and return its ``s3://`` URI.
+
+        ``on_progress`` is called with the bytes sent so far and the status code
+        after every part.
+        """
+        key = "/".join(
+            part for part in (self.prefix, uuid.uuid4().hex, file_path.name) if part
+        )
+        size = (await asyncio.to_thread(file_path.stat)).st_size
+        with await asyncio.to_thread(file_path.open, "rb") as file:
+            if size <= S3_PART_SIZE:
+                data = await asyncio.to_thread(file.read)
+                response = await self._s3_request("PUT", key, content=data)
+                if on_progress:
+                    on_progress(size, response.status_code)
+            else:
+                await self._stage_multipart(key, file, on_progress)
+        return f"s3://{self.bucket}/{key}"
+
+    async def _stage_multipart(
+        self,
+        key: str,
+        file: BinaryIO,
+        on_progress: Callable[[int, int], None] | None,
+    ) -> None:
+        response = await self._s3_request("POST", key, {"uploads": ""})
+        match = _UPLOAD_ID.search(response.content)
+        if match is None:
+            raise ValueError(f"No upload ID in the response for {key}")  # noqa: TRY003
+        upload_id = match.group(1).decode("utf-8")
+
+        parts: list[str] = []
+        sent = 0
+        try:
+            while data := await asyncio.to_thread(file.read, S3_PART_SIZE):
+                part_number = len(parts) + 1
+                response = await self._s3_request(
+                    "PUT",
+                    key,
+                    {"partNumber": str(part_number), "uploadId": upload_id},
+                    data,
+                )
+                parts.append(
+                    f"<Part><PartNumber>{part_number}</PartNumber>"
+                    f"<ETag>{response.headers['ETag']}</ETag></Part>"
+                )
+                sent += len(data)
+                if on_progress:
+                    on_progress(sent, response.status_code)
+
+            body = (
+                f"<CompleteMultipartUpload>{''.join(parts)}</CompleteMultipartUpload>"
+            )
+            response = await self._s3_request(
+                "POST", key, {"uploadId": upload_id}, body.encode("utf-8")
+            )
+            # Completion can fail after the 200 status has been sent
+            if b"<Error>" in response.content:
+                raise ValueError(  # noqa: TRY003, TRY301
+                    f"Multipart upload of {key} failed: {response.text}"
+                )
+        except BaseException:
+            # Aborting frees the parts; the original error matters more
+            with contextlib.suppress(httpx.HTTPError):
+                await self._s3_request("DELETE", key, {"uploadId": upload_id})
+            raise
+
+    async def unstage(self, source: str) -> None:
+        """Remove a staged file from the bucket."""
+        await self._s3_request("DELETE", urlsplit(source).path.lstrip("/"))
+
+    async def submit(self, source: str, file_format: str, graph: str | None) -> str:
+        """Start a load job for a staged file and return its load ID."""
+        job: dict[str, Any] = {
+            "source": source,
+            "format": file_format,
+            "iamRoleArn": self.config.iam_role_arn,
+            "region": self.config.region,
+            "failOnError": "TRUE",
+            "parallelism": self.config.parallelism,
+            # Jobs of concurrent uploads wait for each other instead of failing
+            "queueRequest": "TRUE",
+        }
+        if graph:
+            job["parserConfiguration"] = {"namedGraphUri": graph}
+
+        response = await self.http_client.post(
+            f"{self.client.endpoint_url}/loader",
+            json=job,
+            auth=self._loader_auth or httpx.USE_CLIENT_DEFAULT,
+        )
+        response.raise_for_status()
+        load_id: str = response.json()["payload"]["loadId"]
+        return load_id
+
+    async def wait(
+        self,
+        load_id: str,
+        on_progress: Callable[[int, int], None] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Poll a load job until it is over and return its final status.
+
+        ``on_progress`` is called with the number of records loaded so far and
+        the status code of every poll. A job that does not complete raises
+        ``NeptuneLoadError``.
+        """
+        while True:
+            response = await self.http_client.get(
+                f"{self.client.endpoint_url}/loader/{load_id}",
+                params={"details": "true", "errors": "true"},
+                auth=self._loader_auth or httpx.USE_CLIENT_DEFAULT,
+            )
+            response.raise_for_status()
+            payload: dict[str, Any] = response.json()["payload"]
+            status = payload["overallStatus"]
+            if on_progress:
+                on_progress(status.get("totalRecords", 0), response.status_code)
+            if status["status"] == LOAD_COMPLETED:
+                return payload
+            if status["status"] not in LOAD_PENDING:
+                raise NeptuneLoadError(load_id, status["status"], payload)
+            await asyncio.sleep(self.config.poll_interval)
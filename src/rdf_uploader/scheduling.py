@@ -0,0 +1,164 @@
+"""Expansion of input paths and ordering of files across upload slots."""
+
+import enum
+import heapq
+from pathlib import Path
+from typing import NamedTuple
+
+from rdf_uploader.file_readers import format_suffix
+
+_GLOB_CHARACTERS = frozenset("*?[")
+
+# Suffixes that only RDF files use; generic ones such as .json and .xml are
+# only uploaded when a file is named explicitly
+RDF_SUFFIXES = frozenset(
+    {
+        ".nt",
+        ".nq",
+        ".nquads",
+        ".ttl",
+        ".turtle",
+        ".n3",
+        ".rdf",
+        ".owl",
+        ".jsonld",
+        ".trig",
+    }
+)
+
+
+def is_rdf_file(file_path: Path) -> bool:
+    """Tell whether the file has the suffix of an RDF format."""
+    return file_path.is_file() and format_suffix(file_path) in RDF_SUFFIXES
+
+
+def expand_inputs(paths: list[Path]) -> list[Path]:
+    """
+    Expand directories and glob patterns into the RDF files they contain.
+
+    Directories are searched recursively for files with an ``RDF_SUFFIXES``
+    suffix, optionally compressed. Patterns such as ``dumps/**/*.nt.gz`` are expanded
+    the same way, for shells that pass them on unexpanded. Other paths are kept
+    as they are, so a missing file is reported when it is uploaded. Files are
+    listed once, in the order they were first found.
+    """
+    files: dict[Path, None] = {}
+    for path in paths:
+        if path.is_dir():
+            matches = [path]
+        elif not path.exists() and _GLOB_CHARACTERS & set(str(path)):
+            pattern = str(path.relative_to(path.anchor)) if path.anchor else str(path)
+            matches = sorted(Path(path.anchor or ".").glob(pattern))
+        else:
+            files[path] = None
+            continue
+
+        for match in matches:
+            if match.is_dir():
+                files.update(
+                    dict.fromkeys(sorted(p for p in match.rglob("*") if is_rdf_file(p)))
+                )
+            elif is_rdf_file(match):
+                files[match] = None
+    return list(files)
+
+
+class SchedulePolicy(enum.StrEnum):
+    LARGEST_FIRST = "largest-first"
+    SMALLEST_FIRST = "smallest-first"
+    ORDER = "order"
+
+
+class MakespanReport(NamedTuple):
+    """Wall-clock time of a set of uploads next to what the schedule predicted."""
+
+    # Seconds from the first upload starting to the last one finishing
+    actual: float
+    # Seconds the schedule takes at the upload rate measured per slot
+    predicted: float
+    # Seconds no schedule can beat: the larger of an even split of the data
+    # across the slots and the largest file
+    lower_bound: float
+    # Bytes per second a single slot uploaded on average
+    slot_rate: float
+
+
+def _file_size(file_path: Path) -> int:
+    try:
+        return file_path.stat().st_size
+    except OSError:
+        return 0
+
+
+def simulate_makespan(sizes: list[int], slots: int) -> int:
+    """
+    Return the load of the busiest slot when files are started in order.
+
+    Each file goes to the slot that frees up first, the way upload workers
+    pick the next file from the queue.
+    """
+    loads = [0] * max(min(slots, len(sizes)), 1)
+    for size in sizes:
+        heapq.heapreplace(loads, loads[0] + size)
+    return max(loads)
+
+
+class Schedule:
+    """
+    The order in which files are handed to ``slots`` concurrent uploads.
+
+    Sizes on disk stand in for upload times. Starting the largest files first
+    (longest processing time first) keeps a big file from starting last and
+    running long after every other slot has gone idle; it stays within 4/3 of
+    the best possible makespan.
+    """
+
+    def __init__(
+        self,
+        files: list[Path],
+        slots: int,
+        policy: SchedulePolicy = SchedulePolicy.LARGEST_FIRST,
+    ):
+        self.slots = max(slots, 1)
+        self.policy = policy
+        self.sizes = {file_path: _file_size(file_path) for file_path in files}
+        if policy == SchedulePolicy.ORDER:
+            self.files = list(self.sizes)
+        else:
+            self.files = sorted(
+                self.sizes,
+                key=self.sizes.__getitem__,
+                reverse=policy == SchedulePolicy.LARGEST_FIRST,
+            )
+
+    def predicted_load(self, files: list[Path] | None = None) -> int:
+        """Bytes uploaded by the busiest slot, for all or some of the files."""
+        selected = set(self.files if files is None else files)
+        sizes = [self.sizes[f] for f in self.files if f in selected]
+        return simulate_makespan(sizes, self.slots)
+
+    def lower_bound(self, files: list[Path] | None = None) -> int:
+        sizes = [self.sizes[f] for f in (self.files if files is None else files)]
+        if not sizes:
+            return 0
+        return max(-(-sum(sizes) // min(self.slots, len(sizes))), *sizes)
+
+    def report(self, durations: dict[Path, float], elapsed: float) -> MakespanReport:
+        """
+        Compare the wall-clock time of the uploads with the prediction.
+
+        ``durations`` holds the upload time of every file that was uploaded;
+        the rate of a slot is measured from them and turns the predicted load
+        into seconds.
+        """
+        uploaded = [f for f in self.files if f in durations]
+        busy = sum(durations[f] for f in uploaded)
+        slot_rate = sum(self.sizes[f] for f in uploaded) / busy if busy > 0 else 0.0
+        if slot_rate <= 0:
+            return MakespanReport(elapsed, 0.0, 0.0, 0.0)
+        return MakespanReport(
+            elapsed,
+            self.predicted_load(uploaded) / slot_rate,
+            self.lower_bound(uploaded) / slot_rate,
+            slot_rate,
+        )
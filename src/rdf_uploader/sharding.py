@@ -0,0 +1,39 @@
+"""Consistent hashing of triples onto the endpoints of a sharded store."""
+
+import bisect
+import hashlib
+
+RING_REPLICAS = 128
+
+
+def _hash(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent hashing of keys onto a list of nodes.
+
+    Every node is placed at ``replicas`` points of a ring of 64-bit hashes, and
+    a key belongs to the node of the first point at or after the hash of the
+    key. Nodes are placed by name, so the same key goes to the same node
+    whatever the order of the nodes, and adding a node only moves the keys of
+    the parts of the ring it takes over.
+    """
+
+    def __init__(self, nodes: list[str], replicas: int = RING_REPLICAS):
+        if not nodes:
+            raise ValueError("A hash ring needs at least one node")  # noqa: TRY003
+        points = sorted(
+            (_hash(f"{node}#{replica}".encode()), index)
+            for index, node in enumerate(nodes)
+            for replica in range(replicas)
+        )
+        self.nodes = nodes
+        self._hashes = [point for point, _ in points]
+        self._indexes = [index for _, index in points]
+
+    def node(self, key: bytes) -> int:
+        """Return the index of the node ``key`` belongs to."""
+        position = bisect.bisect_left(self._hashes, _hash(key))
+        return self._indexes[position % len(self._indexes)]
@@ -0,0 +1,496 @@
+"""Streaming helpers for Turtle and N3 documents."""
+
+import re
+from collections.abc import Iterable, Iterator
+from typing import NamedTuple
+from urllib.parse import urljoin
+
+# One token that affects statement boundaries, preceded by any run of other bytes.
+# IRIs, strings and comments are matched whole so that delimiters inside them are
+# skipped; the "partial" alternative catches ones not yet terminated in the buffer.
+_TOKEN = re.compile(
+    rb"[^<\"'#\[\](){}.;,]*(?:"
+    rb"(?P<iri><(?!=)[^>]*>)"
+    rb"|(?P<string>"
+    rb'"{3}[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*"{3}'
+    rb"|'{3}[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*'{3}"
+    rb'|"(?!"")[^"\\]*(?:\\.[^"\\]*)*"'
+    rb"|'(?!'')[^'\\]*(?:\\.[^'\\]*)*'"
+    rb")"
+    rb"|(?P<comment>#[^\n]*\n)"
+    rb"|(?P<open>[\[({])"
+    rb"|(?P<close>[\])}])"
+    rb"|(?P<separator>[;,])"
+    rb"|(?P<dot>\.)"
+    rb"|(?P<operator><=)"
+    rb"|(?P<partial>[<\"'#])"
+    rb")"
+)
+# Bytes of lookahead needed to be sure a token is not cut short by the buffer end
+_TOKEN_LOOKAHEAD = 3
+_BETWEEN_STATEMENTS = re.compile(rb"(?:\s+|#[^\n]*\n)*")
+_SPARQL_DIRECTIVE = re.compile(rb"(?i:prefix|base)\s")
+_DIRECTIVE_LOOKAHEAD = 8
+_NAME_BYTES = frozenset(
+    b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-:%\\"
+) | frozenset(range(0x80, 0x100))
+_DIGITS = frozenset(b"0123456789")
+
+
+class Statement(NamedTuple):
+    """A single top-level Turtle statement or directive."""
+
+    data: bytes
+    is_directive: bool
+    # Approximate number of triples produced by the statement
+    triple_count: int
+    # Offset in the document just past the end of the statement
+    end_offset: int
+
+
+class StatementSplitter:
+    """
+    Incrementally split a Turtle/N3 byte stream at top-level statement boundaries.
+
+    The splitter only tracks the lexical structure needed to find statement ends:
+    IRIs, string literals, comments and bracket nesting. Syntax errors are left
+    for the endpoint to report. All delimiters are ASCII, so statements are cut
+    on UTF-8 character boundaries.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = b""
+        # Document offset of the first byte of the buffer
+        self._buffer_offset = 0
+        self._pos = 0
+        self._start: int | None = None
+        self._depth = 0
+        self._triples = 0
+        self._directive: bytes | None = None
+
+    def feed(self, data: bytes) -> list[Statement]:
+        self._buffer += data
+        statements = self._scan(final=False)
+        self._compact()
+        return statements
+
+    def finish(self) -> list[Statement]:
+        statements = self._scan(final=True)
+        if self._start is not None:
+            # Unterminated trailing statement, passed on as is
+            tail = self._buffer[self._start :].strip()
+            if tail:
+                statements.append(self._statement(len(self._buffer), tail))
+            self._start = None
+        self._pos = len(self._buffer)
+        self._compact()
+        return statements
+
+    def _compact(self) -> None:
+        keep = self._pos if self._start is None else self._start
+        self._buffer = self._buffer[keep:]
+        self._buffer_offset += keep
+        self._pos -= keep
+        if self._start is not None:
+            self._start -= keep
+
+    def _statement(self, end: int, data: bytes | None = None) -> Statement:
+        start = self._start or 0
+        return Statement(
+            data=self._buffer[start:end] if data is None else data,
+            is_directive=self._directive is not None,
+            triple_count=0 if self._directive is not None else self._triples,
+            end_offset=self._buffer_offset + end,
+        )
+
+    def _begin_statement(self, pos: int) -> None:
+        head = self._buffer[pos : pos + _DIRECTIVE_LOOKAHEAD]
+        if head.startswith((b"@prefix", b"@base")):
+            self._directive = b"turtle"
+        elif _SPARQL_DIRECTIVE.match(head):
+            self._directive = b"sparql"
+        else:
+            self._directive = None
+        self._start = pos
+        self._depth = 0
+        self._triples = 1
+
+    def _scan(self, *, final: bool) -> list[Statement]:  # noqa: C901, PLR0912
+        statements: list[Statement] = []
+        buf = self._buffer
+        n = len(buf)
+        pos = self._pos
+
+        while pos < n:
+            if self._start is None:
+                pos = _BETWEEN_STATEMENTS.match(buf, pos).end()  # type: ignore[union-attr]
+                if pos >= n or buf[pos] == ord("#"):
+                    # Need the rest of the comment before the next statement starts
+                    break
+                if n - pos < _DIRECTIVE_LOOKAHEAD and not final:
+                    break
+                self._begin_statement(pos)
+
+            match = _TOKEN.match(buf, pos)
+            if match is None:
+                pos = n
+                break
+
+            kind = match.lastgroup
+            if not final and (kind == "partial" or match.end() > n - _TOKEN_LOOKAHEAD):
+                # Wait for the rest of the token, or enough data to classify it
+                pos = match.start(match.lastindex or 0)
+                break
+            pos = match.end()
+
+            if kind == "iri":
+                if self._directive == b"sparql" and self._depth == 0:
+                    # SPARQL-style directives end with their IRI
+                    statements.append(self._statement(pos))
+                    self._start = None
+            elif kind == "open":
+                self._depth += 1
+                if buf[pos - 1] == ord("["):
+                    self._triples += 1
+            elif kind == "close":
+                self._depth -= 1
+            elif kind == "separator":
+                self._triples += 1
+            elif kind == "dot" and self._depth == 0:
+                # A dot ends the statement unless it is part of a number or a name
+                prev_byte = buf[pos - 2] if pos > 1 else 0x20
+                next_byte = buf[pos] if pos < n else 0x20
+                inside_token = next_byte in _DIGITS or (
+                    prev_byte in _NAME_BYTES and next_byte in _NAME_BYTES
+                )
+                if not inside_token and prev_byte != ord("\\"):
+                    statements.append(self._statement(pos))
+                    self._start = None
+
+        self._pos = pos
+        return statements
+
+
+def split_statements(blocks: Iterable[bytes]) -> Iterator[Statement]:
+    """Split a Turtle/N3 document, given as a sequence of byte blocks, into statements."""
+    splitter = StatementSplitter()
+    for block in blocks:
+        yield from splitter.feed(block)
+    yield from splitter.finish()
+
+
+RDF = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+_RDF_FIRST = f"<{RDF}first>"
+_RDF_REST = f"<{RDF}rest>"
+_RDF_NIL = f"<{RDF}nil>"
+_RDF_TYPE = f"<{RDF}type>"
+
+_LOCAL_ESCAPE = r"\\[_~.\-!$&'()*+,;=/?#@%]"
+_LOCAL_CHAR = rf"(?:[\w:-]|%[0-9A-Fa-f]{{2}}|{_LOCAL_ESCAPE})"
+_TURTLE_TOKEN = re.compile(
+    "|".join(
+        rf"(?P<{name}>{pattern})"
+        for name, pattern in (
+            ("skip", r"(?:\s+|#[^\n]*)+"),
+            (
+                "iri",
+                r"<(?:[^<>\"{}|^`\\\x00-\x20]|\\u[0-9A-Fa-f]{4}|\\U[0-9A-Fa-f]{8})*>",
+            ),
+            (
+                "long_string",
+                (
+                    r'"{3}[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*"{3}'
+                    r"|'{3}[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*'{3}"
+                ),
+            ),
+            (
+                "string",
+                r'"[^"\\\n\r]*(?:\\.[^"\\\n\r]*)*"|\'[^\'\\\n\r]*(?:\\.[^\'\\\n\r]*)*\'',
+            ),
+            ("prefix_directive", r"@prefix(?![\w-])|(?i:prefix)(?=\s)"),
+            ("base_directive", r"@base(?![\w-])|(?i:base)(?=\s)"),
+            ("langtag", r"@[a-zA-Z]+(?:-[a-zA-Z0-9]+)*"),
+            (
+                "double",
+                r"[+-]?(?:\d+\.\d*[eE][+-]?\d+|\.\d+[eE][+-]?\d+|\d+[eE][+-]?\d+)",
+            ),
+            ("decimal", r"[+-]?\d*\.\d+"),
+            ("integer", r"[+-]?\d+"),
+            ("bnode", r"_:\w(?:[\w.-]*[\w-])?"),
+            (
+                "pname",
+                rf"(?:[^\W\d_](?:[\w.-]*[\w-])?)?:(?:{_LOCAL_CHAR}(?:(?:{_LOCAL_CHAR}|\.)*{_LOCAL_CHAR})?)?",
+            ),
+            ("boolean", r"(?:true|false)(?![\w:-])"),
+            ("a", r"a(?![\w:-])"),
+            ("punct", r"\^\^|[\[\](),;.]"),
+        )
+    )
+)
+_STRING_ESCAPE = re.compile(r"\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))", re.DOTALL)
+_ECHARS = {
+    "t": "\t",
+    "b": "\b",
+    "n": "\n",
+    "r": "\r",
+    "f": "\f",
+    '"': '"',
+    "'": "'",
+    "\\": "\\",
+}
+_NUMERIC_TYPES = {
+    "integer": f"<{XSD}integer>",
+    "decimal": f"<{XSD}decimal>",
+    "double": f"<{XSD}double>",
+}
+
+
+class TurtleSyntaxError(ValueError):
+    def __init__(self, message: str, position: int):
+        super().__init__(f"{message} at position {position}")
+        self.position = position
+
+
+def _unescape_string(value: str, position: int) -> str:
+    def replace(match: re.Match[str]) -> str:
+        code = match.group(1) or match.group(2)
+        if code:
+            return chr(int(code, 16))
+        char = match.group(3)
+        if char not in _ECHARS:
+            raise TurtleSyntaxError(f"Invalid escape sequence \\{char}", position)  # noqa: TRY003
+        return _ECHARS[char]
+
+    return _STRING_ESCAPE.sub(replace, value) if "\\" in value else value
+
+
+def _escape_literal(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class TurtleTranscoder:
+    """
+    Translate Turtle into N-Triples one statement at a time, without an RDF graph.
+
+    Prefix and base declarations, and blank node labels, carry over between calls
+    to ``transcode``, so a document can be fed in pieces, e.g. the statements
+    produced by ``split_statements``. A prefix that is used without being
+    declared is a syntax error.
+    """
+
+    def __init__(self, base: str | None = None):
+        self.base = base
+        self.prefixes: dict[str, str] = {}
+        self._bnode_labels: dict[str, str] = {}
+        self._bnode_count = 0
+
+    def transcode(self, text: str) -> Iterator[str]:
+        """Yield an N-Triples line (without newline) for every triple in ``text``."""
+        yield from _TurtleParser(self, text).statements()
+
+    def new_bnode(self) -> str:
+        self._bnode_count += 1
+        return f"_:g{self._bnode_count}"
+
+    def bnode(self, label: str) -> str:
+        node = self._bnode_labels.get(label)
+        if node is None:
+            node = self._bnode_labels[label] = f"_:b{len(self._bnode_labels)}"
+        return node
+
+    def resolve(self, iri: str) -> str:
+        if self.base is None or ":" in iri.split("/", 1)[0]:
+            return iri
+        return urljoin(self.base, iri)
+
+    def expand(self, prefix: str, local: str, position: int) -> str:
+        namespace = self.prefixes.get(prefix)
+        if namespace is None:
+            raise TurtleSyntaxError(f"Undeclared prefix '{prefix}:'", position)  # noqa: TRY003
+        return namespace + local
+
+
+class _TurtleParser:
+    def __init__(self, transcoder: TurtleTranscoder, text: str):
+        self.transcoder = transcoder
+        self.text = text
+        self.pos = 0
+        self.token: tuple[str, str, int] = ("", "", 0)
+        self.triples: list[str] = []
+        self._advance()
+
+    def _advance(self) -> tuple[str, str, int]:
+        current = self.token
+        while True:
+            if self.pos >= len(self.text):
+                self.token = ("eof", "", self.pos)
+                return current
+            match = _TURTLE_TOKEN.match(self.text, self.pos)
+            if match is None:
+                raise TurtleSyntaxError(  # noqa: TRY003
+                    f"Unexpected character {self.text[self.pos]!r}", self.pos
+                )
+            self.pos = match.end()
+            kind = match.lastgroup or ""
+            if kind != "skip":
+                self.token = (kind, match.group(), match.start())
+                return current
+
+    def _expect(self, value: str) -> None:
+        kind, text, position = self._advance()
+        if kind != "punct" or text != value:
+            raise TurtleSyntaxError(f"Expected '{value}', found '{text}'", position)  # noqa: TRY003
+
+    def _at(self, value: str) -> bool:
+        return self.token[0] == "punct" and self.token[1] == value
+
+    def statements(self) -> Iterator[str]:
+        while self.token[0] != "eof":
+            self._statement()
+            yield from self.triples
+            self.triples = []
+
+    def _statement(self) -> None:
+        kind, _, _ = self.token
+        if kind in {"prefix_directive", "base_directive"}:
+            _, text, _ = self._advance()
+            if kind == "prefix_directive":
+                prefix_kind, prefix, position = self._advance()
+                if prefix_kind != "pname" or not prefix.endswith(":"):
+                    raise TurtleSyntaxError("Expected a prefix name", position)  # noqa: TRY003
+                self.transcoder.prefixes[prefix[:-1]] = self._iriref()
+            else:
+                self.transcoder.base = self._iriref()
+            if text.startswith("@"):
+                self._expect(".")
+            return
+
+        if self._at("["):
+            subject = self._blank_node_property_list()
+            if not self._at("."):
+                self._predicate_object_list(subject)
+        else:
+            subject = self._subject()
+            self._predicate_object_list(subject)
+        self._expect(".")
+
+    def _iriref(self) -> str:
+        kind, text, position = self._advance()
+        if kind != "iri":
+            raise TurtleSyntaxError(f"Expected an IRI, found '{text}'", position)  # noqa: TRY003
+        return self.transcoder.resolve(_unescape_string(text[1:-1], position))
+
+    def _iri(self) -> str:
+        kind, text, position = self.token
+        if kind == "iri":
+            return f"<{self._iriref()}>"
+        if kind == "pname":
+            self._advance()
+            prefix, _, local = text.partition(":")
+            local = re.sub(_LOCAL_ESCAPE, lambda m: m.group()[1:], local)
+            return f"<{self.transcoder.expand(prefix, local, position)}>"
+        raise TurtleSyntaxError(f"Expected an IRI, found '{text}'", position)  # noqa: TRY003
+
+    def _subject(self) -> str:
+        kind, text, _ = self.token
+        if kind == "bnode":
+            self._advance()
+            return self.transcoder.bnode(text[2:])
+        if self._at("("):
+            return self._collection()
+        return self._iri()
+
+    def _predicate_object_list(self, subject: str) -> None:
+        while True:
+            if self.token[0] == "a":
+                self._advance()
+                predicate = _RDF_TYPE
+            else:
+                predicate = self._iri()
+            while True:
+                obj = self._object()
+                self.triples.append(f"{subject} {predicate} {obj} .")
+                if not self._at(","):
+                    break
+                self._advance()
+            if not self._at(";"):
+                return
+            while self._at(";"):
+                self._advance()
+            if self._at(".") or self._at("]") or self.token[0] == "eof":
+                return
+
+    def _blank_node_property_list(self) -> str:
+        self._expect("[")
+        node = self.transcoder.new_bnode()
+        if not self._at("]"):
+            self._predicate_object_list(node)
+        self._expect("]")
+        return node
+
+    def _collection(self) -> str:
+        self._expect("(")
+        items = []
+        while not self._at(")"):
+            if self.token[0] == "eof":
+                raise TurtleSyntaxError("Unterminated collection", self.token[2])  # noqa: TRY003
+            items.append(self._object())
+        self._advance()
+        if not items:
+            return _RDF_NIL
+
+        head = node = self.transcoder.new_bnode()
+        for index, item in enumerate(items):
+            self.triples.append(f"{node} {_RDF_FIRST} {item} .")
+            rest = self.transcoder.new_bnode() if index < len(items) - 1 else _RDF_NIL
+            self.triples.append(f"{node} {_RDF_REST} {rest} .")
+            node = rest
+        return head
+
+    def _object(self) -> str:  # noqa: PLR0911
+        kind, text, position = self.token
+        if kind in {"string", "long_string"}:
+            self._advance()
+            quote_length = 3 if kind == "long_string" else 1
+            value = _unescape_string(text[quote_length:-quote_length], position)
+            literal = f'"{_escape_literal(value)}"'
+            if self.token[0] == "langtag":
+                return literal + self._advance()[1]
+            if self._at("^^"):
+                self._advance()
+                return f"{literal}^^{self._iri()}"
+            return literal
+        if kind in _NUMERIC_TYPES:
+            self._advance()
+            return f'"{text}"^^{_NUMERIC_TYPES[kind]}'
+        if kind == "boolean":
+            self._advance()
+            return f'"{text}"^^<{XSD}boolean>'
+        if kind == "bnode":
+            self._advance()
+            return self.transcoder.bnode(text[2:])
+        if self._at("["):
+            return self._blank_node_property_list()
+        if self._at("("):
+            return self._collection()
+        return self._iri()
+
+
+def turtle_to_ntriples(text: str, base: str | None = None) -> str:
+    """Convert a Turtle document to N-Triples."""
+    lines = list(TurtleTranscoder(base).transcode(text))
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def transcode_statements(statements: Iterable[Statement]) -> Iterator[str]:
+    """Stream N-Triples lines for statements produced by ``split_statements``."""
+    transcoder = TurtleTranscoder()
+    for statement in statements:
+        yield from transcoder.transcode(statement.data.decode("utf-8"))
@@ -1,11 +1,164 @@
 import asyncio
+import collections
+import contextlib
+import functools
 import time
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Awaitable, Callable, Coroutine
 from pathlib import Path
-from typing import Any
+from types import TracebackType
+from typing import Any, NamedTuple, Self
 
-from rdf_uploader.endpoints import EndpointClient, EndpointType
-from rdf_uploader.file_readers import detect_content_type, get_reader
+import httpx
+
+from rdf_uploader.checkpoint import Checkpoint, CheckpointJournal, CheckpointWriter
+from rdf_uploader.endpoints import (
+    EndpointClient,
+    EndpointType,
+    RequestCompression,
+    RetryPolicy,
+)
+from rdf_uploader.file_readers import (
+    Batch,
+    CoalescedBatch,
+    CoalescingReader,
+    FileReader,
+    detect_content_type,
+    format_suffix,
+    get_reader,
+)
+from rdf_uploader.ledger import UploadLedger
+from rdf_uploader.neptune_bulk import (
+    NeptuneBulkConfig,
+    NeptuneBulkLoader,
+    NeptuneLoadError,
+    loader_format,
+)
+from rdf_uploader.scheduling import (
+    MakespanReport,
+    Schedule,
+    SchedulePolicy,
+    expand_inputs,
+)
+from rdf_uploader.sharding import HashRing
+
+
+class AdaptiveBatchSizer:
+    """
+    Adjust the batch size from observed upload latency, throughput and errors.
+
+    The size doubles while batches complete within ``target_latency`` and
+    throughput keeps up, until the first sign of pressure. From then on it grows
+    additively and shrinks multiplicatively when a batch is slower than the
+    target or has to be retried (AIMD), settling on the largest batch the server
+    absorbs comfortably.
+    """
+
+    def __init__(
+        self,
+        initial_size: int = 1000,
+        min_size: int = 10,
+        max_size: int = 100_000,
+        target_latency: float = 5.0,
+        increase: int | None = None,
+        decrease_factor: float = 0.7,
+    ):
+        self.min_size = max(min_size, 1)
+        self.max_size = max(max_size, self.min_size)
+        self.size = min(max(initial_size, self.min_size), self.max_size)
+        self.target_latency = target_latency
+        self.increase = increase or max(self.size // 10, 1)
+        self.decrease_factor = decrease_factor
+        # Smoothed throughput in triples per second
+        self.throughput = 0.0
+        self.errors = 0
+        # Size before the last decrease; batches that large were read before it
+        self._ceiling: int | None = None
+        self._slow_start = True
+
+    def __call__(self) -> int:
+        return self.size
+
+    def observe(
+        self, batch_count: int, latency: float, requested_size: int | None = None
+    ) -> None:
+        """
+        Record a batch of ``batch_count`` triples uploaded in ``latency`` seconds.
+
+        ``requested_size`` is the size the batch was started with. Batches cut
+        short by a byte limit hold fewer triples but still tell how the current
+        size fares; without it, the triple count stands in for it.
+        """
+        if not self._is_current(batch_count, requested_size):
+            return
+        if latency > self.target_latency:
+            self._decrease()
+            return
+
+        throughput = batch_count / latency if latency > 0 else float("inf")
+        if self.throughput == 0 or throughput >= self.throughput * 0.9:
+            grown = self.size * 2 if self._slow_start else self.size + self.increase
+            self.size = min(grown, self.max_size)
+            self._ceiling = None
+        if throughput != float("inf"):
+            self.throughput = (
+                throughput
+                if self.throughput == 0
+                else 0.8 * self.throughput + 0.2 * throughput
+            )
+
+    def record_error(self, batch_count: int, requested_size: int | None = None) -> None:
+        """Record a failed attempt to upload a batch of ``batch_count`` triples."""
+        self.errors += 1
+        if self._is_current(batch_count, requested_size):
+            self._decrease()
+
+    def _is_current(self, batch_count: int, requested_size: int | None) -> bool:
+        # Batches read before the last change say nothing about the current size
+        if requested_size is not None:
+            return requested_size == self.size
+        if batch_count < self.size:
+            return False
+        return self._ceiling is None or batch_count < self._ceiling
+
+    def _decrease(self) -> None:
+        self._slow_start = False
+        size = max(int(self.size * self.decrease_factor), self.min_size)
+        self._ceiling = self.size if size < self.size else None
+        self.size = size
+
+
+class EndpointSettings(NamedTuple):
+    """
+    Where an endpoint is and how to log in to it.
+
+    Settings left as None are read from the environment variables of the
+    endpoint type, like those of the main endpoint.
+    """
+
+    url: str | None
+    endpoint_type: EndpointType = EndpointType.GENERIC
+    username: str | None = None
+    password: str | None = None
+    # RDFox datastore name
+    store_name: str | None = None
+
+
+class CommitPolicy(NamedTuple):
+    """
+    When the batches uploaded into a transaction are committed.
+
+    A transaction is committed once it holds ``max_batches`` batches or
+    ``max_bytes`` bytes of data, whichever comes first. Without either limit
+    the whole file is uploaded in a single transaction.
+    """
+
+    max_batches: int | None = None
+    max_bytes: int | None = None
+
+    def is_due(self, batch_count: int, size: int) -> bool:
+        if self.max_batches is not None and batch_count >= self.max_batches:
+            return True
+        return self.max_bytes is not None and size >= self.max_bytes
 
 
 class StatsCollector:
@@ -13,9 +166,17 @@ def __init__(self, file_path: Path):
         self.file_path = file_path
         self.total_triples = 0
         self.uploaded_triples = 0
+        self.total_bytes = 0
+        self.bytes_read = 0
         self.start_time = time.time()
         self.batch_num = 0
+        self.retries = 0
+        self.last_latency = 0.0
         self.callback: Callable[[dict[str, Any]], None] | None = None
+        self.batch_sizer: AdaptiveBatchSizer | None = None
+        self.journal: CheckpointWriter | None = None
+        self._next_batch_index = 0
+        self._completed_batches: dict[int, tuple[int, int, int | None, int | None]] = {}
 
     def set_callback(self, callback: Callable[[dict[str, Any]], None]) -> None:
         self.callback = callback
@@ -23,10 +184,73 @@ def set_callback(self, callback: Callable[[dict[str, Any]], None]) -> None:
     def set_total_triples(self, total: int) -> None:
         self.total_triples = total
 
-    def update(self, batch_count: int, status_code: int) -> None:
+    def set_total_bytes(self, total: int) -> None:
+        self.total_bytes = total
+
+    def resume_from(self, checkpoint: Checkpoint) -> None:
+        self.batch_num = checkpoint.batch_count
+        self.uploaded_triples = checkpoint.triple_count
+
+    def record_retry(self, batch_count: int, requested_size: int | None = None) -> None:
+        self.retries += 1
+        if self.batch_sizer:
+            self.batch_sizer.record_error(batch_count, requested_size)
+
+    def record_latency(
+        self, batch_count: int, latency: float, requested_size: int | None = None
+    ) -> None:
+        self.last_latency = latency
+        if self.batch_sizer:
+            self.batch_sizer.observe(batch_count, latency, requested_size)
+
+    def complete_batch(
+        self,
+        batch_index: int,
+        batch_count: int,
+        status_code: int,
+        bytes_read: int | None = None,
+        end_offset: int | None = None,
+    ) -> None:
+        """
+        Record a finished batch that may have completed out of order.
+
+        Batches are reported to ``update`` strictly in the order they were read,
+        so progress and checkpoints only ever cover a contiguous prefix of the file.
+        """
+        self._completed_batches[batch_index] = (
+            batch_count,
+            status_code,
+            bytes_read,
+            end_offset,
+        )
+        while self._next_batch_index in self._completed_batches:
+            completed = self._completed_batches.pop(self._next_batch_index)
+            self._next_batch_index += 1
+            self.update(*completed)
+
+    def update(
+        self,
+        batch_count: int,
+        status_code: int,
+        bytes_read: int | None = None,
+        end_offset: int | None = None,
+    ) -> None:
         self.batch_num += 1
         self.uploaded_triples += batch_count
+        if bytes_read is not None:
+            self.bytes_read = bytes_read
+        if self.journal and end_offset is not None:
+            self.journal.commit(
+                Checkpoint(end_offset, self.batch_num, self.uploaded_triples)
+            )
+        self._notify({"batch_count": batch_count, "status_code": status_code})
+
+    def record_bytes_read(self, bytes_read: int) -> None:
+        """Report progress through a file that is not uploaded in batches."""
+        self.bytes_read = bytes_read
+        self._notify({})
 
+    def _notify(self, batch: dict[str, Any]) -> None:
         if not self.callback:
             return
 
@@ -40,19 +264,290 @@ def update(self, batch_count: int, status_code: int) -> None:
                 "file": str(self.file_path),
                 "total_triples": self.total_triples,
                 "uploaded_triples": self.uploaded_triples,
-                "progress_percent": (self.uploaded_triples / self.total_triples) * 100
-                if self.total_triples > 0
-                else 0,
+                "total_bytes": self.total_bytes,
+                "bytes_read": self.bytes_read,
+                "progress_percent": self.progress_percent(),
                 "elapsed_time": elapsed_time,
                 "triples_per_second": triples_per_second,
                 "batch_num": self.batch_num,
-                "batch_count": batch_count,
-                "status_code": status_code,
+                **batch,
+                "retries": self.retries,
+                "latency": self.last_latency,
+                "batch_size": self.batch_sizer.size if self.batch_sizer else None,
             }
         )
 
+    def progress_percent(self) -> float:
+        # Without a triple count up front, progress is measured in bytes read
+        if self.total_triples > 0:
+            return (self.uploaded_triples / self.total_triples) * 100
+        if self.total_bytes > 0:
+            return (self.bytes_read / self.total_bytes) * 100
+        return 0
+
+
+class InflightWindow:
+    """
+    Run at most ``limit`` uploads at a time.
+
+    The first failed upload is re-raised from ``submit`` or ``drain``; leaving the
+    window with an error cancels the uploads still in flight.
+    """
+
+    def __init__(self, limit: int = 1):
+        self.limit = max(limit, 1)
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            await self.drain()
+        else:
+            await self.cancel()
+
+    async def submit(self, upload: Coroutine[Any, Any, None]) -> None:
+        try:
+            while len(self._tasks) >= self.limit:
+                await self._wait(asyncio.FIRST_COMPLETED)
+        except BaseException:
+            # The upload will never run
+            upload.close()
+            raise
+        self._tasks.add(asyncio.create_task(upload))
+
+    async def drain(self) -> None:
+        while self._tasks:
+            await self._wait(asyncio.FIRST_COMPLETED)
+
+    async def cancel(self) -> None:
+        tasks, self._tasks = self._tasks, set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _wait(self, return_when: str) -> None:
+        done, self._tasks = await asyncio.wait(self._tasks, return_when=return_when)
+        for task in done:
+            task.result()
+
+
+class TargetUploadError(Exception):
+    """Raised when a file could not be uploaded to some or all of its endpoints."""
+
+    def __init__(self, failures: dict[str, Exception]):
+        self.failures = failures
+        super().__init__(
+            "; ".join(f"{target}: {error}" for target, error in failures.items())
+        )
+
+
+class FanOut:
+    """
+    Post the batches of a file to one or more endpoints.
+
+    Every endpoint has an in-flight window of its own, so each store takes the
+    batches at its own pace and reading only waits for a store whose window is
+    full. A batch is complete once every endpoint still loading the file has
+    it. With several endpoints, one that fails stops receiving batches while
+    the others carry on, and the failures are raised together as a
+    ``TargetUploadError`` when leaving the fan-out.
+
+    Sharded uploads post every batch to the one endpoint holding its shard,
+    and the first failure fails the file.
+    """
+
+    def __init__(
+        self,
+        clients: list[EndpointClient],
+        inflight_batches: int = 1,
+        sharded: bool = False,  # noqa: FBT001, FBT002
+    ):
+        self.clients = clients
+        self.sharded = sharded
+        self.windows = [InflightWindow(inflight_batches) for _ in clients]
+        self.failures: dict[str, Exception] = {}
+        self._stack = contextlib.AsyncExitStack()
+
+    async def __aenter__(self) -> Self:
+        for window in self.windows:
+            await self._stack.enter_async_context(window)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self._stack.__aexit__(exc_type, exc_value, traceback)
+        if exc_type is None and self.failures:
+            raise TargetUploadError(self.failures)
+
+    async def submit(
+        self,
+        upload: Callable[[EndpointClient], Awaitable[None]],
+        on_complete: Callable[[], None],
+        shard: int | None = None,
+    ) -> None:
+        live = [
+            (client, window)
+            for client, window in zip(self.clients, self.windows, strict=True)
+            if str(client.endpoint_url) not in self.failures
+        ]
+        if self.sharded:
+            live = [(self.clients[shard or 0], self.windows[shard or 0])]
+        remaining = len(live)
+
+        async def upload_to(client: EndpointClient) -> None:
+            nonlocal remaining
+            try:
+                await upload(client)
+            except Exception as e:
+                if self.sharded or len(self.clients) == 1:
+                    raise
+                self.failures[str(client.endpoint_url)] = e
+                if len(self.failures) == len(self.clients):
+                    raise TargetUploadError(self.failures) from e
+            remaining -= 1
+            if remaining == 0:
+                on_complete()
+
+        for client, window in live:
+            await window.submit(upload_to(client))
+
+
+class InflightBudget:
+    """
+    Cap the requests and payload bytes in flight across all files.
+
+    Uploads wait in a queue per file. Whenever room frees up it goes to the
+    file with the fewest requests in flight, taking files with equal shares in
+    turn, so a file with many batches ready cannot crowd out the others. A batch
+    larger than ``max_bytes`` is let through when nothing else is in flight.
+    """
+
+    def __init__(self, max_requests: int | None = None, max_bytes: int | None = None):
+        self.max_requests = max_requests
+        self.max_bytes = max_bytes
+        self.requests = 0
+        self.bytes = 0
+        self._shares: collections.Counter[Path] = collections.Counter()
+        self._waiters: dict[Path, collections.deque[tuple[int, asyncio.Future[None]]]]
+        self._waiters = {}
+
+    @contextlib.asynccontextmanager
+    async def reserve(self, file_path: Path, size: int) -> AsyncIterator[None]:
+        await self.acquire(file_path, size)
+        try:
+            yield
+        finally:
+            self.release(file_path, size)
+
+    async def acquire(self, file_path: Path, size: int) -> None:
+        if not self._waiters and self._fits(size):
+            self._take(file_path, size)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(file_path, collections.deque()).append((size, future))
+        try:
+            await future
+        except BaseException:
+            if future.done() and not future.cancelled():
+                # Room was granted just as the upload was cancelled
+                self.release(file_path, size)
+            else:
+                self._grant()
+            raise
+
+    def release(self, file_path: Path, size: int) -> None:
+        self.requests -= 1
+        self.bytes -= size
+        self._shares[file_path] -= 1
+        if self._shares[file_path] <= 0:
+            del self._shares[file_path]
+        self._grant()
+
+    def _fits(self, size: int) -> bool:
+        if self.requests == 0:
+            return True
+        if self.max_requests is not None and self.requests >= self.max_requests:
+            return False
+        return self.max_bytes is None or self.bytes + size <= self.max_bytes
+
+    def _take(self, file_path: Path, size: int) -> None:
+        self.requests += 1
+        self.bytes += size
+        self._shares[file_path] += 1
+
+    def _grant(self) -> None:
+        while self._waiters:
+            # The first of the files with the smallest share; a file that was
+            # just served moves to the back
+            file_path = min(self._waiters, key=self._shares.__getitem__)
+            waiters = self._waiters[file_path]
+            size, future = waiters[0]
+            # Cancelling a waiting upload cancels its future right away
+            if not future.done() and not self._fits(size):
+                return
+            waiters.popleft()
+            del self._waiters[file_path]
+            if waiters:
+                self._waiters[file_path] = waiters
+            if not future.done():
+                self._take(file_path, size)
+                future.set_result(None)
+
+
+def upload_target(
+    client: EndpointClient,
+    graph: str | None,
+    mirrors: list[EndpointClient] | None = None,
+    shard: bool = False,  # noqa: FBT001, FBT002
+) -> str:
+    """Identify where a file goes, for the checkpoint journal and the ledger."""
+    # Mirrors each get the whole file, shards part of it
+    return (" / " if shard else " | ").join(
+        " ".join(
+            [
+                target.endpoint_type,
+                str(target.endpoint_url),
+                target.store_name or "",
+                graph or "",
+            ]
+        )
+        for target in [client, *(mirrors or [])]
+    )
+
 
-async def upload_rdf_file(
+async def open_journal(
+    checkpoint_dir: Path,
+    file_path: Path,
+    client: EndpointClient,
+    graph: str | None,
+    resume: bool,  # noqa: FBT001
+    mirrors: list[EndpointClient] | None = None,
+    shard: bool = False,  # noqa: FBT001, FBT002
+) -> tuple[CheckpointWriter, Checkpoint | None]:
+    """Open the checkpoint journal of a file, loading its checkpoint when resuming."""
+    journal = await asyncio.to_thread(
+        CheckpointJournal,
+        checkpoint_dir,
+        file_path,
+        upload_target(client, graph, mirrors, shard),
+    )
+    checkpoint = await asyncio.to_thread(journal.load) if resume else None
+    return CheckpointWriter(journal), checkpoint
+
+
+async def upload_rdf_file(  # noqa: C901, PLR0915
     file_path: Path,
     endpoint: str | None = None,
     endpoint_type: EndpointType = EndpointType.GENERIC,
@@ -60,9 +555,23 @@ async def upload_rdf_file(
     username: str | None = None,
     password: str | None = None,
     content_type: str | None = None,
-    batch_size: int = 100,
+    batch_size: int | None = 100,
     stats_callback: Callable[[dict[str, Any]], None] | None = None,
     store_name: str | None = None,
+    client: EndpointClient | None = None,
+    queue_depth: int = 4,
+    inflight_batches: int = 1,
+    single_pass: bool = False,  # noqa: FBT001, FBT002
+    batch_sizer: AdaptiveBatchSizer | None = None,
+    checkpoint_dir: Path | None = None,
+    resume: bool = False,  # noqa: FBT001, FBT002
+    batch_bytes: int | None = None,
+    split_graphs: bool = False,  # noqa: FBT001, FBT002
+    inflight_budget: InflightBudget | None = None,
+    mirrors: list[EndpointClient] | None = None,
+    shard: bool = False,  # noqa: FBT001, FBT002
+    stream: bool = False,  # noqa: FBT001, FBT002
+    commit_policy: CommitPolicy | None = None,
 ) -> bool:
     """
     Upload a single RDF file to a SPARQL endpoint.
@@ -75,42 +584,539 @@ async def upload_rdf_file(
         username: Username for authentication (optional, can be read from environment variables)
         password: Password for authentication (optional, can be read from environment variables)
         content_type: Content type for RDF data (optional, auto-detected if not provided)
-        batch_size: Number of triples per batch for streaming formats
+        batch_size: Number of triples per batch for streaming formats; None
+            leaves batches limited by batch_bytes only
         stats_callback: Callback function for upload statistics
         store_name: RDFox datastore name (only used with RDFox endpoint type)
+        client: Shared endpoint client to upload through (the endpoint, type,
+            credentials and store name arguments are ignored when it is given)
+        queue_depth: Number of batches read ahead of the upload
+        inflight_batches: Number of batches of this file uploaded concurrently
+        single_pass: Skip the triple counting pass and report progress in bytes
+        batch_sizer: Adjusts the batch size while uploading, replacing batch_size
+        checkpoint_dir: Directory of the journal recording the batches committed
+            so far; it is removed once the whole file has been uploaded
+        resume: Skip the batches recorded in the journal by an earlier run
+        batch_bytes: Maximum size in bytes of the data in a batch
+        split_graphs: Upload the quads of an N-Quads file to their own named
+            graphs; quads in the default graph go to ``graph``
+        inflight_budget: Requests and bytes in flight shared with other files
+        mirrors: Further endpoints every batch is posted to as well, each with
+            an in-flight window of its own (see ``FanOut``); the checkpoint
+            journal stops advancing once one of the endpoints fails
+        shard: Spread the triples over ``client`` and the ``mirrors`` by
+            consistent hashing of their subjects instead of loading all of
+            them into each; every endpoint has its own in-flight window
+        stream: Post the whole file as one streamed request (see
+            stream_rdf_file) to endpoint types that take one; ignored with
+            mirrors or split graphs, and the file is not checkpointed
+        commit_policy: Upload the batches one after the other into transactions
+            of the store, committed as the policy says (see
+            upload_in_transactions); the checkpoint journal advances at
+            commits only
 
     Returns:
         True if the upload was successful
     """
-    detected_content_type = content_type or detect_content_type(file_path)
+    if client is None:
+        async with EndpointClient(
+            endpoint_url=endpoint,
+            endpoint_type=endpoint_type,
+            username=username,
+            password=password,
+            content_type=content_type,
+            store_name=store_name,
+        ) as own_client:
+            return await upload_rdf_file(
+                file_path=file_path,
+                graph=graph,
+                content_type=content_type,
+                batch_size=batch_size,
+                stats_callback=stats_callback,
+                client=own_client,
+                queue_depth=queue_depth,
+                inflight_batches=inflight_batches,
+                single_pass=single_pass,
+                batch_sizer=batch_sizer,
+                checkpoint_dir=checkpoint_dir,
+                resume=resume,
+                batch_bytes=batch_bytes,
+                split_graphs=split_graphs,
+                inflight_budget=inflight_budget,
+                mirrors=mirrors,
+                shard=shard,
+                stream=stream,
+                commit_policy=commit_policy,
+            )
 
-    client = EndpointClient(
-        endpoint_url=endpoint,
-        endpoint_type=endpoint_type,
-        username=username,
-        password=password,
-        content_type=detected_content_type,
-        store_name=store_name,
+    targets = [client, *(mirrors or [])]
+    ring = HashRing([str(c.endpoint_url) for c in targets]) if shard else None
+    reader = get_reader(file_path, split_graphs, ring)
+    detected_content_type = (
+        reader.content_type
+        or content_type
+        or client.content_type
+        or detect_content_type(file_path)
     )
 
-    reader = get_reader(file_path)
+    stats = StatsCollector(file_path)
+    if stats_callback:
+        stats.set_callback(stats_callback)
+    stats.batch_sizer = batch_sizer
+
+    streamed = (
+        stream
+        and client.endpoint_strategy.supports_streaming
+        and not (mirrors or split_graphs)
+    )
+    start_offset = 0
+    if checkpoint_dir is not None and not streamed:
+        stats.journal, checkpoint = await open_journal(
+            checkpoint_dir, file_path, client, graph, resume, mirrors, shard
+        )
+        if checkpoint:
+            stats.resume_from(checkpoint)
+            start_offset = checkpoint.end_offset
+
+    stats.set_total_bytes(reader.size())
+    if not single_pass:
+        total_triples = await reader.count_triples()
+        stats.set_total_triples(total_triples)
+
+    if streamed:
+        await stream_rdf_file(
+            reader, client, stats, graph, detected_content_type, queue_depth
+        )
+        return True
+
+    if commit_policy is not None:
+        batches = reader.read_batches(
+            batch_sizer or batch_size, queue_depth, start_offset, batch_bytes
+        )
+        async with (
+            contextlib.aclosing(batches),
+            stats.journal or contextlib.nullcontext(),
+        ):
+            await upload_in_transactions(
+                batches, client, stats, commit_policy, graph, detected_content_type
+            )
+        if stats.journal:
+            await stats.journal.clear()
+        return True
+
+    async def upload_batch(
+        client: EndpointClient, batch_index: int, batch: Batch
+    ) -> None:
+        retried = False
+
+        def on_retry(_attempt: int, _error: Exception) -> None:
+            nonlocal retried
+            retried = True
+            stats.record_retry(batch.triple_count, batch.limit)
+
+        async with (
+            inflight_budget.reserve(file_path, len(batch.data))
+            if inflight_budget
+            else contextlib.nullcontext()
+        ):
+            start = time.monotonic()
+            _, status_code = await client.upload_data(
+                batch.data,
+                batch.graph or graph,
+                content_type=detected_content_type,
+                on_retry=on_retry,
+            )
+        # The time of a retried batch includes the backoff, not just the upload
+        if not retried:
+            stats.record_latency(
+                batch.triple_count, time.monotonic() - start, batch.limit
+            )
+        status_codes[batch_index] = status_code
+
+    def complete_batch(batch_index: int, batch: Batch) -> None:
+        if fan_out.failures:
+            # The journal must not cover batches some endpoints are missing
+            stats.journal = None
+        stats.complete_batch(
+            batch_index,
+            batch.triple_count,
+            status_codes.pop(batch_index, 0),
+            batch.bytes_read,
+            batch.end_offset,
+        )
+
+    status_codes: dict[int, int] = {}
+    fan_out = FanOut(targets, inflight_batches, shard)
+    batches = reader.read_batches(
+        batch_sizer or batch_size, queue_depth, start_offset, batch_bytes
+    )
+    async with (
+        contextlib.aclosing(batches),
+        stats.journal or contextlib.nullcontext(),
+        fan_out,
+    ):
+        batch_index = 0
+        async for batch in batches:
+            await fan_out.submit(
+                functools.partial(upload_batch, batch_index=batch_index, batch=batch),
+                functools.partial(complete_batch, batch_index, batch),
+                batch.shard,
+            )
+            batch_index += 1
 
+    if stats.journal:
+        await stats.journal.clear()
+    return True
+
+
+async def upload_in_transactions(
+    batches: AsyncIterator[Batch],
+    client: EndpointClient,
+    stats: StatsCollector,
+    commit_policy: CommitPolicy,
+    graph: str | None = None,
+    content_type: str | None = None,
+) -> None:
+    """
+    Upload batches into transactions of the store instead of one commit each.
+
+    A transaction is begun for the first batch and committed whenever
+    ``commit_policy`` says so, and at the end of the batches. When a batch
+    fails, the open transaction is rolled back, so the store is left with
+    committed transactions only: with a single transaction per file, the
+    whole file or none of it. The checkpoint journal of ``stats`` records the
+    end of every committed transaction.
+    """
+    transaction: str | None = None
+    batch_count = size = 0
+    end_offset = 0
+
+    async def commit(transaction: str) -> None:
+        await client.commit_transaction(transaction)
+        if stats.journal:
+            stats.journal.commit(
+                Checkpoint(end_offset, stats.batch_num, stats.uploaded_triples)
+            )
+
+    try:
+        async for batch in batches:
+            if transaction is None:
+                transaction = await client.begin_transaction()
+                batch_count = size = 0
+
+            def on_retry(
+                _attempt: int, _error: Exception, batch: Batch = batch
+            ) -> None:
+                stats.record_retry(batch.triple_count, batch.limit)
+
+            _, status_code = await client.upload_in_transaction(
+                transaction, batch.data, batch.graph or graph, content_type, on_retry
+            )
+            stats.update(batch.triple_count, status_code, batch.bytes_read)
+            batch_count += 1
+            size += len(batch.data)
+            end_offset = batch.end_offset
+            if commit_policy.is_due(batch_count, size):
+                committed, transaction = transaction, None
+                await commit(committed)
+        if transaction is not None:
+            committed, transaction = transaction, None
+            await commit(committed)
+    except BaseException:
+        if transaction is not None:
+            # The error that made the transaction fail matters more
+            with contextlib.suppress(httpx.HTTPError):
+                await client.rollback_transaction(transaction)
+        raise
+
+
+async def stream_rdf_file(
+    reader: FileReader,
+    client: EndpointClient,
+    stats: StatsCollector,
+    graph: str | None = None,
+    content_type: str | None = None,
+    queue_depth: int = 4,
+) -> None:
+    """
+    Upload a whole file as one request whose body is streamed from the reader.
+
+    The store commits the file once instead of once per batch, and memory use
+    does not grow with the file. Progress is reported in bytes while the body
+    is sent; the triples counted up front, if any, are reported once the store
+    has accepted them. A retry sends the file again from its start.
+    """
+
+    async def chunks() -> AsyncIterator[bytes]:
+        async for chunk, bytes_read in reader.read_chunks(queue_depth=queue_depth):
+            stats.record_bytes_read(bytes_read)
+            yield chunk
+
+    _, status_code = await client.upload_stream(
+        chunks,
+        graph,
+        content_type,
+        on_retry=lambda _attempt, _error: stats.record_retry(0),
+    )
+    stats.update(stats.total_triples, status_code, reader.size())
+
+
+async def bulk_load_rdf_file(
+    file_path: Path,
+    loader: NeptuneBulkLoader,
+    graph: str | None = None,
+    stats_callback: Callable[[dict[str, Any]], None] | None = None,
+    single_pass: bool = False,  # noqa: FBT001, FBT002
+) -> bool:
+    """
+    Load a single RDF file with the Neptune bulk loader.
+
+    The file is staged in S3 as it is, loaded by a loader job, and removed from
+    the bucket once the job has completed. A file whose job fails is kept in
+    the bucket to look into the failure; any other error, or a cancellation,
+    removes it as well. Progress is reported through
+    ``stats_callback`` like a batched upload: in bytes while the file is
+    staged, then in the records the job has loaded.
+
+    Args:
+        file_path: Path to the RDF file to load
+        loader: Bulk loader of the Neptune cluster
+        graph: Named graph the triples are loaded into
+        stats_callback: Callback function for upload statistics
+        single_pass: Skip the triple counting pass and report progress in bytes
+
+    Returns:
+        True if the load completed
+    """
+    file_format = loader_format(file_path)
     stats = StatsCollector(file_path)
     if stats_callback:
         stats.set_callback(stats_callback)
 
-    total_triples = await reader.count_triples()
-    stats.set_total_triples(total_triples)
+    reader = get_reader(file_path)
+    stats.set_total_bytes(reader.size())
+    if not single_pass:
+        stats.set_total_triples(await reader.count_triples())
+
+    def on_staged(bytes_sent: int, status_code: int) -> None:
+        stats.update(0, status_code, bytes_sent)
 
-    batches = await reader.read_batches(batch_size)
-    for batch_content, batch_count in batches:
-        _, status_code = await client.upload_data(batch_content, graph)
-        stats.update(batch_count, status_code)
+    def on_loaded(records: int, status_code: int) -> None:
+        if records > stats.uploaded_triples:
+            stats.update(records - stats.uploaded_triples, status_code)
 
+    source = await loader.stage(file_path, on_staged)
+    try:
+        load_id = await loader.submit(source, file_format, graph)
+        await loader.wait(load_id, on_loaded)
+    except NeptuneLoadError:
+        raise
+    except BaseException:
+        # The error that stopped the load matters more than a failed removal
+        with contextlib.suppress(httpx.HTTPError):
+            await loader.unstage(source)
+        raise
+    await loader.unstage(source)
     return True
 
 
-async def upload_rdf_files(
+def can_coalesce(file_path: Path, max_bytes: int, split_graphs: bool) -> bool:  # noqa: FBT001
+    """Tell whether a file is a small N-Triples or N-Quads file that can share batches."""
+    suffix = format_suffix(file_path)
+    if suffix not in {".nt", ".nq", ".nquads"} or (split_graphs and suffix != ".nt"):
+        return False
+    try:
+        return file_path.stat().st_size <= max_bytes
+    except OSError:
+        return False
+
+
+def coalesce_groups(
+    file_paths: list[Path],
+    max_bytes: int,
+    content_type: str | None = None,
+    split_graphs: bool = False,  # noqa: FBT001, FBT002
+) -> dict[str, list[Path]]:
+    """Group the files that can share batches by the format they are posted in."""
+    groups: dict[str, list[Path]] = {}
+    for file_path in file_paths:
+        if can_coalesce(file_path, max_bytes, split_graphs):
+            group = content_type or detect_content_type(file_path)
+            groups.setdefault(group, []).append(file_path)
+    return groups
+
+
+def error_result(error: Exception) -> dict[str, Any]:
+    result: dict[str, Any] = {
+        "success": False,
+        "error_type": type(error).__name__,
+        "error_message": str(error),
+    }
+    if isinstance(error, TargetUploadError):
+        # The endpoints not listed have the whole file
+        result["failed_targets"] = {
+            target: error_result(target_error)
+            for target, target_error in error.failures.items()
+        }
+    return result
+
+
+async def check_ledger(
+    ledger: UploadLedger, target: str, file_paths: list[Path]
+) -> tuple[list[Path], dict[Path, str], dict[Path, dict[str, Any]]]:
+    """
+    Look files up in the ledger before uploading them.
+
+    The files are hashed in parallel, as many at a time as the ledger allows.
+    Returns the files still to upload, their content hashes, and the results of
+    the files that were already uploaded or could not be read.
+    """
+    lookups = await asyncio.gather(
+        *(ledger.content_hash(file_path) for file_path in file_paths),
+        return_exceptions=True,
+    )
+    pending = []
+    hashes = {}
+    results: dict[Path, dict[str, Any]] = {}
+    for file_path, content_hash in zip(file_paths, lookups, strict=True):
+        if isinstance(content_hash, OSError):
+            results[file_path] = error_result(content_hash)
+        elif isinstance(content_hash, BaseException):
+            raise content_hash
+        elif ledger.is_uploaded(content_hash, target):
+            hashes[file_path] = content_hash
+            results[file_path] = {"success": True, "skipped": True}
+        else:
+            hashes[file_path] = content_hash
+            pending.append(file_path)
+    return pending, hashes, results
+
+
+async def upload_coalesced_files(  # noqa: C901
+    file_paths: list[Path],
+    client: EndpointClient,
+    graph: str | None = None,
+    content_type: str | None = None,
+    batch_size: int | None = 100,
+    stats_callback: Callable[[dict[str, Any]], None] | None = None,
+    queue_depth: int = 4,
+    inflight_batches: int = 1,
+    batch_sizer: AdaptiveBatchSizer | None = None,
+    batch_bytes: int | None = None,
+    inflight_budget: InflightBudget | None = None,
+    ledger: UploadLedger | None = None,
+    mirrors: list[EndpointClient] | None = None,
+) -> dict[Path, dict[str, Any]]:
+    """
+    Upload many small N-Triples or N-Quads files of the same format together.
+
+    The triples of the files are packed into shared batches, so the number of
+    requests depends on the amount of data rather than on the number of files.
+    A file is uploaded successfully once every batch with data of it is;
+    a failed batch fails all of its files, and the other batches carry on.
+    Progress is reported in bytes for the files as a whole. Files found in the
+    ``ledger`` are skipped, and files uploaded are recorded in it.
+
+    Args:
+        file_paths: N-Triples or N-Quads files small enough to be read whole
+        client: Endpoint client to upload through
+        graph: Named graph to upload to
+        content_type: Content type of the data, detected from the first file
+            if not provided
+        ledger: Ledger of uploaded files
+        mirrors: Further endpoints every batch is posted to as well; a batch
+            fails its files if any endpoint rejects it
+        The other arguments are those of ``upload_rdf_file``.
+
+    Returns:
+        Dictionary mapping file paths to upload results
+    """
+    results: dict[Path, dict[str, Any]] = {}
+    hashes: dict[Path, str] = {}
+    target = upload_target(client, graph, mirrors)
+    if ledger:
+        file_paths, hashes, results = await check_ledger(ledger, target, file_paths)
+        if not file_paths:
+            return results
+
+    label = Path(f"{len(file_paths)} small files")
+    detected_content_type = (
+        content_type or client.content_type or detect_content_type(file_paths[0])
+    )
+    errors: dict[Path, Exception] = {}
+
+    stats = StatsCollector(label)
+    if stats_callback:
+        stats.set_callback(stats_callback)
+    stats.batch_sizer = batch_sizer
+    stats.set_total_bytes(sum(f.stat().st_size for f in file_paths if f.exists()))
+
+    async def upload_batch(batch_index: int, batch: CoalescedBatch) -> None:
+        errors.update(batch.errors)
+        status_code = 0
+        uploaded = 0
+        retries = stats.retries
+
+        def on_retry(_attempt: int, _error: Exception) -> None:
+            stats.record_retry(batch.triple_count, batch.limit)
+
+        if batch.triple_count:
+            async with (
+                inflight_budget.reserve(label, len(batch.data))
+                if inflight_budget
+                else contextlib.nullcontext()
+            ):
+                start = time.monotonic()
+                responses = await asyncio.gather(
+                    *(
+                        target_client.upload_data(
+                            batch.data,
+                            graph,
+                            content_type=detected_content_type,
+                            on_retry=on_retry,
+                        )
+                        for target_client in [client, *(mirrors or [])]
+                    ),
+                    return_exceptions=True,
+                )
+            failures = [r for r in responses if isinstance(r, BaseException)]
+            if not failures:
+                if stats.retries == retries:
+                    stats.record_latency(
+                        batch.triple_count, time.monotonic() - start, batch.limit
+                    )
+                status_code = max(
+                    r[1] for r in responses if not isinstance(r, BaseException)
+                )
+                uploaded = batch.triple_count
+            elif isinstance(failures[0], Exception):
+                # Every file with data in the batch failed
+                for file_path in batch.files:
+                    errors.setdefault(file_path, failures[0])
+            else:
+                raise failures[0]
+        stats.complete_batch(batch_index, uploaded, status_code, batch.bytes_read)
+
+    batches = CoalescingReader(file_paths).read_batches(
+        batch_sizer or batch_size, queue_depth, batch_bytes
+    )
+    async with contextlib.aclosing(batches), InflightWindow(inflight_batches) as window:
+        batch_index = 0
+        async for batch in batches:
+            await window.submit(upload_batch(batch_index, batch))
+            batch_index += 1
+
+    for file_path in file_paths:
+        if file_path in errors:
+            results[file_path] = error_result(errors[file_path])
+            continue
+        if ledger:
+            ledger.record_upload(hashes[file_path], target, file_path)
+        results[file_path] = {"success": True}
+    return results
+
+
+async def upload_rdf_files(  # noqa: C901, PLR0912, PLR0915
     files: list[Path],
     endpoint: str | None = None,
     endpoint_type: EndpointType = EndpointType.GENERIC,
@@ -120,15 +1126,52 @@ async def upload_rdf_files(
     username: str | None = None,
     password: str | None = None,
     content_type: str | None = None,
-    batch_size: int = 100,
+    batch_size: int | None = 100,
     stats_callback: Callable[[dict[str, Any]], None] | None = None,
     store_name: str | None = None,
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20,
+    keepalive_expiry: float = 5.0,
+    http2: bool = False,  # noqa: FBT001, FBT002
+    warmup_connections: int = 0,
+    queue_depth: int = 4,
+    inflight_batches: int = 1,
+    single_pass: bool = False,  # noqa: FBT001, FBT002
+    cpu_workers: int = 0,
+    compress_requests: RequestCompression = RequestCompression.NONE,
+    max_retries: int = 3,
+    retry_backoff: float = 0.5,
+    retry_backoff_max: float = 30.0,
+    adaptive_batch_size: bool = False,  # noqa: FBT001, FBT002
+    target_latency: float = 5.0,
+    max_batch_size: int = 100_000,
+    checkpoint_dir: Path | None = None,
+    resume: bool = False,  # noqa: FBT001, FBT002
+    ledger_path: Path | None = None,
+    batch_bytes: int | None = None,
+    split_graphs: bool = False,  # noqa: FBT001, FBT002
+    schedule_policy: SchedulePolicy = SchedulePolicy.LARGEST_FIRST,
+    schedule_callback: Callable[[MakespanReport], None] | None = None,
+    max_inflight_requests: int | None = None,
+    max_inflight_bytes: int | None = None,
+    coalesce_bytes: int | None = None,
+    mirrors: list[EndpointSettings] | None = None,
+    shard: bool = False,  # noqa: FBT001, FBT002
+    neptune_bulk: NeptuneBulkConfig | None = None,
+    stream: bool = False,  # noqa: FBT001, FBT002
+    transactions: bool = False,  # noqa: FBT001, FBT002
+    commit_batches: int | None = None,
+    commit_bytes: int | None = None,
 ) -> dict[Path, dict[str, Any]]:
     """
     Upload multiple RDF files to a SPARQL endpoint with concurrency control.
 
+    Directories and glob patterns among ``files`` are expanded into the RDF
+    files they contain. ``concurrent_limit`` workers then take the files one
+    after the other, in the order ``schedule_policy`` puts them in.
+
     Args:
-        files: List of paths to RDF files to upload
+        files: List of paths to RDF files, directories or glob patterns to upload
         endpoint: SPARQL endpoint URL (optional, can be read from environment variables)
         endpoint_type: Type of SPARQL endpoint
         graph: Named graph to upload to
@@ -137,44 +1180,298 @@ async def upload_rdf_files(
         username: Username for authentication (optional, can be read from environment variables)
         password: Password for authentication (optional, can be read from environment variables)
         content_type: Content type for RDF data (optional, auto-detected if not provided)
-        batch_size: Number of triples per batch for streaming formats
+        batch_size: Number of triples per batch for streaming formats; None
+            leaves batches limited by batch_bytes only
         stats_callback: Callback function for upload statistics
         store_name: RDFox datastore name (only used with RDFox endpoint type)
+        max_connections: Maximum number of pooled connections to the endpoint
+        max_keepalive_connections: Maximum number of idle connections kept alive
+        keepalive_expiry: Seconds an idle connection is kept alive
+        http2: Multiplex requests over HTTP/2 connections (requires the h2 package)
+        warmup_connections: Number of connections to open before the first upload
+        queue_depth: Number of batches read ahead of the upload for each file
+        inflight_batches: Number of batches of each file uploaded concurrently
+        single_pass: Skip the triple counting pass and report progress in bytes
+        cpu_workers: Number of worker processes for CPU-bound data conversions
+            (0 runs them in a background thread)
+        compress_requests: Content-Encoding for batch request bodies; endpoint
+            types that do not support it receive uncompressed bodies
+        max_retries: Number of times a batch is retried after a transient failure
+        retry_backoff: Base delay in seconds of the exponential retry backoff
+        retry_backoff_max: Maximum delay in seconds between retries
+        adaptive_batch_size: Start from batch_size and adjust the batch size to the
+            server's response times, shared by all files
+        target_latency: Upload time in seconds per batch the adaptive size aims for
+        max_batch_size: Upper bound of the adaptive batch size
+        checkpoint_dir: Directory of the per-file journals of committed batches
+        resume: Continue files from their journal instead of from the start
+        ledger_path: SQLite ledger of uploaded files; files whose content was
+            already uploaded to the same endpoint and graph are skipped
+        batch_bytes: Maximum size in bytes of the data in a batch, on its own or
+            together with batch_size
+        split_graphs: Upload the quads of N-Quads files to their own named graphs
+        schedule_policy: Order in which files are started; largest first keeps a
+            big file from finishing long after all others
+        schedule_callback: Called at the end with the actual and the predicted
+            makespan of the uploads
+        max_inflight_requests: Maximum number of batches in flight across all
+            files, shared fairly between the files being uploaded
+        max_inflight_bytes: Maximum size in bytes of the batches in flight across
+            all files
+        coalesce_bytes: Upload N-Triples and N-Quads files of at most this size
+            together in shared batches, one group per format (see
+            upload_coalesced_files); such files are neither counted first nor
+            checkpointed, and every group takes one of the concurrent slots
+        mirrors: Further endpoints every batch is posted to as well, with
+            their own credentials and store name. They share the connection
+            and retry settings.
+        shard: Spread the triples of N-Triples and N-Quads files over the
+            endpoint and the mirrors by subject instead of loading all of them
+            into each; small files are not coalesced
+        neptune_bulk: Load every file with the Neptune bulk loader, staging it
+            in S3 (see bulk_load_rdf_file); the endpoint must be a Neptune
+            cluster, and batching, checkpoint and fan-out options do not apply
+        stream: Post every file as one streamed request instead of batches to
+            endpoint types that take one (Blazegraph and RDFox); other types
+            are sent batches as usual
+        transactions: Upload the batches of every file into transactions of
+            the store (Stardog and RDFox), rolled back when a batch fails;
+            batches are uploaded one at a time at a fixed size
+        commit_batches: Commit a transaction after this many batches; without
+            it or commit_bytes, every file is loaded in one transaction
+        commit_bytes: Commit a transaction once its batches hold this many bytes
 
     Returns:
         Dictionary mapping file paths to upload results
     """
     results: dict[Path, dict[str, Any]] = {}
-    semaphore = asyncio.Semaphore(concurrent_limit)
+    inputs = expand_inputs(files)
+    if shard and split_graphs:
+        raise ValueError("Sharding cannot be combined with split graphs")  # noqa: TRY003
+    if neptune_bulk and (endpoint_type != EndpointType.NEPTUNE or mirrors):
+        raise ValueError("Bulk loads need a single Neptune endpoint")  # noqa: TRY003
+    if stream and (mirrors or split_graphs):
+        raise ValueError(  # noqa: TRY003
+            "Streamed uploads go to a single endpoint without split graphs"
+        )
+    if transactions and (mirrors or shard or stream):
+        raise ValueError(  # noqa: TRY003
+            "Transactions cannot be combined with several endpoints or streaming"
+        )
+    if transactions and (
+        inflight_batches > 1
+        or max_inflight_requests is not None
+        or max_inflight_bytes is not None
+        or adaptive_batch_size
+    ):
+        raise ValueError(  # noqa: TRY003
+            "Transactions upload one batch at a time at a fixed batch size"
+        )
+    groups = (
+        coalesce_groups(inputs, coalesce_bytes, content_type, split_graphs)
+        if coalesce_bytes is not None and not (shard or neptune_bulk or transactions)
+        else {}
+    )
+    coalesced = {file_path for group in groups.values() for file_path in group}
+    schedule = Schedule(
+        [f for f in inputs if f not in coalesced], concurrent_limit, schedule_policy
+    )
+    # Coalesced groups, then the files still to upload in the order of the
+    # schedule; None stops a worker
+    queue: asyncio.Queue[Path | list[Path] | None] = asyncio.Queue()
+    hashes: dict[Path, str] = {}
+    durations: dict[Path, float] = {}
+    inflight_budget = (
+        InflightBudget(max_inflight_requests, max_inflight_bytes)
+        if max_inflight_requests is not None or max_inflight_bytes is not None
+        else None
+    )
 
-    async def upload_with_semaphore(file_path: Path) -> None:
-        async with semaphore:
-            try:
+    try:
+        client = EndpointClient(
+            endpoint_url=endpoint,
+            endpoint_type=endpoint_type,
+            username=username,
+            password=password,
+            content_type=content_type,
+            store_name=store_name,
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+            http2=http2,
+            warmup_connections=warmup_connections,
+            cpu_workers=cpu_workers,
+            compress_requests=compress_requests,
+            retry_policy=RetryPolicy(max_retries, retry_backoff, retry_backoff_max),
+        )
+
+        mirror_clients = [
+            EndpointClient(
+                endpoint_url=mirror.url,
+                endpoint_type=mirror.endpoint_type,
+                username=mirror.username,
+                password=mirror.password,
+                content_type=content_type,
+                store_name=mirror.store_name,
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+                http2=http2,
+                warmup_connections=warmup_connections,
+                cpu_workers=cpu_workers,
+                compress_requests=compress_requests,
+                retry_policy=RetryPolicy(max_retries, retry_backoff, retry_backoff_max),
+            )
+            for mirror in mirrors or []
+        ]
+    except Exception as e:  # noqa: BLE001
+        # An endpoint that cannot be used fails every file, like a failed upload
+        for file_path in inputs:
+            results[file_path] = error_result(e)
+            if progress_callback:
+                progress_callback()
+        return results
+
+    batch_sizer = (
+        AdaptiveBatchSizer(
+            initial_size=batch_size or 1000,
+            max_size=max_batch_size,
+            target_latency=target_latency,
+        )
+        if adaptive_batch_size
+        else None
+    )
+
+    if transactions and not client.endpoint_strategy.supports_transactions:
+        raise ValueError(  # noqa: TRY003
+            f"{endpoint_type.value} endpoints do not support transactions"
+        )
+    commit_policy = CommitPolicy(commit_batches, commit_bytes) if transactions else None
+    bulk_loader = NeptuneBulkLoader(client, neptune_bulk) if neptune_bulk else None
+    ledger = UploadLedger(ledger_path) if ledger_path else None
+    target = upload_target(client, graph, mirror_clients, shard)
+
+    async def look_up(file_path: Path) -> bool:
+        """Hash a file and tell whether it still has to be uploaded."""
+        if ledger is None:
+            return True
+        try:
+            hashes[file_path] = await ledger.content_hash(file_path)
+        except Exception as e:  # noqa: BLE001
+            results[file_path] = error_result(e)
+        else:
+            if not ledger.is_uploaded(hashes[file_path], target):
+                return True
+            results[file_path] = {"success": True, "skipped": True}
+
+        if progress_callback:
+            progress_callback()
+        return False
+
+    async def feed_queue(workers: int) -> None:
+        for group_files in groups.values():
+            queue.put_nowait(group_files)
+        # All files are looked up at once, hashing as many at a time as the
+        # ledger allows while the files queued before them upload
+        async with asyncio.TaskGroup() as lookups:
+            pending = [lookups.create_task(look_up(f)) for f in schedule.files]
+            for file_path, is_pending in zip(schedule.files, pending, strict=True):
+                if await is_pending:
+                    queue.put_nowait(file_path)
+        for _ in range(workers):
+            queue.put_nowait(None)
+
+    async def upload_one(file_path: Path) -> None:
+        try:
+            start = time.monotonic()
+            if bulk_loader:
+                await bulk_load_rdf_file(
+                    file_path,
+                    bulk_loader,
+                    graph=graph,
+                    stats_callback=stats_callback,
+                    single_pass=single_pass,
+                )
+            else:
                 await upload_rdf_file(
                     file_path=file_path,
-                    endpoint=endpoint,
-                    endpoint_type=endpoint_type,
                     graph=graph,
-                    username=username,
-                    password=password,
                     content_type=content_type,
                     batch_size=batch_size,
                     stats_callback=stats_callback,
-                    store_name=store_name,
+                    client=client,
+                    queue_depth=queue_depth,
+                    inflight_batches=inflight_batches,
+                    single_pass=single_pass,
+                    batch_sizer=batch_sizer,
+                    checkpoint_dir=checkpoint_dir,
+                    resume=resume,
+                    batch_bytes=batch_bytes,
+                    split_graphs=split_graphs,
+                    inflight_budget=inflight_budget,
+                    mirrors=mirror_clients,
+                    shard=shard,
+                    stream=stream,
+                    commit_policy=commit_policy,
                 )
-                results[file_path] = {"success": True}
-            except Exception as e:  # noqa: BLE001
-                results[file_path] = {
-                    "success": False,
-                    "error_type": type(e).__name__,
-                    "error_message": str(e),
-                }
+            durations[file_path] = time.monotonic() - start
+            if ledger and file_path in hashes:
+                ledger.record_upload(hashes[file_path], target, file_path)
+            results[file_path] = {"success": True}
+        except Exception as e:  # noqa: BLE001
+            results[file_path] = error_result(e)
 
-            if progress_callback:
+        if progress_callback:
+            progress_callback()
+
+    async def upload_group(file_paths: list[Path]) -> None:
+        try:
+            results.update(
+                await upload_coalesced_files(
+                    file_paths,
+                    client=client,
+                    graph=graph,
+                    content_type=content_type,
+                    batch_size=batch_size,
+                    stats_callback=stats_callback,
+                    queue_depth=queue_depth,
+                    inflight_batches=inflight_batches,
+                    batch_sizer=batch_sizer,
+                    batch_bytes=batch_bytes,
+                    inflight_budget=inflight_budget,
+                    ledger=ledger,
+                    mirrors=mirror_clients,
+                )
+            )
+        except Exception as e:  # noqa: BLE001
+            results.update({file_path: error_result(e) for file_path in file_paths})
+
+        if progress_callback:
+            for _ in file_paths:
                 progress_callback()
 
-    async with asyncio.TaskGroup() as tg:
-        for file_path in files:
-            tg.create_task(upload_with_semaphore(file_path))
+    async def upload_worker() -> None:
+        # Every worker is a concurrency slot taking the next group or file
+        while (item := await queue.get()) is not None:
+            if isinstance(item, list):
+                await upload_group(item)
+            else:
+                await upload_one(item)
+
+    start = time.monotonic()
+    try:
+        async with contextlib.AsyncExitStack() as stack:
+            for endpoint_client in [client, *mirror_clients]:
+                await stack.enter_async_context(endpoint_client)
+            tg = await stack.enter_async_context(asyncio.TaskGroup())
+            workers = min(schedule.slots, len(groups) + len(schedule.files))
+            tg.create_task(feed_queue(workers))
+            for _ in range(workers):
+                tg.create_task(upload_worker())
+    finally:
+        if ledger:
+            ledger.close()
 
+    if schedule_callback:
+        schedule_callback(schedule.report(durations, time.monotonic() - start))
     return results
@@ -29,6 +29,11 @@ def sample_turtle_file() -> Path:
     return TEST_DATA_DIR / "sample.ttl"
 
 
+@pytest.fixture()
+def sample_statements_turtle_file() -> Path:
+    return TEST_DATA_DIR / "statements.ttl"
+
+
 @pytest.fixture()
 def sample_nq_file() -> Path:
     return TEST_DATA_DIR / "sample.nq"
@@ -0,0 +1,71 @@
+"""Tests for the checkpoint journal."""
+
+import asyncio
+import os
+import threading
+
+import pytest
+
+from rdf_uploader.checkpoint import Checkpoint, CheckpointJournal, CheckpointWriter
+
+
+def test_checkpoint_journal_roundtrip(tmp_path, sample_nq_file):
+    """Test committing, loading and clearing a checkpoint."""
+    journal = CheckpointJournal(tmp_path / "journals", sample_nq_file, "endpoint")
+    assert journal.load() is None
+
+    journal.commit(Checkpoint(end_offset=1024, batch_count=2, triple_count=200))
+    assert journal.load() == Checkpoint(1024, 2, 200)
+    # Nothing but the journal itself is left behind
+    assert list(journal.path.parent.iterdir()) == [journal.path]
+
+    other_target = CheckpointJournal(tmp_path / "journals", sample_nq_file, "other")
+    assert other_target.load() is None
+
+    journal.clear()
+    assert journal.load() is None
+
+
+def test_checkpoint_journal_ignores_changed_files(tmp_path, sample_nq_file):
+    """Test that a checkpoint is discarded once the file is modified."""
+    data_file = tmp_path / "data.nq"
+    data_file.write_bytes(sample_nq_file.read_bytes())
+
+    journal = CheckpointJournal(tmp_path, data_file, "endpoint")
+    journal.commit(Checkpoint(100, 1, 1))
+    assert CheckpointJournal(tmp_path, data_file, "endpoint").load() is not None
+
+    stat = data_file.stat()
+    os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert CheckpointJournal(tmp_path, data_file, "endpoint").load() is None
+
+    journal.path.write_text("{not json", encoding="utf-8")
+    assert journal.load() is None
+
+
+@pytest.mark.asyncio()
+async def test_checkpoint_writer(tmp_path, sample_nq_file):
+    """Test that checkpoints are written in a thread, the latest one last."""
+    journal = CheckpointJournal(tmp_path, sample_nq_file, "endpoint")
+    written = []
+    commit = journal.commit
+
+    def record(checkpoint: Checkpoint) -> None:
+        written.append((checkpoint, threading.current_thread()))
+        commit(checkpoint)
+
+    journal.commit = record  # type: ignore[method-assign]
+    async with CheckpointWriter(journal) as writer:
+        writer.commit(Checkpoint(100, 1, 1))
+        # Let the first write start
+        await asyncio.sleep(0)
+        for batch_count in range(2, 11):
+            writer.commit(Checkpoint(batch_count * 100, batch_count, batch_count))
+
+    # Checkpoints committed during a write are skipped for the latest one
+    assert [checkpoint.batch_count for checkpoint, _ in written] == [1, 10]
+    assert threading.main_thread() not in {thread for _, thread in written}
+    assert journal.load() == Checkpoint(1000, 10, 10)
+
+    await writer.clear()
+    assert journal.load() is None
@@ -1,9 +1,12 @@
 """Tests for the CLI module."""
 
 import pytest
+import typer
 from typer.testing import CliRunner
 
-from rdf_uploader.cli import app
+from rdf_uploader.cli import app, pair_endpoints
+from rdf_uploader.endpoints import EndpointType
+from rdf_uploader.uploader import EndpointSettings
 
 
 @pytest.fixture()
@@ -110,3 +113,44 @@ def test_upload_command_with_verbose(runner, sample_nq_file, marklogic_endpoint)
     # that the CLI parsing works correctly
     # We expect the command to run but fail to connect to the endpoint
     assert isinstance(result.exit_code, int)
+
+
+def test_upload_command_rejects_concurrent_transactions(runner, sample_nq_file):
+    """Test that options that do not apply to transactions are refused."""
+    result = runner.invoke(
+        app,
+        [
+            "upload",
+            str(sample_nq_file),
+            "--endpoint",
+            "http://localhost:5820/db",
+            "--type",
+            "stardog",
+            "--transaction",
+            "--inflight-batches",
+            "4",
+        ],
+    )
+    assert result.exit_code == 2
+    assert "--inflight-batches" in result.output
+
+
+def test_pair_endpoints():
+    """Test that every endpoint gets its own type, credentials and store name."""
+    rdfox, stardog = EndpointType.RDFOX, EndpointType.STARDOG
+    assert pair_endpoints(
+        ["http://rdfox:12110", "http://stardog:5820/db"],
+        [rdfox, stardog],
+        usernames=["guest", "admin"],
+        passwords=["secret"],
+        store_names=["default"],
+    ) == [
+        EndpointSettings("http://rdfox:12110", rdfox, "guest", "secret", "default"),
+        EndpointSettings(
+            "http://stardog:5820/db", stardog, "admin", "secret", "default"
+        ),
+    ]
+    assert pair_endpoints(None, [rdfox]) == [EndpointSettings(None, rdfox)]
+
+    with pytest.raises(typer.BadParameter, match="one --username per --endpoint"):
+        pair_endpoints(["a", "b", "c"], [rdfox], usernames=["x", "y"])
@@ -1,10 +1,21 @@
 """Tests for the endpoints module."""
 
+import gzip
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import httpx
 import pytest
 
-from rdf_uploader.endpoints import EndpointClient, EndpointType, RDFoxEndpoint
+from rdf_uploader.endpoints import (
+    EndpointClient,
+    EndpointType,
+    RDFoxEndpoint,
+    RequestCompression,
+    RetryPolicy,
+    convert_turtle_to_ntriples,
+    retry_after_seconds,
+)
 
 
 def test_endpoint_client_init():
@@ -55,6 +66,321 @@ def test_endpoint_client_init_with_store_name():
     assert client.endpoint_strategy.store_name == custom_store
 
 
+@pytest.mark.asyncio()
+async def test_endpoint_client_shared_pool():
+    """Test that the pooled HTTP client lives as long as the endpoint client."""
+    client = EndpointClient(
+        endpoint_url="http://example.org/sparql",
+        endpoint_type=EndpointType.BLAZEGRAPH,
+        max_connections=4,
+        max_keepalive_connections=2,
+    )
+    assert client.http_client is None
+
+    async with client:
+        pooled = client.http_client
+        assert pooled is not None
+        # Opening again keeps the same pool
+        await client.open()
+        assert client.http_client is pooled
+
+    assert client.http_client is None
+    assert pooled.is_closed
+
+
+@pytest.mark.asyncio()
+async def test_endpoint_client_warmup_survives_transport_errors(caplog):
+    """Test that connections failing to warm up are logged instead of raised."""
+    methods = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        methods.append(request.method)
+        if request.method == "HEAD" and methods.count("HEAD") > 1:
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200)
+
+    async with EndpointClient(
+        endpoint_url="http://example.org",
+        endpoint_type=EndpointType.BLAZEGRAPH,
+        warmup_connections=3,
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        await client.upload_data("<a> <b> <c> .\n")
+
+    assert methods == ["HEAD", "HEAD", "HEAD", "POST"]
+    assert caplog.text.count("Could not warm up a connection") == 2
+
+
+def test_endpoint_client_request_compression_capabilities(caplog):
+    """Test that request compression is only enabled where the store supports it."""
+    blazegraph = EndpointClient(
+        endpoint_url="http://example.org",
+        endpoint_type=EndpointType.BLAZEGRAPH,
+        compress_requests=RequestCompression.GZIP,
+    )
+    assert blazegraph.endpoint_strategy.content_encoding == "gzip"
+
+    marklogic = EndpointClient(
+        endpoint_url="http://example.org",
+        endpoint_type=EndpointType.MARKLOGIC,
+        compress_requests=RequestCompression.GZIP,
+    )
+    assert marklogic.endpoint_strategy.content_encoding is None
+    assert "marklogic endpoints do not accept gzip" in caplog.text
+
+
+@pytest.mark.asyncio()
+async def test_upload_compressed_request_body(sample_nq_file):
+    """Test that batches are sent gzip-compressed with a Content-Encoding header."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200)
+
+    client = EndpointClient(
+        endpoint_url="http://example.org",
+        endpoint_type=EndpointType.STARDOG,
+        compress_requests=RequestCompression.GZIP,
+    )
+    data = sample_nq_file.read_bytes()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+        await client.endpoint_strategy.upload(
+            data, content_type="application/n-quads", client=http
+        )
+
+    assert requests[0].headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(requests[0].content) == data
+    assert len(requests[0].content) < len(data) / 4
+
+
+@pytest.mark.asyncio()
+async def test_upload_stream():
+    """Test that a streamed body is sent chunked and opened again for a retry."""
+    requests = []
+    statuses = iter([503, 200])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(next(statuses))
+
+    opened = 0
+
+    async def chunks():
+        nonlocal opened
+        opened += 1
+        for chunk in (b"<a> <b> <c> .\n", b"<d> <e> <f> .\n"):
+            yield chunk
+
+    async with EndpointClient(
+        endpoint_url="http://example.org",
+        endpoint_type=EndpointType.RDFOX,
+        store_name="store",
+        compress_requests=RequestCompression.GZIP,
+        retry_policy=RetryPolicy(backoff=0),
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        result = await client.upload_stream(
+            chunks, content_type="application/n-triples"
+        )
+
+    assert result == (True, 200)
+    assert opened == 2
+    assert requests[1].headers["Transfer-Encoding"] == "chunked"
+    assert requests[1].headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(requests[1].content) == b"<a> <b> <c> .\n<d> <e> <f> .\n"
+
+    stardog = EndpointClient(
+        endpoint_url="http://example.org", endpoint_type=EndpointType.STARDOG
+    )
+    with pytest.raises(ValueError, match="streamed uploads"):
+        await stardog.upload_stream(chunks)
+
+
+@pytest.mark.asyncio()
+async def test_stardog_transaction():
+    """Test that batches are added to a Stardog transaction and committed."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path.endswith("/begin"):
+            return httpx.Response(200, text="tx-1")
+        return httpx.Response(200)
+
+    async with EndpointClient(
+        endpoint_url="http://example.org/db",
+        endpoint_type=EndpointType.STARDOG,
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        transaction = await client.begin_transaction()
+        await client.upload_in_transaction(
+            transaction, b"<a> <b> <c> .", graph="http://ex.org/g"
+        )
+        await client.commit_transaction(transaction)
+        await client.rollback_transaction(transaction)
+
+    assert [str(r.url) for r in requests] == [
+        "http://example.org/db/transaction/begin",
+        "http://example.org/db/tx-1/add?graph-uri=http%3A%2F%2Fex.org%2Fg",
+        "http://example.org/db/transaction/commit/tx-1",
+        "http://example.org/db/transaction/rollback/tx-1",
+    ]
+    assert requests[1].content == b"<a> <b> <c> ."
+
+
+@pytest.mark.asyncio()
+async def test_rdfox_transaction():
+    """Test that an RDFox transaction runs on a connection it opens and closes."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path.endswith("/connections"):
+            return httpx.Response(
+                201, headers={"Location": "/datastores/store/connections/c1"}
+            )
+        return httpx.Response(204)
+
+    async with EndpointClient(
+        endpoint_url="http://example.org",
+        endpoint_type=EndpointType.RDFOX,
+        store_name="store",
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        transaction = await client.begin_transaction()
+        await client.upload_in_transaction(transaction, b"<a> <b> <c> .")
+        await client.rollback_transaction(transaction)
+
+    connection = "http://example.org/datastores/store/connections/c1"
+    assert [(r.method, str(r.url)) for r in requests] == [
+        ("POST", "http://example.org/datastores/store/connections"),
+        ("POST", f"{connection}/transaction?type=read-write"),
+        ("POST", "http://example.org/datastores/store/content?connection=c1"),
+        ("POST", f"{connection}/transaction?operation=rollback"),
+        ("DELETE", connection),
+    ]
+
+    blazegraph = EndpointClient(
+        endpoint_url="http://example.org", endpoint_type=EndpointType.BLAZEGRAPH
+    )
+    with pytest.raises(ValueError, match="do not support transactions"):
+        await blazegraph.begin_transaction()
+
+
+@pytest.mark.asyncio()
+async def test_upload_data_retries_transient_failures():
+    """Test that connection errors and 503 responses are retried."""
+    responses = iter(
+        [
+            httpx.ConnectError("connection reset"),
+            httpx.Response(503, headers={"Retry-After": "0"}),
+            httpx.Response(204),
+        ]
+    )
+
+    def handler(_request: httpx.Request) -> httpx.Response:
+        response = next(responses)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    retries = []
+    async with EndpointClient(
+        endpoint_url="http://example.org",
+        endpoint_type=EndpointType.BLAZEGRAPH,
+        retry_policy=RetryPolicy(max_retries=2, backoff=0),
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        result = await client.upload_data(
+            "<a> <b> <c> .",
+            on_retry=lambda attempt, error: retries.append((attempt, type(error))),
+        )
+
+    assert result == (True, 204)
+    assert retries == [(1, httpx.ConnectError), (2, httpx.HTTPStatusError)]
+
+
+@pytest.mark.asyncio()
+async def test_upload_data_gives_up():
+    """Test that permanent errors and exhausted retries are raised."""
+    statuses = iter([429, 429, 400])
+
+    def handler(_request: httpx.Request) -> httpx.Response:
+        return httpx.Response(next(statuses))
+
+    async with EndpointClient(
+        endpoint_url="http://example.org",
+        endpoint_type=EndpointType.BLAZEGRAPH,
+        retry_policy=RetryPolicy(max_retries=1, backoff=0),
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        with pytest.raises(httpx.HTTPStatusError, match="429"):
+            await client.upload_data("<a> <b> <c> .")
+        # 400 is not retried
+        with pytest.raises(httpx.HTTPStatusError, match="400"):
+            await client.upload_data("<a> <b> <c> .")
+
+
+def test_retry_delays():
+    """Test backoff bounds and Retry-After parsing."""
+    policy = RetryPolicy(backoff=1.0, backoff_max=5.0)
+    assert all(0 <= policy.delay(1) <= 1.0 for _ in range(20))
+    assert all(0 <= policy.delay(10) <= 5.0 for _ in range(20))
+    assert policy.delay(10, retry_after=2.0) == 2.0
+    # A Retry-After longer than the maximum delay is capped like any other wait
+    assert policy.delay(10, retry_after=42.0) == 5.0
+
+    def response(value: str) -> httpx.Response:
+        return httpx.Response(503, headers={"Retry-After": value})
+
+    assert retry_after_seconds(response("7")) == 7.0
+    assert retry_after_seconds(response("Wed, 21 Oct 2015 07:28:00 GMT")) == 0.0
+    assert retry_after_seconds(response("soon")) is None
+    assert retry_after_seconds(httpx.Response(503)) is None
+
+
+@pytest.mark.asyncio()
+async def test_endpoint_client_process_pool(sample_turtle_file):
+    """Test that conversions run in the client's process pool while it is open."""
+    client = EndpointClient(
+        endpoint_url="http://example.org",
+        endpoint_type=EndpointType.MARKLOGIC,
+        cpu_workers=1,
+    )
+    async with client:
+        executor = client.endpoint_strategy.executor
+        assert isinstance(executor, ProcessPoolExecutor)
+        turtle = sample_turtle_file.read_text(encoding="utf-8")
+        ntriples = executor.submit(convert_turtle_to_ntriples, turtle).result()
+        assert ntriples is not None
+        assert len(ntriples.strip().splitlines()) == 3
+
+    assert client.endpoint_strategy.executor is None
+
+
+@pytest.mark.asyncio()
+async def test_marklogic_converts_turtle_bytes(sample_turtle_file):
+    """Test that MarkLogic decodes Turtle batches to send them as N-Triples."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(201)
+
+    async with EndpointClient(
+        endpoint_url="http://example.org",
+        endpoint_type=EndpointType.MARKLOGIC,
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        await client.upload_data(
+            sample_turtle_file.read_bytes(), content_type="text/turtle"
+        )
+
+    assert requests[0].headers["Content-Type"] == "application/n-triples"
+    assert len(requests[0].content.decode("utf-8").strip().splitlines()) == 3
+
+
 @pytest.mark.parametrize(
     "endpoint_type",
     [
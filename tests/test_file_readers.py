@@ -1,15 +1,30 @@
 """Tests for file reading functionality."""
 
+import asyncio
+import bz2
+import gzip
+import lzma
+
 import pytest
+from rdflib import Graph
 
 from rdf_uploader.file_readers import (
+    CoalescingReader,
+    GraphRoutingReader,
     LineBasedReader,
+    TurtleReader,
     WholeFileReader,
     count_file_lines,
+    detect_content_type,
     get_reader,
+    iterate_in_thread,
 )
 
 
+async def collect_batches(reader, **kwargs):
+    return [batch async for batch in reader.read_batches(**kwargs)]
+
+
 @pytest.mark.asyncio()
 async def test_count_lines_turtle(sample_turtle_file):
     """Test counting lines in a Turtle file."""
@@ -33,7 +48,7 @@ def test_get_reader_nquads(sample_nq_file):
 def test_get_reader_turtle(sample_turtle_file):
     """Test getting the correct reader for Turtle files."""
     reader = get_reader(sample_turtle_file)
-    assert isinstance(reader, WholeFileReader)
+    assert isinstance(reader, TurtleReader)
 
 
 @pytest.mark.asyncio()
@@ -50,18 +65,57 @@ async def test_line_based_reader_read_batches(sample_nq_file):
     reader = LineBasedReader(sample_nq_file)
 
     # Test with batch size larger than file
-    batches = await reader.read_batches(batch_size=900)
+    batches = await collect_batches(reader, batch_size=900)
     assert len(batches) == 1
     assert batches[0][1] == 500  # 500 triples in the batch
 
     # Test with smaller batch size
-    batches = await reader.read_batches(batch_size=240)
+    batches = await collect_batches(reader, batch_size=240)
     assert len(batches) == 3
     assert batches[0][1] == 240  # 240 triples in first batch
     assert batches[1][1] == 240  # 260 triples in second batch
     assert batches[2][1] == 20  # 260 triples in second batch
 
 
+@pytest.mark.asyncio()
+async def test_line_based_reader_tracks_offsets(sample_nq_file):
+    """Test that batches report exact triple counts and bytes consumed."""
+    reader = LineBasedReader(sample_nq_file)
+    batches = await collect_batches(reader, batch_size=240)
+
+    assert sum(batch.triple_count for batch in batches) == 500
+    offsets = [batch.end_offset for batch in batches]
+    assert offsets == sorted(offsets)
+    assert offsets[-1] == reader.size()
+
+
+@pytest.mark.asyncio()
+async def test_line_based_reader_skips_blank_and_comment_lines(tmp_path):
+    """Test that blank and comment lines are not counted as triples."""
+    triples = [
+        f"<http://example.org/s{i}> <http://example.org/p> <#o> .\r\n" for i in range(5)
+    ]
+    data_file = tmp_path / "mixed.nt"
+    data_file.write_text(
+        "# header\r\n\r\n"
+        + triples[0]
+        + triples[1]
+        + "   \r\n  # indented comment\r\n"
+        + "".join(triples[2:4])
+        + "\n\n"
+        + triples[4].rstrip(),
+        encoding="utf-8",
+    )
+    reader = LineBasedReader(data_file)
+
+    assert await reader.count_triples() == 5
+    batches = await collect_batches(reader, batch_size=2)
+    assert [batch.triple_count for batch in batches] == [2, 2, 1]
+    assert batches[-1].end_offset == reader.size()
+    # Batches are slices of the file between line boundaries
+    assert b"".join(batch.data for batch in batches) == data_file.read_bytes()
+
+
 @pytest.mark.asyncio()
 async def test_whole_file_reader_count_triples(sample_turtle_file):
     """Test counting triples in a Turtle file."""
@@ -77,9 +131,264 @@ async def test_whole_file_reader_read_batches(sample_turtle_file):
     reader = WholeFileReader(sample_turtle_file)
 
     # Turtle files are always read as a single batch
-    batches = await reader.read_batches(batch_size=100)
+    batches = await collect_batches(reader, batch_size=100)
     assert len(batches) == 1
 
-    # The content should be the entire file
-    content = await reader.read_all()
-    assert batches[0][0] == content
+    # The content should be the entire file, as it is on disk
+    assert batches[0][0] == sample_turtle_file.read_bytes()
+
+
+@pytest.mark.asyncio()
+async def test_iterate_in_thread_is_bounded():
+    """Test that the producer only runs a bounded distance ahead of the consumer."""
+    produced = []
+
+    def produce():
+        for i in range(100):
+            produced.append(i)
+            yield i
+
+    stream = iterate_in_thread(produce(), queue_depth=2)
+    assert await anext(stream) == 0
+    await asyncio.sleep(0.1)
+    # Queue depth plus the item held by the producer and the one handed out
+    assert len(produced) <= 4
+    await stream.aclose()
+
+
+@pytest.mark.asyncio()
+async def test_iterate_in_thread_closes_iterator_and_propagates_errors():
+    """Test that early exit closes the iterator and producer errors are raised."""
+    closed = []
+
+    class BrokenInputError(Exception):
+        pass
+
+    def produce():
+        try:
+            yield 1
+            yield 2
+            raise BrokenInputError
+        finally:
+            closed.append(True)
+
+    stream = iterate_in_thread(produce())
+    assert [await anext(stream), await anext(stream)] == [1, 2]
+    with pytest.raises(BrokenInputError):
+        await anext(stream)
+
+    stream = iterate_in_thread(produce())
+    assert await anext(stream) == 1
+    await stream.aclose()
+    assert closed == [True, True]
+
+
+@pytest.mark.asyncio()
+async def test_turtle_reader_read_batches(sample_statements_turtle_file):
+    """Test batching a Turtle file at statement boundaries."""
+    reader = TurtleReader(sample_statements_turtle_file)
+    expected = Graph().parse(sample_statements_turtle_file, format="turtle")
+
+    batches = await collect_batches(reader, batch_size=1)
+    assert len(batches) == 4
+
+    # Each batch parses on its own and together they hold the whole file
+    combined = Graph()
+    for batch in batches:
+        assert batch.data.startswith(b"@prefix ex:")
+        combined.parse(data=batch.data, format="turtle")
+    assert len(combined) == len(expected)
+
+    batches = await collect_batches(reader, batch_size=1000)
+    # The mid-file PREFIX directive starts a new batch
+    assert len(batches) == 2
+
+
+@pytest.mark.asyncio()
+async def test_read_batches_by_size(tmp_path, sample_nq_file):
+    """Test that batches are capped in bytes, alone or with a triple count."""
+    long_triple = f'<http://example.org/s> <http://example.org/p> "{"x" * 5000}" .\n'
+    data_file = tmp_path / "mixed.nq"
+    data_file.write_bytes(long_triple.encode() + sample_nq_file.read_bytes())
+    reader = LineBasedReader(data_file)
+
+    batches = await collect_batches(reader, batch_size=None, batch_bytes=4096)
+    # The long triple does not fit and goes alone
+    assert batches[0].triple_count == 1
+    assert all(len(batch.data) <= 4096 for batch in batches[1:])
+    assert sum(batch.triple_count for batch in batches) == 501
+    assert b"".join(batch.data for batch in batches) == data_file.read_bytes()
+
+    capped = await collect_batches(reader, batch_size=10, batch_bytes=4096)
+    assert max(batch.triple_count for batch in capped) == 10
+    assert len(capped) > len(batches)
+
+
+@pytest.mark.asyncio()
+async def test_turtle_reader_read_batches_by_size(sample_statements_turtle_file):
+    """Test that Turtle batches, directives included, stay within the byte cap."""
+    reader = TurtleReader(sample_statements_turtle_file)
+    whole = await collect_batches(reader, batch_size=None, batch_bytes=1 << 20)
+    assert len(whole) == 2
+
+    batches = await collect_batches(reader, batch_size=None, batch_bytes=150)
+    assert len(batches) > 2
+    combined = Graph()
+    for batch in batches:
+        combined.parse(data=batch.data, format="turtle")
+    expected = Graph().parse(sample_statements_turtle_file, format="turtle")
+    assert len(combined) == len(expected)
+
+
+@pytest.mark.asyncio()
+async def test_graph_routing_reader(tmp_path):
+    """Test that quads are batched per graph and stripped of their graph term."""
+    data_file = tmp_path / "graphs.nq"
+    data_file.write_text(
+        "# two graphs and the default graph\n"
+        '<http://ex.org/s> <http://ex.org/p> "a <http://ex.org/x> ." <http://ex.org/g1> .\n'
+        "<http://ex.org/s> <http://ex.org/p> _:b1 <http://ex.org/g2> .\n"
+        '<http://ex.org/s> <http://ex.org/p> "b"@en .\n'
+        '<http://ex.org/s> <http://ex.org/p> "1"^^<http://ex.org/int> <http://ex.org/g1> .\n'
+        "<http://ex.org/s> <http://ex.org/p> <http://ex.org/o> <http://ex.org/g2> .\n",
+        encoding="utf-8",
+    )
+    reader = GraphRoutingReader(data_file)
+
+    batches = await collect_batches(reader, batch_size=2)
+    assert [(batch.graph, batch.triple_count) for batch in batches] == [
+        ("http://ex.org/g1", 2),
+        ("http://ex.org/g2", 2),
+        (None, 1),
+    ]
+    assert batches[0].data == (
+        b'<http://ex.org/s> <http://ex.org/p> "a <http://ex.org/x> ." .\n'
+        b'<http://ex.org/s> <http://ex.org/p> "1"^^<http://ex.org/int> .\n'
+    )
+    # Batches end where the oldest quad still buffered starts
+    lines = data_file.read_bytes().splitlines(keepends=True)
+    line_offsets = [sum(len(line) for line in lines[:i]) for i in range(len(lines))]
+    assert [batch.end_offset for batch in batches] == [
+        line_offsets[2],
+        line_offsets[3],
+        reader.size(),
+    ]
+
+    # With no room to buffer, every quad is sent as soon as it is read
+    reader = GraphRoutingReader(data_file, buffer_bytes=0)
+    batches = await collect_batches(reader, batch_size=100)
+    assert [batch.triple_count for batch in batches] == [1] * 5
+
+
+@pytest.mark.asyncio()
+async def test_coalescing_reader(tmp_path):
+    """Test that small files share batches and keep their blank nodes apart."""
+    files = []
+    for index in range(3):
+        file_path = tmp_path / f"{index}.nt"
+        file_path.write_text(
+            f'_:b <http://ex.org/p> "_:b {index}" .\n'
+            f"<http://ex.org/s{index}> <http://ex.org/p> _:b",
+            encoding="utf-8",
+        )
+        files.append(file_path)
+    missing = tmp_path / "missing.nt"
+
+    reader = CoalescingReader([files[0], missing, files[1], files[2]])
+    batches = await collect_batches(reader, batch_size=4)
+
+    assert [batch.triple_count for batch in batches] == [4, 2]
+    assert batches[0].files == (files[0], files[1])
+    assert [path for path, _ in batches[0].errors] == [missing]
+    assert batches[1].files == (files[2],)
+    assert batches[1].bytes_read == sum(f.stat().st_size for f in files)
+    assert batches[0].data.splitlines()[:2] == [
+        b'_:f0_b <http://ex.org/p> "_:b 0" .',
+        b"<http://ex.org/s0> <http://ex.org/p> _:f0_b",
+    ]
+    assert b"_:f3_b" in batches[1].data
+
+    # A file split across batches is listed in both
+    batches = await collect_batches(CoalescingReader(files), batch_size=3)
+    assert [batch.files for batch in batches] == [
+        (files[0], files[1]),
+        (files[1], files[2]),
+    ]
+
+
+def compress(data: bytes, suffix: str) -> bytes:
+    if suffix == ".zst":
+        zstandard = pytest.importorskip("zstandard")
+        return zstandard.ZstdCompressor().compress(data)
+    return {".gz": gzip.compress, ".bz2": bz2.compress, ".xz": lzma.compress}[suffix](
+        data
+    )
+
+
+def test_detect_compressed_content_type(tmp_path):
+    """Test that the format of a compressed file is taken from the inner suffix."""
+    assert detect_content_type(tmp_path / "dump.nt.gz") == "application/n-triples"
+    assert detect_content_type(tmp_path / "dump.TTL.zst") == "text/turtle"
+    assert isinstance(get_reader(tmp_path / "dump.nq.bz2"), LineBasedReader)
+    assert isinstance(get_reader(tmp_path / "dump.ttl.xz"), TurtleReader)
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize("suffix", [".gz", ".bz2", ".xz", ".zst"])
+async def test_compressed_readers_match_plain_files(
+    tmp_path, sample_nq_file, sample_statements_turtle_file, suffix
+):
+    """Test that compressed files are read as if they were decompressed first."""
+    for plain_file in (sample_nq_file, sample_statements_turtle_file):
+        compressed_file = tmp_path / (plain_file.name + suffix)
+        compressed_file.write_bytes(compress(plain_file.read_bytes(), suffix))
+
+        expected = await collect_batches(get_reader(plain_file), batch_size=3)
+        reader = get_reader(compressed_file)
+        batches = await collect_batches(reader, batch_size=3)
+
+        assert [b[:3] for b in batches] == [b[:3] for b in expected]
+        assert (
+            await reader.count_triples() == await get_reader(plain_file).count_triples()
+        )
+        # Progress is measured against the compressed file on disk
+        progress = [batch.bytes_read for batch in batches]
+        assert progress == sorted(progress)
+        assert progress[-1] <= reader.size() == compressed_file.stat().st_size
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize("suffix", ["", ".gz"])
+async def test_read_chunks(tmp_path, sample_nq_file, suffix):
+    """Test that a file is streamed as it is, decompressed, in chunks."""
+    data = sample_nq_file.read_bytes()
+    file_path = tmp_path / (sample_nq_file.name + suffix)
+    file_path.write_bytes(compress(data, suffix) if suffix else data)
+    reader = get_reader(file_path)
+
+    chunks = [chunk async for chunk in reader.read_chunks(chunk_size=100)]
+
+    assert b"".join(chunk for chunk, _ in chunks) == data
+    assert all(len(chunk) <= 100 for chunk, _ in chunks)
+    progress = [bytes_read for _, bytes_read in chunks]
+    assert progress == sorted(progress)
+    assert progress[-1] <= reader.size()
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize("suffix", ["", ".gz", ".zst"])
+async def test_read_batches_from_start_offset(
+    tmp_path, sample_nq_file, sample_statements_turtle_file, suffix
+):
+    """Test that reading resumes right after the batch a checkpoint recorded."""
+    for plain_file in (sample_nq_file, sample_statements_turtle_file):
+        data_file = tmp_path / (plain_file.name + suffix)
+        data = plain_file.read_bytes()
+        data_file.write_bytes(compress(data, suffix) if suffix else data)
+
+        reader = get_reader(data_file)
+        batches = await collect_batches(reader, batch_size=2)
+        resumed = await collect_batches(
+            reader, batch_size=2, start_offset=batches[1].end_offset
+        )
+        assert [b.data for b in resumed] == [b.data for b in batches[2:]]
@@ -0,0 +1,125 @@
+"""Tests for the upload ledger."""
+
+import asyncio
+import hashlib
+import os
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from rdf_uploader.endpoints import EndpointClient, EndpointType
+from rdf_uploader.ledger import UploadLedger, file_sha256
+from rdf_uploader.scheduling import SchedulePolicy
+from rdf_uploader.uploader import upload_rdf_files, upload_target
+
+
+def test_file_sha256(sample_nq_file):
+    """Test that streaming hashing matches hashing the whole content."""
+    expected = hashlib.sha256(sample_nq_file.read_bytes()).hexdigest()
+    assert file_sha256(sample_nq_file) == expected
+
+
+@pytest.mark.asyncio()
+async def test_ledger_records_uploads(tmp_path, sample_nq_file):
+    """Test that uploads are keyed by content and target."""
+    data_file = tmp_path / "data.nq"
+    data_file.write_bytes(sample_nq_file.read_bytes())
+
+    with UploadLedger(tmp_path / "ledger.db") as ledger:
+        content_hash = await ledger.content_hash(data_file)
+        assert content_hash == file_sha256(sample_nq_file)
+        assert not ledger.is_uploaded(content_hash, "target")
+
+        ledger.record_upload(content_hash, "target", data_file)
+        assert ledger.is_uploaded(content_hash, "target")
+        assert not ledger.is_uploaded(content_hash, "other target")
+
+    # The ledger persists, and a modified file gets a new hash
+    with UploadLedger(tmp_path / "ledger.db") as ledger:
+        assert ledger.is_uploaded(content_hash, "target")
+        with data_file.open("ab") as f:
+            f.write(b"\n")
+        stat = data_file.stat()
+        os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert await ledger.content_hash(data_file) != content_hash
+
+
+@pytest.mark.asyncio()
+async def test_upload_rdf_files_skips_files_in_ledger(tmp_path, sample_nq_file):
+    """Test that files already in the ledger are neither read nor uploaded."""
+    loaded_file = tmp_path / "loaded.nq"
+    loaded_file.write_bytes(sample_nq_file.read_bytes())
+    new_file = tmp_path / "new.nt"
+    new_file.write_text("<a> <b> <c> .\n", encoding="utf-8")
+
+    # Nothing listens on the endpoint, so only skipped files can succeed
+    endpoint = "http://127.0.0.1:9"
+    client = EndpointClient(
+        endpoint_url=endpoint, endpoint_type=EndpointType.BLAZEGRAPH
+    )
+    ledger_path = tmp_path / "ledger.db"
+    with UploadLedger(ledger_path) as ledger:
+        content_hash = await ledger.content_hash(loaded_file)
+        ledger.record_upload(content_hash, upload_target(client, None), loaded_file)
+
+    results = await upload_rdf_files(
+        [loaded_file, new_file],
+        endpoint=endpoint,
+        endpoint_type=EndpointType.BLAZEGRAPH,
+        ledger_path=ledger_path,
+        max_retries=0,
+    )
+
+    assert results[loaded_file] == {"success": True, "skipped": True}
+    assert results[new_file]["success"] is False
+    with UploadLedger(ledger_path) as ledger:
+        assert not ledger.is_uploaded(
+            await ledger.content_hash(new_file), upload_target(client, None)
+        )
+
+
+@pytest.mark.asyncio()
+async def test_skipped_files_do_not_take_a_worker_slot(
+    tmp_path, sample_nq_file, monkeypatch
+):
+    """Test that files are looked up in the ledger while other files upload."""
+    new_file = tmp_path / "new.nt"
+    new_file.write_text("<a> <b> <c> .\n", encoding="utf-8")
+    loaded_file = tmp_path / "loaded.nq"
+    loaded_file.write_bytes(sample_nq_file.read_bytes())
+
+    endpoint = "http://127.0.0.1:9"
+    client = EndpointClient(
+        endpoint_url=endpoint, endpoint_type=EndpointType.BLAZEGRAPH
+    )
+    ledger_path = tmp_path / "ledger.db"
+    with UploadLedger(ledger_path) as ledger:
+        content_hash = await ledger.content_hash(loaded_file)
+        ledger.record_upload(content_hash, upload_target(client, None), loaded_file)
+
+    skipped = asyncio.Event()
+    uploaded = []
+
+    async def upload_rdf_file(file_path: Path, **_kwargs: Any) -> bool:
+        # The only slot is busy with this file until the next one is skipped
+        await asyncio.wait_for(skipped.wait(), timeout=5)
+        uploaded.append(file_path)
+        return True
+
+    monkeypatch.setattr("rdf_uploader.uploader.upload_rdf_file", upload_rdf_file)
+    results = await upload_rdf_files(
+        [new_file, loaded_file],
+        endpoint=endpoint,
+        endpoint_type=EndpointType.BLAZEGRAPH,
+        concurrent_limit=1,
+        schedule_policy=SchedulePolicy.ORDER,
+        ledger_path=ledger_path,
+        progress_callback=skipped.set,
+    )
+
+    assert results == {
+        new_file: {"success": True},
+        loaded_file: {"success": True, "skipped": True},
+    }
+    assert uploaded == [new_file]
@@ -0,0 +1,212 @@
+"""Tests for Neptune bulk loads."""
+
+import datetime
+import json
+
+import httpx
+import pytest
+
+from rdf_uploader import neptune_bulk
+from rdf_uploader.endpoints import EndpointClient, EndpointType
+from rdf_uploader.neptune_bulk import (
+    AwsCredentials,
+    NeptuneBulkConfig,
+    NeptuneBulkLoader,
+    NeptuneLoadError,
+    SigV4Auth,
+    loader_format,
+)
+from rdf_uploader.uploader import bulk_load_rdf_file, upload_rdf_files
+
+CREDENTIALS = AwsCredentials("AKIDEXAMPLE", "wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY")
+
+
+class FakeNeptune:
+    """An S3 stand-in and a Neptune loader whose jobs finish after a few polls."""
+
+    def __init__(self, final_status: str = "LOAD_COMPLETED", polls: int = 3):
+        self.objects: dict[str, bytes] = {}
+        self.uploads: dict[str, dict[int, bytes]] = {}
+        self.jobs: list[dict] = []
+        self.final_status = final_status
+        self.polls = polls
+        self.records = 0
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.url.host == "s3.example.org":
+            assert request.headers["Authorization"].startswith("AWS4-HMAC-SHA256")
+            return self.s3(request)
+        if request.method == "POST":
+            self.jobs.append(json.loads(request.content))
+            return httpx.Response(200, json={"payload": {"loadId": "load-1"}})
+
+        self.polls -= 1
+        status = self.final_status if self.polls == 0 else "LOAD_IN_PROGRESS"
+        self.records += 3
+        return httpx.Response(
+            200,
+            json={
+                "payload": {
+                    "overallStatus": {"status": status, "totalRecords": self.records}
+                }
+            },
+        )
+
+    def s3(self, request: httpx.Request) -> httpx.Response:
+        key = request.url.path
+        params = request.url.params
+        if request.method == "POST" and "uploads" in params:
+            self.uploads["upload-1"] = {}
+            return httpx.Response(
+                200, content=b"<Result><UploadId>upload-1</UploadId></Result>"
+            )
+        if request.method == "PUT" and "uploadId" in params:
+            self.uploads[params["uploadId"]][int(params["partNumber"])] = (
+                request.content
+            )
+            return httpx.Response(200, headers={"ETag": f'"{params["partNumber"]}"'})
+        if request.method == "POST":
+            parts = self.uploads.pop(params["uploadId"])
+            assert request.content.count(b"<Part>") == len(parts)
+            self.objects[key] = b"".join(parts[n] for n in sorted(parts))
+            return httpx.Response(200, content=b"<Result/>")
+        if request.method == "PUT":
+            self.objects[key] = request.content
+            return httpx.Response(200)
+        if request.method == "DELETE":
+            self.objects.pop(key)
+            return httpx.Response(204)
+        return httpx.Response(405)
+
+
+def bulk_config(**kwargs) -> NeptuneBulkConfig:
+    return NeptuneBulkConfig(
+        source_uri="s3://staging/rdf",
+        iam_role_arn="arn:aws:iam::123456789012:role/NeptuneLoadFromS3",
+        s3_endpoint="http://s3.example.org",
+        poll_interval=0,
+        **kwargs,
+    )
+
+
+def test_sigv4_signature():
+    """Test the signature against the get-vanilla case of the AWS test suite."""
+    request = httpx.Request("GET", "https://example.amazonaws.com/")
+    auth = SigV4Auth(CREDENTIALS, "us-east-1", "service")
+    auth.sign(request, datetime.datetime(2015, 8, 30, 12, 36, tzinfo=datetime.UTC))
+
+    assert request.headers["x-amz-date"] == "20150830T123600Z"
+    assert request.headers["Authorization"] == (
+        "AWS4-HMAC-SHA256 Credential=AKIDEXAMPLE/20150830/us-east-1/service/"
+        "aws4_request, SignedHeaders=host;x-amz-date, "
+        "Signature=5fa00fa31553b73ebf1942676e86291e8372ff2a2260956d9b8aae1d763fbf31"
+    )
+
+
+def test_loader_format(tmp_path):
+    """Test that files map to loader formats and unsupported ones are refused."""
+    assert loader_format(tmp_path / "a.nt.gz") == "ntriples"
+    assert loader_format(tmp_path / "a.nquads") == "nquads"
+    assert loader_format(tmp_path / "a.ttl.bz2") == "turtle"
+    with pytest.raises(ValueError, match="gzip or bzip2"):
+        loader_format(tmp_path / "a.nt.zst")
+    with pytest.raises(ValueError, match="RDF/XML"):
+        loader_format(tmp_path / "a.jsonld")
+
+
+@pytest.mark.asyncio()
+async def test_bulk_load_rdf_file(sample_nq_file):
+    """Test that a file is staged, loaded and removed with progress reported."""
+    neptune = FakeNeptune()
+    updates = []
+    async with EndpointClient(
+        endpoint_url="http://neptune.example.org:8182",
+        endpoint_type=EndpointType.NEPTUNE,
+        transport=httpx.MockTransport(neptune.handler),
+    ) as client:
+        loader = NeptuneBulkLoader(client, bulk_config(), CREDENTIALS)
+        assert await bulk_load_rdf_file(
+            sample_nq_file,
+            loader,
+            graph="http://ex.org/g",
+            stats_callback=updates.append,
+        )
+
+    [job] = neptune.jobs
+    assert job["source"].startswith("s3://staging/rdf/")
+    assert job["source"].endswith("/sample.nq")
+    assert job["format"] == "nquads"
+    assert job["parserConfiguration"] == {"namedGraphUri": "http://ex.org/g"}
+    # The staged file is removed once the load has completed
+    assert neptune.objects == {}
+
+    assert updates[0]["bytes_read"] == sample_nq_file.stat().st_size
+    assert [u["uploaded_triples"] for u in updates[1:]] == [3, 6, 9]
+    assert updates[-1]["total_triples"] > 0
+
+
+@pytest.mark.asyncio()
+async def test_bulk_load_multipart(tmp_path, monkeypatch):
+    """Test that files larger than a part are staged part by part."""
+    monkeypatch.setattr(neptune_bulk, "S3_PART_SIZE", 10)
+    file_path = tmp_path / "data.nt"
+    file_path.write_bytes(b"<a> <b> <c> .\n" * 3)
+    neptune = FakeNeptune()
+    staged = []
+    async with EndpointClient(
+        endpoint_url="http://neptune.example.org:8182",
+        endpoint_type=EndpointType.NEPTUNE,
+        transport=httpx.MockTransport(neptune.handler),
+    ) as client:
+        loader = NeptuneBulkLoader(client, bulk_config(), CREDENTIALS)
+        source = await loader.stage(file_path, lambda sent, _: staged.append(sent))
+
+    assert staged == [10, 20, 30, 40, 42]
+    assert list(neptune.objects.values()) == [file_path.read_bytes()]
+    assert source == f"s3:/{next(iter(neptune.objects))}"
+
+
+@pytest.mark.asyncio()
+async def test_bulk_load_fails(sample_nq_file):
+    """Test that a failed load job raises and its file is kept in the bucket."""
+    neptune = FakeNeptune(final_status="LOAD_FAILED", polls=1)
+    async with EndpointClient(
+        endpoint_url="http://neptune.example.org:8182",
+        endpoint_type=EndpointType.NEPTUNE,
+        transport=httpx.MockTransport(neptune.handler),
+    ) as client:
+        loader = NeptuneBulkLoader(client, bulk_config(), CREDENTIALS)
+        with pytest.raises(NeptuneLoadError, match="load-1 ended with LOAD_FAILED"):
+            await bulk_load_rdf_file(sample_nq_file, loader, single_pass=True)
+
+    assert len(neptune.objects) == 1
+
+    with pytest.raises(ValueError, match="single Neptune endpoint"):
+        await upload_rdf_files(
+            [sample_nq_file],
+            endpoint="http://example.org",
+            endpoint_type=EndpointType.BLAZEGRAPH,
+            neptune_bulk=bulk_config(),
+        )
+
+
+@pytest.mark.asyncio()
+async def test_bulk_load_removes_file_after_errors(sample_nq_file):
+    """Test that a file is removed from the bucket when its job is not started."""
+    neptune = FakeNeptune()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host != "s3.example.org":
+            return httpx.Response(400)
+        return neptune.handler(request)
+
+    async with EndpointClient(
+        endpoint_url="http://neptune.example.org:8182",
+        endpoint_type=EndpointType.NEPTUNE,
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        loader = NeptuneBulkLoader(client, bulk_config(), CREDENTIALS)
+        with pytest.raises(httpx.HTTPStatusError):
+            await bulk_load_rdf_file(sample_nq_file, loader, single_pass=True)
+
+    assert neptune.objects == {}
@@ -0,0 +1,110 @@
+"""Tests for input expansion and upload scheduling."""
+
+from pathlib import Path
+
+import pytest
+
+from rdf_uploader.endpoints import EndpointType
+from rdf_uploader.scheduling import (
+    Schedule,
+    SchedulePolicy,
+    expand_inputs,
+    simulate_makespan,
+)
+from rdf_uploader.uploader import upload_rdf_files
+
+
+def test_expand_inputs(tmp_path, monkeypatch):
+    """Test that directories and patterns expand to the RDF files they contain."""
+    (tmp_path / "dumps" / "2024").mkdir(parents=True)
+    for name in ["dumps/a.nt", "dumps/2024/b.nq.gz", "dumps/notes.txt", "c.ttl"]:
+        (tmp_path / name).write_text("", encoding="utf-8")
+    # Generic suffixes that RDF formats share with other files
+    (tmp_path / "dumps" / "package.json").write_text("{}", encoding="utf-8")
+    (tmp_path / "dumps" / "pom.xml").write_text("<project/>", encoding="utf-8")
+
+    dumps = tmp_path / "dumps"
+    missing = tmp_path / "missing.nt"
+    assert expand_inputs([dumps, tmp_path / "c.ttl", dumps / "a.nt", missing]) == [
+        dumps / "2024" / "b.nq.gz",
+        dumps / "a.nt",
+        tmp_path / "c.ttl",
+        missing,
+    ]
+    assert expand_inputs([tmp_path / "**" / "*.n?"]) == [dumps / "a.nt"]
+    assert expand_inputs([dumps / "*.json"]) == []
+    # Named explicitly, any file is uploaded
+    assert expand_inputs([dumps / "package.json"]) == [dumps / "package.json"]
+
+    monkeypatch.chdir(tmp_path)
+    assert expand_inputs([Path("dumps/**/*.gz")]) == [Path("dumps/2024/b.nq.gz")]
+
+
+def test_simulate_makespan():
+    """Test that each file goes to the slot that frees up first."""
+    assert simulate_makespan([], 3) == 0
+    assert simulate_makespan([5, 4, 3, 3, 3], 2) == 10
+    assert simulate_makespan([3, 3, 3, 4, 5], 2) == 11
+    assert simulate_makespan([5, 4], 8) == 5
+
+
+def test_schedule_policies(tmp_path):
+    """Test that the largest-first order packs the slots most evenly."""
+    files = []
+    for index, size in enumerate([3, 5, 3, 4, 3]):
+        file_path = tmp_path / f"{index}.nt"
+        file_path.write_bytes(b"x" * size)
+        files.append(file_path)
+
+    largest = Schedule(files, 2)
+    assert [largest.sizes[f] for f in largest.files] == [5, 4, 3, 3, 3]
+    assert largest.predicted_load() == 10
+    assert largest.lower_bound() == 9
+
+    smallest = Schedule(files, 2, SchedulePolicy.SMALLEST_FIRST)
+    assert [smallest.sizes[f] for f in smallest.files] == [3, 3, 3, 4, 5]
+    assert smallest.predicted_load() == 11
+
+    assert Schedule(files, 2, SchedulePolicy.ORDER).files == files
+    assert largest.lower_bound(files[:2]) == 5
+
+
+def test_schedule_report(tmp_path):
+    """Test that predicted times come from the rate measured per slot."""
+    files = []
+    for index, size in enumerate([400, 200, 200]):
+        file_path = tmp_path / f"{index}.nt"
+        file_path.write_bytes(b"x" * size)
+        files.append(file_path)
+    schedule = Schedule(files, 2)
+
+    report = schedule.report(dict.fromkeys(files, 2.0), elapsed=5.0)
+    assert report.slot_rate == 800 / 6.0
+    assert report.actual == 5.0
+    assert report.predicted == pytest.approx(3.0)
+    assert report.lower_bound == pytest.approx(3.0)
+
+    # Failed files are left out, and nothing uploaded predicts nothing
+    assert schedule.report({files[1]: 1.0}, elapsed=1.0).predicted == 1.0
+    assert schedule.report({}, elapsed=1.0).predicted == 0.0
+
+
+@pytest.mark.asyncio()
+async def test_upload_rdf_files_expands_directories(tmp_path):
+    """Test that every file found in a directory is scheduled and reported."""
+    for name in ["a.nt", "b.nt", "readme.md"]:
+        (tmp_path / name).write_text("<a> <b> <c> .\n", encoding="utf-8")
+    reports = []
+
+    # Nothing listens on the endpoint, so every upload fails quickly
+    results = await upload_rdf_files(
+        [tmp_path],
+        endpoint="http://127.0.0.1:9",
+        endpoint_type=EndpointType.BLAZEGRAPH,
+        max_retries=0,
+        schedule_callback=reports.append,
+    )
+
+    assert sorted(results) == [tmp_path / "a.nt", tmp_path / "b.nt"]
+    assert len(reports) == 1
+    assert reports[0].predicted == 0.0
@@ -0,0 +1,90 @@
+"""Tests for sharded uploads."""
+
+import httpx
+import pytest
+
+from rdf_uploader.endpoints import EndpointClient, EndpointType
+from rdf_uploader.file_readers import ShardingReader, get_reader
+from rdf_uploader.sharding import HashRing
+from rdf_uploader.uploader import upload_rdf_file
+
+
+def test_hash_ring():
+    """Test that keys spread over the nodes and stay put when nodes are added."""
+    keys = [f"<http://ex.org/s{i}>".encode() for i in range(3000)]
+    ring = HashRing(["a", "b", "c"])
+    owners = [ring.node(key) for key in keys]
+    assert all(owners.count(node) > 700 for node in range(3))
+
+    # The order of the nodes does not matter
+    reordered = HashRing(["c", "a", "b"])
+    assert [reordered.nodes[reordered.node(key)] for key in keys] == [
+        ring.nodes[owner] for owner in owners
+    ]
+
+    # A fourth node only takes keys over, about a quarter of them
+    grown = HashRing(["a", "b", "c", "d"])
+    moved = [
+        grown.nodes[grown.node(key)]
+        for key, owner in zip(keys, owners, strict=True)
+        if grown.nodes[grown.node(key)] != ring.nodes[owner]
+    ]
+    assert set(moved) == {"d"}
+    assert 500 < len(moved) < 1000
+
+    with pytest.raises(ValueError, match="at least one node"):
+        HashRing([])
+
+
+@pytest.mark.asyncio()
+async def test_sharding_reader(tmp_path, sample_nq_file):
+    """Test that all the triples of a subject go to the same shard."""
+    ring = HashRing(["a", "b"])
+    reader = get_reader(sample_nq_file, shards=ring)
+    assert isinstance(reader, ShardingReader)
+
+    batches = [batch async for batch in reader.read_batches(batch_size=10)]
+    shards: dict[bytes, set[int]] = {}
+    for batch in batches:
+        assert batch.shard is not None
+        for line in batch.data.splitlines():
+            shards.setdefault(line.split()[0], set()).add(batch.shard)
+    assert all(len(shard) == 1 for shard in shards.values())
+    assert {batch.shard for batch in batches} == {0, 1}
+    assert sum(batch.triple_count for batch in batches) == len(
+        sample_nq_file.read_text(encoding="utf-8").splitlines()
+    )
+
+    with pytest.raises(ValueError, match="can be sharded"):
+        get_reader(tmp_path / "data.ttl", shards=ring)
+
+
+@pytest.mark.asyncio()
+async def test_upload_rdf_file_shards(sample_nq_file):
+    """Test that every triple is posted to exactly one shard."""
+    received: dict[str, list[bytes]] = {"a": [], "b": [], "c": []}
+
+    def endpoint(name: str) -> EndpointClient:
+        def handler(request: httpx.Request) -> httpx.Response:
+            received[name].extend(request.content.splitlines())
+            return httpx.Response(200)
+
+        return EndpointClient(
+            endpoint_url=f"http://{name}.example.org",
+            endpoint_type=EndpointType.BLAZEGRAPH,
+            transport=httpx.MockTransport(handler),
+        )
+
+    a, b, c = endpoint("a"), endpoint("b"), endpoint("c")
+    async with a, b, c:
+        await upload_rdf_file(
+            sample_nq_file, client=a, batch_size=5, mirrors=[b, c], shard=True
+        )
+
+    lines = sample_nq_file.read_bytes().splitlines()
+    assert sorted(received["a"] + received["b"] + received["c"]) == sorted(lines)
+    ring = HashRing(
+        ["http://a.example.org", "http://b.example.org", "http://c.example.org"]
+    )
+    for index, name in enumerate(received):
+        assert all(ring.node(line.split()[0]) == index for line in received[name])
@@ -0,0 +1,104 @@
+"""Tests for streaming Turtle helpers."""
+
+import pytest
+from rdflib import Graph
+from rdflib.compare import isomorphic
+
+from rdf_uploader.turtle import (
+    StatementSplitter,
+    TurtleSyntaxError,
+    split_statements,
+    transcode_statements,
+    turtle_to_ntriples,
+)
+
+
+def split_in_blocks(data: bytes, block_size: int):
+    return list(
+        split_statements(
+            data[i : i + block_size] for i in range(0, len(data), block_size)
+        )
+    )
+
+
+def test_split_statements(sample_statements_turtle_file):
+    """Test splitting a Turtle document at top-level statement boundaries."""
+    data = sample_statements_turtle_file.read_bytes()
+    statements = split_in_blocks(data, len(data))
+
+    directives = [s for s in statements if s.is_directive]
+    triples = [s for s in statements if not s.is_directive]
+    assert len(directives) == 3
+    assert directives[2].data == b"PREFIX foaf: <http://xmlns.com/foaf/0.1/>"
+    assert len(triples) == 4
+    assert triples[0].data.startswith(b"ex:alice")
+    assert triples[0].data.endswith(b"ex:height 1.68 .")
+    assert triples[-1].end_offset == len(data.rstrip())
+
+    # Every statement parses on its own once the directives are prepended
+    header = b"\n".join(s.data for s in directives)
+    for statement in triples:
+        Graph().parse(data=header + b"\n" + statement.data, format="turtle")
+
+
+def test_split_statements_independent_of_block_size(sample_statements_turtle_file):
+    """Test that statement boundaries do not depend on how input is chunked."""
+    data = sample_statements_turtle_file.read_bytes()
+    expected = split_in_blocks(data, len(data))
+    for block_size in (1, 2, 3, 7, 64):
+        assert split_in_blocks(data, block_size) == expected
+
+
+def test_split_unterminated_statement():
+    """Test that a trailing statement without a final dot is still returned."""
+    splitter = StatementSplitter()
+    statements = splitter.feed(b"<a> <b> <c> .\n<d> <e> <f>")
+    assert [s.data for s in statements] == [b"<a> <b> <c> ."]
+    statements = splitter.finish()
+    assert [s.data for s in statements] == [b"<d> <e> <f>"]
+
+
+def test_turtle_to_ntriples_matches_rdflib(sample_statements_turtle_file):
+    """Test that the transcoder produces the same graph as rdflib."""
+    turtle = sample_statements_turtle_file.read_text(encoding="utf-8")
+    ntriples = turtle_to_ntriples(turtle)
+
+    expected = Graph().parse(data=turtle, format="turtle")
+    actual = Graph().parse(data=ntriples, format="nt")
+    assert len(ntriples.splitlines()) == len(expected)
+    assert isomorphic(actual, expected)
+
+
+def test_transcode_statements_streams_whole_document(sample_statements_turtle_file):
+    """Test transcoding statement by statement keeps prefixes between statements."""
+    data = sample_statements_turtle_file.read_bytes()
+    lines = list(transcode_statements(split_in_blocks(data, 16)))
+    assert sorted(lines) == sorted(turtle_to_ntriples(data.decode()).splitlines())
+
+
+def test_turtle_to_ntriples_syntax():
+    """Test collections, nested blank nodes, literals and relative IRIs."""
+    turtle = """@base <http://example.org/> .
+@prefix : <http://example.org/ns#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+<a> :p ( 1 "two" ) ; :q [ :r 'it\\'s'@en ], 2.5, true ; a :Thing .
+:b :p '''multi
+line'''^^xsd:string .
+"""
+    ntriples = turtle_to_ntriples(turtle)
+    assert (
+        '<http://example.org/ns#b> <http://example.org/ns#p> "multi\\nline"' in ntriples
+    )
+    assert "<http://www.w3.org/2001/XMLSchema#decimal>" in ntriples
+
+    expected = Graph().parse(data=turtle, format="turtle")
+    assert isomorphic(Graph().parse(data=ntriples, format="nt"), expected)
+
+
+def test_turtle_to_ntriples_undeclared_prefix():
+    """Test that unknown prefixes are reported as syntax errors."""
+    with pytest.raises(TurtleSyntaxError, match="Undeclared prefix 'ex:'"):
+        turtle_to_ntriples("ex:a ex:b ex:c .")
+    # Common prefixes must be declared as well
+    with pytest.raises(TurtleSyntaxError, match="Undeclared prefix 'skos:'"):
+        turtle_to_ntriples("<http://example.org/a> a skos:Concept .")
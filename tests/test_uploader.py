@@ -1,14 +1,25 @@
 """Tests for the uploader module."""
 
+import asyncio
 from pathlib import Path
 from typing import Any
 
 import httpx
 import pytest
 
-from rdf_uploader.endpoints import EndpointType
+from rdf_uploader.endpoints import EndpointClient, EndpointType, RetryPolicy
 from rdf_uploader.file_readers import detect_content_type, get_reader
-from rdf_uploader.uploader import upload_rdf_file, upload_rdf_files
+from rdf_uploader.uploader import (
+    AdaptiveBatchSizer,
+    CommitPolicy,
+    InflightBudget,
+    InflightWindow,
+    TargetUploadError,
+    upload_coalesced_files,
+    upload_rdf_file,
+    upload_rdf_files,
+)
+from rdf_uploader.uploader import StatsCollector as UploadStats
 
 
 def test_detect_content_type():
@@ -28,6 +39,547 @@ def test_detect_content_type():
     assert detect_content_type(Path("test.unknown")) == "text/turtle"
 
 
+def test_stats_collector_orders_out_of_order_batches(sample_nq_file):
+    """Test that batches finishing out of order are reported in read order."""
+    history = []
+    stats = UploadStats(sample_nq_file)
+    stats.set_callback(history.append)
+    stats.set_total_triples(30)
+
+    stats.complete_batch(1, 10, 201)
+    assert history == []
+    stats.complete_batch(2, 5, 202)
+    assert history == []
+    stats.complete_batch(0, 15, 200)
+
+    assert [h["batch_num"] for h in history] == [1, 2, 3]
+    assert [h["status_code"] for h in history] == [200, 201, 202]
+    assert [h["uploaded_triples"] for h in history] == [15, 25, 30]
+
+
+@pytest.mark.asyncio()
+async def test_inflight_window_limits_concurrency():
+    """Test that the in-flight window caps concurrent uploads."""
+    running = 0
+    peak = 0
+
+    async def upload():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    async with InflightWindow(3) as window:
+        for _ in range(10):
+            await window.submit(upload())
+
+    assert peak == 3
+    assert running == 0
+
+
+@pytest.mark.asyncio()
+async def test_inflight_window_reraises_failure():
+    """Test that a failed upload stops the window and cancels the rest."""
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    class BatchRejectedError(Exception):
+        pass
+
+    async def failing():
+        raise BatchRejectedError
+
+    async def upload():
+        async with InflightWindow(2) as window:
+            await window.submit(slow())
+            await window.submit(failing())
+            await window.drain()
+
+    with pytest.raises(BatchRejectedError):
+        await upload()
+
+    assert cancelled == [True]
+
+
+@pytest.mark.asyncio()
+async def test_inflight_budget_limits_requests_and_bytes():
+    """Test that the budget caps requests and bytes across files."""
+    budget = InflightBudget(max_requests=3, max_bytes=100)
+    peak_requests = 0
+    peak_bytes = 0
+
+    async def upload(file_path: Path, size: int) -> None:
+        nonlocal peak_requests, peak_bytes
+        async with budget.reserve(file_path, size):
+            peak_requests = max(peak_requests, budget.requests)
+            peak_bytes = max(peak_bytes, budget.bytes)
+            await asyncio.sleep(0.01)
+
+    async with asyncio.TaskGroup() as tg:
+        for index in range(12):
+            tg.create_task(upload(Path(f"{index % 3}.nt"), 40))
+        # Larger than the whole budget, so it goes out on its own
+        tg.create_task(upload(Path("big.nt"), 500))
+
+    assert peak_requests == 2
+    assert peak_bytes == 500
+    assert (budget.requests, budget.bytes) == (0, 0)
+
+
+@pytest.mark.asyncio()
+async def test_inflight_budget_shares_fairly():
+    """Test that freed room goes to the file with the fewest requests in flight."""
+    budget = InflightBudget(max_requests=2)
+    busy, quiet = Path("busy.nt"), Path("quiet.nt")
+    await budget.acquire(busy, 1)
+    await budget.acquire(busy, 1)
+
+    granted = []
+
+    async def acquire(file_path: Path) -> None:
+        await budget.acquire(file_path, 1)
+        granted.append(file_path)
+
+    tasks = [asyncio.create_task(acquire(busy)) for _ in range(3)]
+    tasks.append(asyncio.create_task(acquire(quiet)))
+    await asyncio.sleep(0)
+    assert granted == []
+
+    budget.release(busy, 1)
+    await asyncio.sleep(0)
+    assert granted == [quiet]
+
+    # A cancelled request gives up its place in the queue
+    tasks[0].cancel()
+    budget.release(busy, 1)
+    await asyncio.gather(*tasks[1:2])
+    assert granted == [quiet, busy]
+    await asyncio.gather(tasks[0], return_exceptions=True)
+    assert budget.requests == 2
+    for task in tasks[2:]:
+        task.cancel()
+
+
+@pytest.mark.asyncio()
+async def test_upload_rdf_file_counts_retries(sample_nq_file):
+    """Test that a batch failing transiently is retried and counted in the stats."""
+    statuses = iter([503, 200, 200])
+
+    def handler(_request: httpx.Request) -> httpx.Response:
+        return httpx.Response(next(statuses))
+
+    history = []
+    async with EndpointClient(
+        endpoint_url="http://example.org",
+        endpoint_type=EndpointType.BLAZEGRAPH,
+        retry_policy=RetryPolicy(backoff=0),
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        assert await upload_rdf_file(
+            sample_nq_file, client=client, batch_size=250, stats_callback=history.append
+        )
+
+    assert [stats["retries"] for stats in history] == [1, 1]
+    assert history[-1]["uploaded_triples"] == 500
+
+
+@pytest.mark.asyncio()
+async def test_upload_rdf_file_streams(sample_nq_file):
+    """Test that a streamed file is posted whole in one request."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200)
+
+    history = []
+    async with EndpointClient(
+        endpoint_url="http://example.org",
+        endpoint_type=EndpointType.BLAZEGRAPH,
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        assert await upload_rdf_file(
+            sample_nq_file,
+            client=client,
+            batch_size=10,
+            stats_callback=history.append,
+            stream=True,
+        )
+
+    assert len(requests) == 1
+    assert requests[0].content == sample_nq_file.read_bytes()
+    assert requests[0].headers["Content-Type"] == "application/n-quads"
+    # Progress in bytes while streaming, then the counted triples
+    assert "batch_count" not in history[0]
+    assert history[-1]["bytes_read"] == sample_nq_file.stat().st_size
+    assert history[-1]["uploaded_triples"] == history[-1]["total_triples"] > 0
+
+
+class FakeStardog:
+    """A Stardog stand-in that applies added batches at the commit only."""
+
+    def __init__(self, fail_at: int | None = None):
+        self.committed: list[bytes] = []
+        self.pending: dict[str, list[bytes]] = {}
+        self.rolled_back: list[str] = []
+        self.adds = 0
+        self.fail_at = fail_at
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.endswith("/transaction/begin"):
+            transaction = f"tx-{len(self.pending) + 1}"
+            self.pending[transaction] = []
+            return httpx.Response(200, text=transaction)
+        if "/transaction/commit/" in path:
+            self.committed.extend(self.pending[path.rsplit("/", 1)[-1]])
+            return httpx.Response(200)
+        if "/transaction/rollback/" in path:
+            self.rolled_back.append(path.rsplit("/", 1)[-1])
+            return httpx.Response(200)
+        self.adds += 1
+        if self.adds == self.fail_at:
+            return httpx.Response(400)
+        self.pending[path.split("/")[-2]].append(request.content)
+        return httpx.Response(200)
+
+
+@pytest.mark.asyncio()
+async def test_upload_rdf_file_in_transactions(sample_nq_file, tmp_path):
+    """Test that batches are committed every few batches and checkpointed then."""
+    stardog = FakeStardog()
+    async with EndpointClient(
+        endpoint_url="http://example.org/db",
+        endpoint_type=EndpointType.STARDOG,
+        transport=httpx.MockTransport(stardog.handler),
+    ) as client:
+        assert await upload_rdf_file(
+            sample_nq_file,
+            client=client,
+            batch_size=100,
+            checkpoint_dir=tmp_path,
+            commit_policy=CommitPolicy(max_batches=2),
+        )
+
+    lines = sample_nq_file.read_bytes().splitlines()
+    batches = -(-len(lines) // 100)
+    assert len(stardog.pending) == -(-batches // 2)
+    assert b"".join(stardog.committed).splitlines() == lines
+    # The journal is removed once the whole file is committed
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio()
+async def test_upload_rdf_file_rolls_back(sample_nq_file):
+    """Test that a failed batch rolls its transaction back, leaving nothing loaded."""
+    stardog = FakeStardog(fail_at=3)
+    async with EndpointClient(
+        endpoint_url="http://example.org/db",
+        endpoint_type=EndpointType.STARDOG,
+        transport=httpx.MockTransport(stardog.handler),
+    ) as client:
+        with pytest.raises(httpx.HTTPStatusError, match="400"):
+            await upload_rdf_file(
+                sample_nq_file,
+                client=client,
+                batch_size=100,
+                commit_policy=CommitPolicy(),
+            )
+
+    assert stardog.committed == []
+    assert stardog.rolled_back == ["tx-1"]
+
+
+def test_adaptive_batch_sizer():
+    """Test that the batch size doubles, then backs off and grows additively."""
+    sizer = AdaptiveBatchSizer(initial_size=100, max_size=1000, target_latency=1.0)
+    sizer.observe(100, 0.1)
+    assert sizer() == 200
+    # A short final batch and batches read at an older size are ignored
+    sizer.observe(20, 0.1)
+    sizer.observe(100, 5.0)
+    assert sizer() == 200
+
+    sizer.observe(200, 2.0)
+    assert sizer() == 140
+    # Batches still in flight from before the decrease do not shrink it again
+    sizer.observe(200, 2.0)
+    assert sizer() == 140
+
+    sizer.observe(140, 0.1)
+    assert sizer() == 150
+    sizer.record_error(150)
+    assert sizer() == 105
+    assert sizer.errors == 1
+
+    for _ in range(100):
+        sizer.observe(sizer(), 0.1)
+    assert sizer() == 1000
+
+
+@pytest.mark.asyncio()
+async def test_upload_rdf_file_adaptive_batch_size(sample_nq_file):
+    """Test that the reader picks up the adapted batch size while uploading."""
+
+    def handler(_request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200)
+
+    history = []
+    sizer = AdaptiveBatchSizer(initial_size=25, max_size=100)
+    async with EndpointClient(
+        endpoint_url="http://example.org",
+        endpoint_type=EndpointType.BLAZEGRAPH,
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        await upload_rdf_file(
+            sample_nq_file,
+            client=client,
+            batch_sizer=sizer,
+            queue_depth=1,
+            stats_callback=history.append,
+        )
+
+    batch_counts = [stats["batch_count"] for stats in history]
+    assert sum(batch_counts) == 500
+    assert batch_counts[0] == 25
+    assert max(batch_counts) == 100
+    assert history[-1]["batch_size"] == 100
+
+
+@pytest.mark.asyncio()
+async def test_adaptive_batch_size_with_batch_bytes(sample_nq_file):
+    """Test that batches cut by bytes still adapt the size they were read at."""
+    sizes = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sizes.append(len(request.content))
+        return httpx.Response(200)
+
+    history = []
+    sizer = AdaptiveBatchSizer(initial_size=25, max_size=100)
+    async with EndpointClient(
+        endpoint_url="http://example.org",
+        endpoint_type=EndpointType.BLAZEGRAPH,
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        await upload_rdf_file(
+            sample_nq_file,
+            client=client,
+            batch_sizer=sizer,
+            batch_bytes=1000,
+            queue_depth=1,
+            stats_callback=history.append,
+        )
+
+    # Every batch holds fewer triples than the size it was read at
+    assert max(stats["batch_count"] for stats in history) < 25
+    assert max(sizes) <= 1000
+    assert history[-1]["batch_size"] == 100
+
+
+@pytest.mark.asyncio()
+async def test_upload_rdf_file_resumes_from_checkpoint(tmp_path, sample_nq_file):
+    """Test that a failed upload resumes after the last committed batch."""
+    bodies = []
+    fail_at = 3
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if len(bodies) == fail_at - 1:
+            return httpx.Response(400)
+        bodies.append(request.content.decode())
+        return httpx.Response(200)
+
+    async with EndpointClient(
+        endpoint_url="http://example.org",
+        endpoint_type=EndpointType.BLAZEGRAPH,
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        upload_args = {
+            "file_path": sample_nq_file,
+            "client": client,
+            "batch_size": 100,
+            "checkpoint_dir": tmp_path,
+            "resume": True,
+        }
+        with pytest.raises(httpx.HTTPStatusError):
+            await upload_rdf_file(**upload_args)
+        assert len(list(tmp_path.iterdir())) == 1
+
+        fail_at = 0
+        history = []
+        assert await upload_rdf_file(**upload_args, stats_callback=history.append)
+
+    lines = sample_nq_file.read_text(encoding="utf-8").splitlines()
+    assert [body.splitlines() for body in bodies] == [
+        lines[i : i + 100] for i in range(0, 500, 100)
+    ]
+    assert history[0]["batch_num"] == 3
+    assert history[-1]["uploaded_triples"] == 500
+    # The journal is removed once the file is complete
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio()
+async def test_upload_rdf_file_splits_graphs(sample_nq_file):
+    """Test that quads are posted as N-Triples to their own named graphs."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200)
+
+    async with EndpointClient(
+        endpoint_url="http://example.org",
+        endpoint_type=EndpointType.BLAZEGRAPH,
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        await upload_rdf_file(
+            sample_nq_file,
+            client=client,
+            batch_size=100,
+            inflight_batches=4,
+            split_graphs=True,
+        )
+
+    expected: dict[str, int] = {}
+    for line in sample_nq_file.read_text(encoding="utf-8").splitlines():
+        graph = line.rsplit(" ", 2)[1].strip("<>")
+        expected[graph] = expected.get(graph, 0) + 1
+
+    uploaded: dict[str, int] = {}
+    for request in requests:
+        assert request.headers["Content-Type"] == "application/n-triples"
+        graph = request.url.params["context-uri"]
+        uploaded[graph] = uploaded.get(graph, 0) + len(request.content.splitlines())
+    assert uploaded == expected
+
+
+@pytest.mark.asyncio()
+async def test_upload_rdf_file_fans_out(sample_nq_file):
+    """Test that every batch goes to all endpoints and failures are per endpoint."""
+    triple_count = len(sample_nq_file.read_text(encoding="utf-8").splitlines())
+    received: dict[str, int] = {"primary": 0, "replica": 0, "broken": 0}
+
+    def transport(name: str, fail_after: int | None = None) -> httpx.MockTransport:
+        def handler(request: httpx.Request) -> httpx.Response:
+            if fail_after is not None and received[name] >= fail_after:
+                return httpx.Response(400)
+            received[name] += len(request.content.splitlines())
+            return httpx.Response(200)
+
+        return httpx.MockTransport(handler)
+
+    def endpoint(name: str, fail_after: int | None = None) -> EndpointClient:
+        return EndpointClient(
+            endpoint_url=f"http://{name}.example.org",
+            endpoint_type=EndpointType.BLAZEGRAPH,
+            retry_policy=RetryPolicy(max_retries=0),
+            transport=transport(name, fail_after),
+        )
+
+    history = []
+    async with endpoint("primary") as primary, endpoint("replica") as replica:
+        await upload_rdf_file(
+            sample_nq_file,
+            client=primary,
+            batch_size=10,
+            inflight_batches=2,
+            stats_callback=history.append,
+            mirrors=[replica],
+        )
+    assert received == {"primary": triple_count, "replica": triple_count, "broken": 0}
+    assert history[-1]["uploaded_triples"] == triple_count
+
+    received.update(primary=0, replica=0)
+    async with endpoint("primary") as primary, endpoint("broken", 20) as broken:
+        with pytest.raises(TargetUploadError) as error:
+            await upload_rdf_file(
+                sample_nq_file, client=primary, batch_size=10, mirrors=[broken]
+            )
+    assert list(error.value.failures) == ["http://broken.example.org"]
+    assert received == {"primary": triple_count, "replica": 0, "broken": 20}
+
+
+@pytest.mark.asyncio()
+async def test_upload_coalesced_files(tmp_path):
+    """Test that small files share requests and failures are traced to them."""
+    files = []
+    for index in range(5):
+        file_path = tmp_path / f"{index}.nt"
+        file_path.write_text(
+            f"<http://ex.org/s{index}> <http://ex.org/p> <http://ex.org/o> .\n",
+            encoding="utf-8",
+        )
+        files.append(file_path)
+    statuses = iter([200, 400, 200])
+
+    def handler(_request: httpx.Request) -> httpx.Response:
+        return httpx.Response(next(statuses))
+
+    async with EndpointClient(
+        endpoint_url="http://example.org",
+        endpoint_type=EndpointType.BLAZEGRAPH,
+        retry_policy=RetryPolicy(max_retries=0),
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        results = await upload_coalesced_files(
+            [*files, tmp_path / "missing.nt"], client=client, batch_size=2
+        )
+
+    assert [results[f]["success"] for f in files] == [True, True, False, False, True]
+    assert results[files[2]]["error_type"] == "HTTPStatusError"
+    assert results[tmp_path / "missing.nt"]["error_type"] == "FileNotFoundError"
+
+
+@pytest.mark.asyncio()
+async def test_coalesced_groups_take_worker_slots(tmp_path, monkeypatch):
+    """Test that coalesced groups share the concurrent slots with other files."""
+    files = [tmp_path / "a.nt", tmp_path / "b.nq", tmp_path / "big.ttl"]
+    for file_path in files:
+        file_path.write_text("<a> <b> <c> .\n", encoding="utf-8")
+    running = []
+    peak = 0
+
+    async def upload(*items: Any) -> None:
+        nonlocal peak
+        running.append(items)
+        peak = max(peak, len(running))
+        await asyncio.sleep(0.01)
+        running.remove(items)
+
+    async def upload_rdf_file(file_path: Path, **_kwargs: Any) -> bool:
+        await upload(file_path)
+        return True
+
+    async def upload_coalesced_files(
+        file_paths: list[Path], **_kwargs: Any
+    ) -> dict[Path, dict[str, Any]]:
+        await upload(*file_paths)
+        return {file_path: {"success": True} for file_path in file_paths}
+
+    monkeypatch.setattr("rdf_uploader.uploader.upload_rdf_file", upload_rdf_file)
+    monkeypatch.setattr(
+        "rdf_uploader.uploader.upload_coalesced_files", upload_coalesced_files
+    )
+    results = await upload_rdf_files(
+        files,
+        endpoint="http://example.org",
+        endpoint_type=EndpointType.BLAZEGRAPH,
+        concurrent_limit=1,
+        coalesce_bytes=100,
+    )
+
+    assert all(results[f]["success"] for f in files)
+    assert peak == 1
+
+
 class StatsCollector:
     """Helper class for collecting stats in tests."""
 
@@ -142,10 +694,27 @@ async def test_upload_rdf_file_with_streaming(
 
     # Verify batches are created correctly
     reader = get_reader(sample_nq_file)
-    batches = await reader.read_batches(batch_size=5)
+    batches = [batch async for batch in reader.read_batches(batch_size=5)]
     assert len(batches) > 0
 
 
+@pytest.mark.asyncio()
+async def test_upload_rdf_files_without_endpoint(tmp_path, sample_nq_file, monkeypatch):
+    """Test that a missing endpoint is reported for every file instead of raised."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("RDF_ENDPOINT", raising=False)
+    monkeypatch.delenv("GENERIC_ENDPOINT", raising=False)
+    progress = []
+
+    results = await upload_rdf_files(
+        [sample_nq_file], progress_callback=lambda: progress.append(True)
+    )
+
+    assert results[sample_nq_file]["success"] is False
+    assert results[sample_nq_file]["error_type"] == "ValueError"
+    assert progress == [True]
+
+
 @pytest.mark.asyncio()
 async def test_upload_rdf_files_with_error(
     sample_nq_file,